@@ -0,0 +1,146 @@
+"""
+Модуль: benchmarks.bench_parcel_read_path
+
+Сравнивает чтение страницы посылок пользователя двумя способами:
+    - "ORM": прежний путь - выборка сущностей ParcelModel (identity map сессии, все колонки,
+      включая user_session_id) и построение ParcelResponseSchema с валидацией по каждому полю;
+    - "колонки": текущий путь ParcelService.get_user_parcels - проекция колонок карточки
+      (PARCEL_RESPONSE_COLUMNS) и model_construct без повторной валидации.
+
+Страницы по 30, 500 и 5 000 посылок одного пользователя. Каждый замер выполняется в новой сессии
+(как запрос API), из нескольких повторов берется лучший. Перед выводом проверяет, что ответы совпадают.
+Посылки создаются перед замером и удаляются после него.
+
+Запуск из корня репозитория (нужны зависимости webapp, запущенная БД с примененными миграциями
+и переменные окружения из .env, как для tests/test_query_plans.py):
+    python benchmarks/bench_parcel_read_path.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import ulid
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.future import select
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from models.base import DATABASE_URL  # noqa: E402
+from models.parcel import ParcelModel  # noqa: E402
+from models.parcel_type import ParcelTypeModel  # noqa: E402
+from schemas.parcel import ParcelResponseSchema  # noqa: E402
+from services.parcel import ParcelService, SHIPPING_COST_NOT_CALCULATED  # noqa: E402
+from services.parcel_type_registry import parcel_type_registry  # noqa: E402
+
+PAGE_SIZES = (30, 500, 5_000)
+REPEATS = 5
+
+
+async def orm_page(db: AsyncSession, user_session_id: UUID, limit: int) -> list[ParcelResponseSchema]:
+    """
+    Прежний путь чтения: сущности ParcelModel и ParcelResponseSchema с валидацией.
+    """
+    result = await db.execute(
+        select(ParcelModel)
+        .where(ParcelModel.user_session_id == user_session_id)  # type: ignore
+        .order_by(ParcelModel.id)
+        .limit(limit)
+    )
+    return [
+        ParcelResponseSchema(
+            id=parcel.id,
+            name=parcel.name,
+            weight=parcel.weight,
+            parcel_type_id=parcel.parcel_type_id,
+            parcel_type_name=parcel_type_registry.get_name(parcel.parcel_type_id),
+            value=parcel.value,
+            shipping_cost=parcel.shipping_cost or SHIPPING_COST_NOT_CALCULATED
+        )
+        for parcel in result.scalars().all()
+    ]
+
+
+async def columns_page(db: AsyncSession, user_session_id: UUID, limit: int) -> list[ParcelResponseSchema]:
+    """
+    Текущий путь чтения: проекция колонок карточки посылки.
+    """
+    return await ParcelService(db).get_user_parcels(user_session_id, limit=limit)
+
+
+async def measure(engine: AsyncEngine, read_page, user_session_id: UUID, limit: int) -> tuple[float, list]:
+    """
+    Возвращает лучшее время чтения страницы из REPEATS повторов и ответ последнего повтора.
+    """
+    best = float("inf")
+    page = []
+    for _ in range(REPEATS):
+        async with AsyncSession(engine) as db:
+            started = time.perf_counter()
+            page = await read_page(db, user_session_id, limit)
+            best = min(best, time.perf_counter() - started)
+    return best, page
+
+
+async def seed(engine: AsyncEngine, count: int) -> UUID:
+    """
+    Создает посылки одного пользователя всех типов, у двух третей рассчитана стоимость доставки.
+    """
+    async with AsyncSession(engine) as db:
+        parcel_type_ids = (await db.execute(select(ParcelTypeModel.id))).scalars().all()
+    user_session_id = uuid4()
+    async with engine.begin() as connection:
+        await connection.execute(ParcelModel.__table__.insert(), [
+            {
+                "id": str(ulid.new()),
+                "name": f"Bench Parcel {i}",
+                "weight": Decimal(1 + i % 5000).scaleb(-3),
+                "value": Decimal(100 + i % 90000).scaleb(-2),
+                "user_session_id": user_session_id,
+                "parcel_type_id": parcel_type_ids[i % len(parcel_type_ids)],
+                "shipping_cost": Decimal(500 + i % 100000).scaleb(-2) if i % 3 else None,
+            }
+            for i in range(count)
+        ])
+    return user_session_id
+
+
+async def run(engine: AsyncEngine) -> None:
+    async with AsyncSession(engine) as db:
+        await parcel_type_registry.load(db)
+    user_session_id = await seed(engine, max(PAGE_SIZES))
+    try:
+        print(f"{'посылок':>10} {'ORM, строк/с':>14} {'колонки, строк/с':>18} {'ускорение':>10}")
+        for limit in PAGE_SIZES:
+            orm_time, expected = await measure(engine, orm_page, user_session_id, limit)
+            columns_time, actual = await measure(engine, columns_page, user_session_id, limit)
+            if [parcel.model_dump() for parcel in actual] != [parcel.model_dump() for parcel in expected]:
+                raise AssertionError(f"Ответы расходятся на странице из {limit} посылок")
+            print(
+                f"{limit:>10} {limit / orm_time:>14,.0f} {limit / columns_time:>18,.0f}"
+                f" {orm_time / columns_time:>9.2f}x"
+            )
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(delete(ParcelModel).where(ParcelModel.user_session_id == user_session_id))
+
+
+async def main() -> None:
+    # Логи сервиса о каждой странице не нужны в выводе замера
+    logging.disable(logging.INFO)
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        await run(engine)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Модуль: benchmarks.bench_pricing_kernel
+
+Сравнивает пакетный расчет стоимости доставки в целых копейках (services.pricing_kernel)
+с прежним построчным расчетом через Decimal (calculate_shipping_cost в цикле по объектам)
+на 10 000, 100 000 и 1 000 000 посылок. Перед выводом проверяет, что результаты совпадают.
+
+Ядро замеряется в двух вариантах:
+    - "ядро": колонки уже в граммах и центах, как их возвращает выборка режима "orm"
+      (CAST(ROUND(weight * 1000) AS SIGNED)), результат - копейки;
+    - "ядро + Decimal": с переводом Decimal-колонок в целые единицы на стороне Python и обратно.
+
+Запуск из корня репозитория (нужны зависимости webapp):
+    python benchmarks/bench_pricing_kernel.py
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from schemas.pricing import TariffSchema  # noqa: E402
+from services.pricing import calculate_shipping_cost  # noqa: E402
+from services.pricing_kernel import CompiledTariffs, price_batch, columns_from_rows, kopecks_to_decimal  # noqa: E402
+from services.tariff_cache import DEFAULT_TARIFF  # noqa: E402
+
+SIZES = (10_000, 100_000, 1_000_000)
+USD_TO_RUB = Decimal("97.4512")
+TARIFFS = {
+    1: TariffSchema(parcel_type_id=1, per_kg_rate=Decimal("0.5"), value_rate=Decimal("0.01")),
+    2: TariffSchema(parcel_type_id=2, per_kg_rate=Decimal("1.2575"), value_rate=Decimal("0.035"),
+                    min_charge=Decimal("15.00")),
+    3: TariffSchema(parcel_type_id=3, per_kg_rate=Decimal("0.75"), value_rate=Decimal("0.02"),
+                    min_charge=Decimal("3.50")),
+}
+
+
+def make_parcels(count: int) -> list[SimpleNamespace]:
+    """
+    Генерирует посылки с весом DECIMAL(8,3) и стоимостью DECIMAL(9,2), как их возвращает ORM.
+    """
+    rnd = random.Random(count)
+    return [
+        SimpleNamespace(
+            weight=Decimal(rnd.randint(1, 99_999_999)).scaleb(-3),
+            value=Decimal(rnd.randint(1, 9_999_999)).scaleb(-2),
+            parcel_type_id=rnd.randint(1, 4),
+        )
+        for _ in range(count)
+    ]
+
+
+def per_object_loop(parcels: list[SimpleNamespace]) -> list[Decimal]:
+    """
+    Прежний расчет: Decimal для каждого объекта посылки.
+    """
+    return [
+        calculate_shipping_cost(
+            Decimal(parcel.weight), Decimal(parcel.value), USD_TO_RUB, TARIFFS.get(parcel.parcel_type_id, DEFAULT_TARIFF)
+        )
+        for parcel in parcels
+    ]
+
+
+def batch_kernel_decimal(parcels: list[SimpleNamespace]) -> list[Decimal]:
+    """
+    Пакетный расчет с переводом Decimal-колонок в целые единицы и результата обратно в Decimal.
+    """
+    tariffs = CompiledTariffs(TARIFFS, DEFAULT_TARIFF)
+    grams, cents = columns_from_rows((parcel.weight, parcel.value) for parcel in parcels)
+    kopecks = price_batch(grams, cents, [parcel.parcel_type_id for parcel in parcels], tariffs, USD_TO_RUB)
+    return [kopecks_to_decimal(shipping_cost) for shipping_cost in kopecks]
+
+
+def measure(func, *args) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main() -> None:
+    print(f"{'посылок':>10} {'цикл Decimal, с':>16} {'ядро, с':>10} {'ускорение':>10} {'ядро + Decimal, с':>18}")
+    for size in SIZES:
+        parcels = make_parcels(size)
+        grams, cents = columns_from_rows((parcel.weight, parcel.value) for parcel in parcels)
+        parcel_type_ids = [parcel.parcel_type_id for parcel in parcels]
+        tariffs = CompiledTariffs(TARIFFS, DEFAULT_TARIFF)
+
+        loop_time, expected = measure(per_object_loop, parcels)
+        kernel_time, kopecks = measure(price_batch, grams, cents, parcel_type_ids, tariffs, USD_TO_RUB)
+        kernel_decimal_time, actual = measure(batch_kernel_decimal, parcels)
+
+        for name, result in (("ядро", [kopecks_to_decimal(k) for k in kopecks]), ("ядро + Decimal", actual)):
+            mismatches = sum(1 for a, b in zip(expected, result) if a != b or str(a) != str(b))
+            if mismatches or len(result) != size:
+                raise AssertionError(f"Результаты ({name}) расходятся с Decimal для {mismatches} из {size} посылок")
+        print(
+            f"{size:>10} {loop_time:>16.3f} {kernel_time:>10.3f} {loop_time / kernel_time:>9.1f}x"
+            f" {kernel_decimal_time:>18.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Модуль: benchmarks.bench_ulid_index_size
+
+Сравнивает размер первичного ключа и вторичных индексов таблицы посылок при хранении ULID
+строкой VARCHAR(26) (до миграции a3f1c7e9d254) и в BINARY(16) (models.types.ULIDBinary).
+
+Создает в БД две временные копии таблицы parcels с теми же колонками, индексами и внешним ключом,
+отличающиеся только типом id, заполняет их одинаковыми посылками (ROWS посылок, по PARCELS_PER_USER
+на пользователя), обновляет статистику (ANALYZE TABLE) и выводит размер каждого индекса по
+mysql.innodb_index_stats (если у пользователя нет доступа - общий размер данных и индексов
+по information_schema.TABLES). Кластерный индекс (PRIMARY) содержит сами строки, поэтому его размер
+включает все колонки. Перед замером проверяет, что порядок байтов совпадает с порядком строк ULID.
+Временные таблицы удаляются после замера.
+
+Запуск из корня репозитория (нужны зависимости webapp, запущенная БД с примененными миграциями
+и переменные окружения из .env, как для tests/test_query_plans.py):
+    python benchmarks/bench_ulid_index_size.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+from decimal import Decimal
+from uuid import uuid4
+
+import ulid
+from dotenv import load_dotenv
+from sqlalchemy import MetaData, String, Table, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.future import select
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from models.base import DATABASE_URL  # noqa: E402
+from models.parcel import ParcelModel  # noqa: E402
+from models.parcel_type import ParcelTypeModel  # noqa: E402
+from models.types import ULIDBinary  # noqa: E402
+
+ROWS = 200_000
+PARCELS_PER_USER = 100
+INSERT_BATCH_SIZE = 5_000
+TABLES = {"VARCHAR(26)": "bench_parcels_ulid_text", "BINARY(16)": "bench_parcels_ulid_binary"}
+
+
+def check_order(count: int = 100_000) -> None:
+    """
+    Проверяет на случайных ULID, что сортировка BINARY(16) совпадает с сортировкой строк.
+    """
+    ulid_type = ULIDBinary()
+    ids = [ulid.from_int(random.getrandbits(128)).str for _ in range(count)]
+    by_bytes = sorted(ulid_type.process_bind_param(parcel_id, None) for parcel_id in ids)
+    if [ulid_type.process_result_value(value, None) for value in by_bytes] != sorted(ids):
+        raise AssertionError("Порядок BINARY(16) не совпадает с порядком строк ULID")
+
+
+def bench_tables() -> dict[str, Table]:
+    """
+    Возвращает копии таблицы parcels для каждого способа хранения id.
+    """
+    metadata = MetaData()
+    ParcelTypeModel.__table__.to_metadata(metadata)
+    tables = {}
+    for storage, name in TABLES.items():
+        table = ParcelModel.__table__.to_metadata(metadata, name=name)
+        if storage == "VARCHAR(26)":
+            table.c.id.type = String(26)
+        tables[storage] = table
+    return tables
+
+
+async def fill(connection: AsyncConnection, tables: dict[str, Table]) -> None:
+    """
+    Заполняет копии таблицы одинаковыми посылками в порядке возрастания ULID, как при регистрации.
+    """
+    parcel_type_ids = (await connection.execute(select(ParcelTypeModel.id))).scalars().all()
+    rnd = random.Random(ROWS)
+    user_session_ids = [uuid4() for _ in range(ROWS // PARCELS_PER_USER)]
+    for offset in range(0, ROWS, INSERT_BATCH_SIZE):
+        rows = [
+            {
+                "id": str(ulid.new()),
+                "name": f"Bench Parcel {offset + i}",
+                "weight": Decimal(rnd.randint(1, 99_999)).scaleb(-3),
+                "value": Decimal(rnd.randint(100, 999_999)).scaleb(-2),
+                "user_session_id": rnd.choice(user_session_ids),
+                "parcel_type_id": rnd.choice(parcel_type_ids),
+                "shipping_cost": Decimal(rnd.randint(500, 9_999_999)).scaleb(-2) if rnd.random() < 0.9 else None,
+            }
+            for i in range(min(INSERT_BATCH_SIZE, ROWS - offset))
+        ]
+        for table in tables.values():
+            await connection.execute(table.insert(), rows)
+
+
+async def index_sizes(connection: AsyncConnection, table_name: str) -> dict[str, int]:
+    """
+    Возвращает размер индексов таблицы в байтах. Имя таблицы в именах индексов заменяется на parcels,
+    чтобы индексы двух копий таблицы можно было сопоставить.
+    """
+    await connection.execute(text(f"ANALYZE TABLE {table_name}"))
+    try:
+        result = await connection.execute(
+            text(
+                "SELECT index_name, stat_value * @@innodb_page_size FROM mysql.innodb_index_stats "
+                "WHERE database_name = DATABASE() AND table_name = :table_name AND stat_name = 'size'"
+            ),
+            {"table_name": table_name}
+        )
+        sizes = {index_name.replace(table_name, "parcels"): int(size) for index_name, size in result.all()}
+        if sizes:
+            return sizes
+    except SQLAlchemyError:
+        pass
+    await connection.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+    result = await connection.execute(
+        text(
+            "SELECT data_length, index_length FROM information_schema.TABLES "
+            "WHERE table_schema = DATABASE() AND table_name = :table_name"
+        ),
+        {"table_name": table_name}
+    )
+    data_length, index_length = result.one()
+    return {"PRIMARY": int(data_length), "(все вторичные индексы)": int(index_length)}
+
+
+async def main() -> None:
+    check_order()
+    tables = bench_tables()
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as connection:
+            for table in tables.values():
+                await connection.run_sync(table.create)
+        try:
+            async with engine.begin() as connection:
+                await fill(connection, tables)
+            async with engine.connect() as connection:
+                text_sizes = await index_sizes(connection, TABLES["VARCHAR(26)"])
+                binary_sizes = await index_sizes(connection, TABLES["BINARY(16)"])
+        finally:
+            async with engine.begin() as connection:
+                for table in tables.values():
+                    await connection.run_sync(table.drop)
+    finally:
+        await engine.dispose()
+
+    print(f"Посылок: {ROWS}")
+    print(f"{'индекс':<46} {'VARCHAR(26), МБ':>16} {'BINARY(16), МБ':>15} {'доля':>7}")
+    for index_name, text_size in sorted(text_sizes.items(), key=lambda item: -item[1]):
+        binary_size = binary_sizes.get(index_name, 0)
+        print(
+            f"{index_name:<46} {text_size / 2 ** 20:>16.2f} {binary_size / 2 ** 20:>15.2f}"
+            f" {binary_size / text_size:>7.2f}"
+        )
+    text_total, binary_total = sum(text_sizes.values()), sum(binary_sizes.values())
+    print(
+        f"{'итого':<46} {text_total / 2 ** 20:>16.2f} {binary_total / 2 ** 20:>15.2f}"
+        f" {binary_total / text_total:>7.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
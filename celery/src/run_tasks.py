@@ -9,10 +9,13 @@
 
     Для пересчета стоимости доставки:
     docker exec parcel_celery python run_tasks.py --update-shipping-costs
+
+    Для перестроения фильтра ULID посылок:
+    docker exec parcel_celery python run_tasks.py --rebuild-parcel-id-filter
 """
 
 import sys
-from tasks import update_exchange_rate, update_shipping_costs
+from tasks import update_exchange_rate, update_shipping_costs, rebuild_parcel_id_filter
 
 
 def main():
@@ -28,8 +31,14 @@ def main():
     elif task == "--update-shipping-costs":
         update_shipping_costs.apply_async()
         print("Пересчет стоимости доставки запущен.")
+    elif task == "--rebuild-parcel-id-filter":
+        rebuild_parcel_id_filter.apply_async()
+        print("Перестроение фильтра посылок запущено.")
     else:
-        print("Неизвестная задача. Используйте --update-exchange-rate или --update-shipping-costs.")
+        print(
+            "Неизвестная задача. Используйте --update-exchange-rate, --update-shipping-costs "
+            "или --rebuild-parcel-id-filter."
+        )
 
 
 if __name__ == "__main__":
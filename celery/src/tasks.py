@@ -6,6 +6,16 @@
 Содержит задачи для периодического обновления курса валют и обновления стоимости доставки посылок
 на основе этих курсов.
 
+Пересчет стоимости доставки распределяется между воркерами: задача-координатор update_shipping_costs
+делит очередь посылок без стоимости на непересекающиеся диапазоны ULID и запускает по подзадаче
+update_shipping_costs_range на каждый диапазон (chord). После выполнения всех подзадач
+aggregate_shipping_costs суммирует результаты. Каждый диапазон обрабатывается независимо и идемпотентно,
+поэтому подзадачи можно безопасно повторять.
+
+Фильтр ULID посылок (rebuild_parcel_id_filter) перестраивается при старте beat и затем периодически:
+до первого перестроения webapp не отсеивает запросы несуществующих посылок по фильтру, а признак готовности
+фильтра живет ограниченное время (PARCEL_ID_FILTER_READY_TTL в webapp) и продлевается перестроением.
+
 Так как celery не поддерживает асинхронные функции, чтобы не создавать оберток, сделал по-простому:
 используем синхронные requests, redis и SQLAlchemy.
 
@@ -16,7 +26,7 @@ import os
 
 import redis
 import requests
-from celery import Celery
+from celery import Celery, chord
 
 
 # Константы
@@ -24,6 +34,13 @@ from celery import Celery
 USD_EXCHANGE_INTERVAL  = int(os.getenv("USD_EXCHANGE_INTERVAL", 3600))  # Время обновления кэша курса в секундах (1 час)
 SHIPPING_COST_UPDATE_INTERVAL = int(os.getenv("SHIPPING_COST_UPDATE_INTERVAL", 300))
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+# Хранилище результатов нужно для chord: агрегатор получает результаты подзадач по диапазонам
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+# Интервал перестроения фильтра ULID посылок, должен быть меньше PARCEL_ID_FILTER_READY_TTL в webapp
+PARCEL_ID_FILTER_REBUILD_INTERVAL = int(os.getenv("PARCEL_ID_FILTER_REBUILD_INTERVAL", 3600))
+SHIPPING_COST_FAN_OUT = int(os.getenv("SHIPPING_COST_FAN_OUT", 4))  # На сколько диапазонов делить очередь пересчета
+# Пересчитывать ли уже рассчитанные цены доставки после каждого обновления курса
+REPRICE_ON_RATE_UPDATE = os.getenv("REPRICE_ON_RATE_UPDATE", "false").lower() == "true"
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 CELERY_ENV = os.getenv("CELERY_ENV", "worker")
@@ -32,7 +49,7 @@ INTERNAL_SERVICES_URL = os.getenv("INTERNAL_SERVICES_URL")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Celery('tasks', broker=CELERY_BROKER_URL)
+app = Celery('tasks', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
 app.conf.broker_connection_retry_on_startup = True
 redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT)
 
@@ -50,6 +67,8 @@ def update_exchange_rate(self):
     response = requests.post(f"{INTERNAL_SERVICES_URL}/api/update_usd_rate")
     if response.status_code == 200:
         logger.info("Успешно обновили курс доллара")
+        if REPRICE_ON_RATE_UPDATE:
+            reprice_stale_shipping_costs.apply_async()
     else:
         logger.error(f"Не удалось обновить курс доллара {str(response.text)}")
 
@@ -57,20 +76,116 @@ def update_exchange_rate(self):
 @app.task
 def update_shipping_costs():
     """
-    Задача обновления стоимости доставки для всех посылок, у которых она еще не рассчитана.
-    Использует курс USD к RUB, сохраненный в Redis, для выполнения вычислений.
+    Задача-координатор обновления стоимости доставки для всех посылок, у которых она еще не рассчитана.
+
+    Получает от служебного сервиса разбиение очереди на диапазоны ULID и запускает по подзадаче
+    на каждый диапазон, результаты собирает aggregate_shipping_costs.
+    """
+    logger.info("Обращаемся к служебному роуту для деления очереди пересчета стоимостей доставки")
+    response = requests.get(
+        f"{INTERNAL_SERVICES_URL}/api/shipping_costs_ranges",
+        params={"parts": SHIPPING_COST_FAN_OUT}
+    )
+    if response.status_code != 200:
+        logger.error(f"Не удалось разделить очередь пересчета стоимостей доставки {str(response.text)}")
+        return
+
+    ranges = response.json()["ranges"]
+    if not ranges:
+        logger.info("Посылок без стоимости доставки нет, пересчет не требуется")
+        return
+
+    logger.info(f"Запускаем пересчет стоимостей доставки по {len(ranges)} диапазонам")
+    chord(
+        update_shipping_costs_range.s(shipping_costs_range["start_id"], shipping_costs_range["end_id"])
+        for shipping_costs_range in ranges
+    )(aggregate_shipping_costs.s())
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60)
+def update_shipping_costs_range(self, start_id, end_id):
+    """
+    Подзадача обновления стоимости доставки для посылок в диапазоне ULID [start_id, end_id).
+    Повторный запуск безопасен: уже рассчитанные посылки не пересчитываются.
+
+    Args:
+        self: Ссылка на объект задачи, позволяющая выполнять повторные попытки.
+        start_id (str): Начало диапазона (включительно).
+        end_id (str | None): Конец диапазона (не включительно), None - без верхней границы.
+
+    Returns:
+        dict: Диапазон, количество обновленных посылок и признак успешности.
     """
-    logger.info("Обращаемся к служебному роуту для пересчета стоимостей доставки")
-    response = requests.post(f"{INTERNAL_SERVICES_URL}/api/update_shipping_costs")
+    response = requests.post(
+        f"{INTERNAL_SERVICES_URL}/api/update_shipping_costs_range",
+        json={"start_id": start_id, "end_id": end_id}
+    )
     if response.status_code == 200:
-        logger.info("Успешно обновили стоимости доставки")
+        updated = response.json()["updated"]
+        logger.info(f"Обновлены стоимости доставки в диапазоне [{start_id}, {end_id}): {updated}")
+        return {"start_id": start_id, "end_id": end_id, "updated": updated, "ok": True}
+
+    logger.error(f"Не удалось обновить стоимости доставки в диапазоне [{start_id}, {end_id}) {str(response.text)}")
+    if self.request.retries < self.max_retries:
+        raise self.retry()
+    # Попытки исчерпаны: не роняем chord, диапазон подхватит следующий запуск координатора
+    return {"start_id": start_id, "end_id": end_id, "updated": 0, "ok": False}
+
+
+@app.task
+def aggregate_shipping_costs(results):
+    """
+    Собирает результаты подзадач пересчета стоимости доставки по диапазонам.
+
+    Args:
+        results (list[dict]): Результаты update_shipping_costs_range.
+    """
+    updated = sum(result["updated"] for result in results)
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        logger.error(
+            f"Стоимости доставки обновлены для {updated} посылок, "
+            f"не удалось обработать диапазонов: {len(failed)} из {len(results)}"
+        )
+    else:
+        logger.info(f"Успешно обновили стоимости доставки для {updated} посылок по {len(results)} диапазонам")
+    return {"updated": updated, "failed_ranges": len(failed)}
+
+
+@app.task
+def reprice_stale_shipping_costs():
+    """
+    Задача пересчета стоимости доставки для посылок, рассчитанных по устаревшему снимку курса
+    или версии формулы. Запускается после обновления курса, если включен REPRICE_ON_RATE_UPDATE.
+    """
+    logger.info("Обращаемся к служебному роуту для пересчета устаревших стоимостей доставки")
+    response = requests.post(f"{INTERNAL_SERVICES_URL}/api/reprice_stale_shipping_costs")
+    if response.status_code == 200:
+        logger.info(f"Пересчитаны устаревшие стоимости доставки: {response.json()['updated']}")
     else:
-        logger.error(f"Не удалось обновить стоимости доставки {str(response.text)}")
+        logger.error(f"Не удалось пересчитать устаревшие стоимости доставки {str(response.text)}")
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60)
+def rebuild_parcel_id_filter(self):
+    """
+    Задача перестроения фильтра Блума ULID посылок из таблицы. Запускается при старте beat, периодически
+    (продлевает признак готовности фильтра) и вручную.
+    """
+    logger.info("Обращаемся к служебному роуту для перестроения фильтра посылок")
+    response = requests.post(f"{INTERNAL_SERVICES_URL}/api/rebuild_parcel_id_filter")
+    if response.status_code == 200:
+        logger.info(response.json()["message"])
+    else:
+        logger.error(f"Не удалось перестроить фильтр посылок {str(response.text)}")
+        raise self.retry()
 
 
 if CELERY_ENV == "beat":
     logger.info("Запускаем задачу получения валюты на старте")
     app.tasks['tasks.update_exchange_rate'].apply_async()
+    logger.info("Запускаем перестроение фильтра посылок на старте")
+    app.tasks['tasks.rebuild_parcel_id_filter'].apply_async()
 
 
 app.conf.beat_schedule = {
@@ -82,4 +197,8 @@ app.conf.beat_schedule = {
         'task': 'tasks.update_shipping_costs',
         'schedule': SHIPPING_COST_UPDATE_INTERVAL  # 300
     },
+    'rebuild-parcel-id-filter-every-hour': {
+        'task': 'tasks.rebuild_parcel_id_filter',
+        'schedule': PARCEL_ID_FILTER_REBUILD_INTERVAL  # 3600
+    },
 }
@@ -0,0 +1,98 @@
+"""
+Модуль: tests/test_cache_contract
+
+Проверяет, что реализации ICacheService ведут себя одинаково: RedisWrapper (Redis из docker compose,
+REDIS_HOST=localhost в .env) и InMemoryCacheService (память процесса). Операции над несколькими ключами
+(get_many, set_many), счетчики (increment), конвейер команд (pipeline) и битовые карты.
+
+Все ключи теста получают уникальный префикс и удаляются после теста.
+"""
+import os
+import sys
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from config.redis_conf import REDIS_HOST, REDIS_PORT  # noqa: E402
+from services import redis_wrapper  # noqa: E402
+from services.memory_cache import InMemoryCacheService  # noqa: E402
+
+
+# Фикстура: кэш каждой реализации и уникальный префикс ключей
+@pytest_asyncio.fixture(params=["redis", "memory"])
+async def cache(request):
+    prefix = f"test:{uuid4()}:"
+    if request.param == "memory":
+        yield InMemoryCacheService(), prefix
+        return
+    await redis_wrapper.initialize_redis_pool(REDIS_HOST, REDIS_PORT, max_connections=2)
+    cache = redis_wrapper.RedisWrapper()
+    yield cache, prefix
+    keys = [key async for key in cache.redis.scan_iter(match=f"{prefix}*")]
+    if keys:
+        await cache.redis.delete(*keys)
+    await redis_wrapper.close_redis_pool()
+
+
+@pytest.mark.asyncio
+async def test_get_many_set_many(cache):
+    """Несколько ключей за одно обращение: порядок, отсутствующие ключи и время жизни по ключу"""
+    cache, prefix = cache
+    assert await cache.get_many([]) == []
+    await cache.set_many({f"{prefix}a": "1", f"{prefix}b": "2"}, expire={f"{prefix}a": 60})
+    assert await cache.get_many([f"{prefix}b", f"{prefix}missing", f"{prefix}a"]) == ["2", None, "1"]
+    assert 0 < await cache.get_ttl(f"{prefix}a") <= 60
+    assert await cache.get_ttl(f"{prefix}b") is None
+
+    await cache.set_many({f"{prefix}c": "3"}, expire=30)
+    assert 0 < await cache.get_ttl(f"{prefix}c") <= 30
+
+
+@pytest.mark.asyncio
+async def test_increment(cache):
+    """Счетчик создается с нуля, время жизни задается только при создании"""
+    cache, prefix = cache
+    key = f"{prefix}counter"
+    assert await cache.increment(key, expire=60) == 1
+    assert await cache.increment(key, 5, expire=1) == 6
+    assert 1 < await cache.get_ttl(key) <= 60
+    assert await cache.get_value(key) == "6"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("transaction", [True, False])
+async def test_pipeline(cache, transaction):
+    """Конвейер возвращает по одному результату на команду в порядке добавления"""
+    cache, prefix = cache
+    await cache.set_value(f"{prefix}old", "x")
+    results = await (
+        cache.pipeline(transaction=transaction)
+        .set_value(f"{prefix}value", "v", 60)
+        .get_value(f"{prefix}value")
+        .get_value(f"{prefix}missing")
+        .increment(f"{prefix}counter", 2)
+        .increment(f"{prefix}counter")
+        .expire_value(f"{prefix}old", 60)
+        .expire_value(f"{prefix}missing", 60)
+        .delete_value(f"{prefix}old")
+        .delete_value(f"{prefix}old")
+        .get_ttl(f"{prefix}value")
+        .get_ttl(f"{prefix}counter")
+        .get_ttl(f"{prefix}missing")
+        .set_hash_fields(f"{prefix}hash", {"a": "1", "b": "2"})
+        .get_hash_fields(f"{prefix}hash", "b", "missing", "a")
+        .set_bits(f"{prefix}bits", [3, 100])
+        .get_bits(f"{prefix}bits", [3, 4, 100])
+        .execute()
+    )
+    value_ttl = results.pop(9)
+    assert 0 < value_ttl <= 60
+    assert results == [True, "v", None, 2, 3, True, False, 1, 0, -1, -2, 2, ["2", None, "1"], [0, 0], [1, 0, 1]]
+    assert await cache.get_value(f"{prefix}old") is None
+    assert await cache.get_hash(f"{prefix}hash") == {"a": "1", "b": "2"}
+    assert await cache.set_bits(f"{prefix}bits", [3, 5]) == [1, 0]
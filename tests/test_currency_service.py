@@ -0,0 +1,199 @@
+"""
+Модуль: tests/test_currency_service
+
+Проверяет обновление курса доллара (services.currency_service) поверх InMemoryCacheService с подмененным
+провайдером курса: промах кэша обновляет курс одним запросом к провайдеру, устаревший курс отдается сразу
+и обновляется одной фоновой задачей, а при неудачном обновлении отдается последний известный курс.
+
+Не требует ни БД, ни Redis, ни доступа к провайдеру курса.
+"""
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+import ulid
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from config.pricing_conf import RATE_REFRESH_LEASE_REDIS_KEY  # noqa: E402
+from schemas.pricing import RateFetchResultSchema, RateSnapshotSchema  # noqa: E402
+from services import currency_service  # noqa: E402
+from services.currency_fetch import CurrencyFetchService  # noqa: E402
+from services.currency_redis import CurrencyRedisService  # noqa: E402
+from services.currency_service import CurrencyService  # noqa: E402
+from services.memory_cache import InMemoryCacheService  # noqa: E402
+from services.rate_local_cache import rate_local_cache  # noqa: E402
+
+CONCURRENT_CALLS = 20
+
+
+class StubProvider:
+    """
+    Подмена запроса курса у провайдера: считает запросы, каждый новый документ - новый курс.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        # Если задано, ответ провайдера задерживается до установки события
+        self.gate: asyncio.Event | None = None
+
+    async def fetch(self, api_url=None, etag=None, last_modified=None) -> RateFetchResultSchema:
+        self.calls += 1
+        # Запрос к провайдеру не мгновенный: конкурентные вызовы успевают застать обновление
+        await asyncio.sleep(0.05)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("Провайдер недоступен")
+        rate = Decimal(90 + self.calls)
+        return RateFetchResultSchema(rate=rate, rates={"USD": rate})
+
+
+@pytest_asyncio.fixture
+async def cache():
+    rate_local_cache.invalidate()
+    yield InMemoryCacheService()
+    for task in (CurrencyService._refresh_task, CurrencyService._revalidate_task):
+        if task is not None and not task.done():
+            task.cancel()
+    CurrencyService._refresh_task = None
+    CurrencyService._revalidate_task = None
+    rate_local_cache.invalidate()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    stub = StubProvider()
+    monkeypatch.setattr(CurrencyFetchService, "fetch_currency_rate_conditional", stub.fetch)
+    monkeypatch.setattr(CurrencyService, "history_session_factory", None)
+    monkeypatch.setattr(currency_service, "RATE_REFRESH_WAIT", 0.3)
+    monkeypatch.setattr(currency_service, "RATE_REFRESH_POLL_INTERVAL", 0.01)
+    return stub
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_fetch_once(cache, provider):
+    """N конкурентных промахов кэша - один запрос к провайдеру, все получают один снимок"""
+    snapshots = await asyncio.gather(
+        *(CurrencyService.get_rate_snapshot(cache) for _ in range(CONCURRENT_CALLS))
+    )
+    assert provider.calls == 1
+    assert {snapshot.snapshot_id for snapshot in snapshots} == {snapshots[0].snapshot_id}
+    assert snapshots[0].rate == Decimal(91)
+    # После успешного обновления аренда освобождена
+    assert await cache.get_value(RATE_REFRESH_LEASE_REDIS_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_rate_from_other_process(cache, provider):
+    """Пока аренду держит другой процесс, курс у провайдера не запрашивается, а ожидается в Redis"""
+    await cache.set_value(RATE_REFRESH_LEASE_REDIS_KEY, str(ulid.new()))
+
+    async def other_process():
+        await asyncio.sleep(0.05)
+        await CurrencyService.update_usd_rate(cache)
+
+    waiter = asyncio.create_task(CurrencyService.get_rate_snapshot(cache))
+    await other_process()
+    snapshot = await waiter
+    assert provider.calls == 1
+    assert snapshot.rate == Decimal(91)
+
+
+@pytest.mark.asyncio
+async def test_lease_holder_failure_returns_last_known(cache, provider):
+    """Владелец аренды не смог обновить курс: все ожидающие получают последний известный снимок"""
+    last_known = RateSnapshotSchema(rate=Decimal(80), snapshot_id=str(ulid.new()))
+    await CurrencyRedisService(cache).set_last_known(last_known)
+    provider.fail = True
+
+    snapshots = await asyncio.gather(
+        *(CurrencyService.get_rate_snapshot(cache) for _ in range(CONCURRENT_CALLS))
+    )
+    assert provider.calls == 1
+    assert all(snapshot == last_known for snapshot in snapshots)
+    # Аренда не освобождена: следующая попытка - не раньше ее истечения
+    assert await cache.get_value(RATE_REFRESH_LEASE_REDIS_KEY) is not None
+    assert await CurrencyService.refresh_rate_snapshot(cache) == last_known
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_last_known_when_other_process_fails(cache, provider):
+    """Другой процесс держит аренду, но курс так и не появился: по истечении ожидания - последний известный"""
+    last_known = RateSnapshotSchema(rate=Decimal(80), snapshot_id=str(ulid.new()))
+    await CurrencyRedisService(cache).set_last_known(last_known)
+    await cache.set_value(RATE_REFRESH_LEASE_REDIS_KEY, str(ulid.new()))
+
+    snapshots = await asyncio.gather(
+        *(CurrencyService.get_rate_snapshot(cache) for _ in range(CONCURRENT_CALLS))
+    )
+    assert provider.calls == 0
+    assert all(snapshot == last_known for snapshot in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_no_rate_and_no_last_known(cache, provider):
+    """Курс получить не удалось и последнего известного нет - ValueError"""
+    provider.fail = True
+    with pytest.raises(ValueError):
+        await CurrencyService.get_rate_snapshot(cache)
+
+
+@pytest.mark.asyncio
+async def test_stale_rate_revalidated_once(cache, provider, monkeypatch):
+    """После мягкого истечения курс отдается сразу, а обновляется одной фоновой задачей"""
+    stale = await CurrencyService.get_rate_snapshot(cache)
+    await CurrencyRedisService(cache).set_soft_expiry(time.time() - 1)
+    rate_local_cache.invalidate()
+    revalidations = 0
+    revalidate = CurrencyService._revalidate
+
+    async def counting_revalidate(redis_wrapper):
+        nonlocal revalidations
+        revalidations += 1
+        await revalidate(redis_wrapper)
+
+    monkeypatch.setattr(CurrencyService, "_revalidate", staticmethod(counting_revalidate))
+    provider.gate = asyncio.Event()
+    snapshots = await asyncio.gather(
+        *(CurrencyService.get_rate_snapshot(cache) for _ in range(CONCURRENT_CALLS))
+    )
+    # Провайдер еще не ответил, но никто его не ждал: все получили устаревший снимок
+    assert all(snapshot == stale for snapshot in snapshots)
+    assert not CurrencyService._revalidate_task.done()
+    assert revalidations == 1
+
+    provider.gate.set()
+    await CurrencyService._revalidate_task
+    assert revalidations == 1
+    assert provider.calls == 2
+    fresh = await CurrencyService.get_rate_snapshot(cache)
+    assert fresh.rate == Decimal(92)
+    assert fresh.snapshot_id > stale.snapshot_id
+    assert await cache.get_value(RATE_REFRESH_LEASE_REDIS_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_keeps_stale_rate(cache, provider):
+    """Неудачное фоновое обновление не мешает отдавать устаревший курс и не повторяется до истечения аренды"""
+    stale = await CurrencyService.get_rate_snapshot(cache)
+    await CurrencyRedisService(cache).set_soft_expiry(time.time() - 1)
+    rate_local_cache.invalidate()
+    provider.fail = True
+
+    assert await CurrencyService.get_rate_snapshot(cache) == stale
+    await CurrencyService._revalidate_task
+    assert provider.calls == 2
+
+    rate_local_cache.invalidate()
+    assert await CurrencyService.get_rate_snapshot(cache) == stale
+    await CurrencyService._revalidate_task
+    assert provider.calls == 2
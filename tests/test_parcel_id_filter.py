@@ -0,0 +1,104 @@
+"""
+Модуль: tests/test_parcel_id_filter
+
+Проверяет отсеивание несуществующих посылок (services.parcel_id_filter), от которого зависит ответ 404
+без обращения к БД: синтаксическую проверку ULID и фильтр Блума поверх InMemoryCacheService.
+Фильтр не должен давать ложных "нет" для добавленных ULID и не должен использоваться, пока не готов.
+
+Не требует ни БД, ни Redis.
+"""
+import os
+import sys
+import time
+
+import pytest
+import ulid
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from config.parcel_conf import PARCEL_ID_MAX_CLOCK_SKEW  # noqa: E402
+from services.memory_cache import InMemoryCacheService  # noqa: E402
+from services.parcel_id_filter import ParcelIdFilter, is_valid_parcel_id  # noqa: E402
+
+
+def ulid_at(timestamp: float) -> str:
+    return str(ulid.from_timestamp(timestamp))
+
+
+def test_valid_parcel_id():
+    """Только что выданный ULID и ULID в нижнем регистре корректны"""
+    parcel_id = str(ulid.new())
+    assert is_valid_parcel_id(parcel_id)
+    assert is_valid_parcel_id(parcel_id.lower())
+
+
+@pytest.mark.parametrize("char", ["I", "L", "O", "U", "-", "!", "Ж"])
+def test_bad_crockford_characters(char):
+    """Символы вне алфавита Crockford base32"""
+    parcel_id = str(ulid.new())
+    assert not is_valid_parcel_id(parcel_id[:-1] + char)
+    assert not is_valid_parcel_id(parcel_id[:12] + char + parcel_id[13:])
+
+
+@pytest.mark.parametrize("parcel_id", ["", "01ARZ3NDEKTSV4RRFFQ69G5FA", "01ARZ3NDEKTSV4RRFFQ69G5FAVV"])
+def test_wrong_length(parcel_id):
+    """ULID - ровно 26 символов"""
+    assert not is_valid_parcel_id(parcel_id)
+
+
+@pytest.mark.parametrize("first", ["8", "9", "Z"])
+def test_first_character_above_7(first):
+    """Первый символ больше 7 не помещается в 128 бит"""
+    assert not is_valid_parcel_id(first + str(ulid.new())[1:])
+
+
+def test_future_timestamp():
+    """ULID не может опережать часы сервера больше чем на PARCEL_ID_MAX_CLOCK_SKEW"""
+    assert is_valid_parcel_id(ulid_at(time.time() + PARCEL_ID_MAX_CLOCK_SKEW / 2))
+    assert not is_valid_parcel_id(ulid_at(time.time() + PARCEL_ID_MAX_CLOCK_SKEW + 60))
+    assert not is_valid_parcel_id("7ZZZZZZZZZZZZZZZZZZZZZZZZZ")
+
+
+def test_offsets():
+    """Смещения детерминированы, не зависят от регистра и лежат в битовой карте"""
+    parcel_filter = ParcelIdFilter(InMemoryCacheService(), capacity=1000, error_rate=0.01)
+    parcel_id = str(ulid.new())
+    offsets = parcel_filter.offsets(parcel_id)
+    assert len(offsets) == parcel_filter.hashes
+    assert all(0 <= offset < parcel_filter.bits for offset in offsets)
+    assert parcel_filter.offsets(parcel_id.lower()) == offsets
+    assert ParcelIdFilter(InMemoryCacheService(), capacity=1000, error_rate=0.01).offsets(parcel_id) == offsets
+
+
+@pytest.mark.asyncio
+async def test_not_ready_filter_is_not_used():
+    """Пока фильтр не перестроен или отключен после неудачного добавления, ответ всегда "возможно\""""
+    cache = InMemoryCacheService()
+    parcel_filter = ParcelIdFilter(cache, capacity=1000, error_rate=0.01)
+    assert await parcel_filter.might_contain(str(ulid.new()))
+
+    await cache.set_value(parcel_filter.ready_key, "0")
+    assert not await parcel_filter.might_contain(str(ulid.new()))
+
+    await cache.increment(parcel_filter.generation_key)
+    assert await parcel_filter.might_contain(str(ulid.new()))
+
+
+@pytest.mark.asyncio
+async def test_no_false_negatives():
+    """Добавленные ULID всегда "возможно есть", в том числе в нижнем регистре"""
+    cache = InMemoryCacheService()
+    parcel_filter = ParcelIdFilter(cache, capacity=1000, error_rate=0.01)
+    await cache.set_value(parcel_filter.ready_key, "0")
+    parcel_ids = [str(ulid.new()) for _ in range(1000)]
+    await parcel_filter.add(parcel_ids[:500])
+    for parcel_id in parcel_ids[500:]:
+        await parcel_filter.add([parcel_id])
+
+    for parcel_id in parcel_ids:
+        assert await parcel_filter.might_contain(parcel_id)
+        assert await parcel_filter.might_contain(parcel_id.lower())
+    false_positives = sum([await parcel_filter.might_contain(str(ulid.new())) for _ in range(1000)])
+    assert false_positives < 50
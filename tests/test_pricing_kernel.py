@@ -0,0 +1,92 @@
+"""
+Модуль: tests/test_pricing_kernel
+
+Проверяет, что пакетный расчет в целых единицах (services.pricing_kernel.price_batch) совпадает
+с расчетом в Decimal (services.pricing.calculate_shipping_cost) бит в бит: на половинах копейки,
+на минимальной стоимости, при нулевой стоимости содержимого и на тарифах, отличных от тарифа по умолчанию.
+
+Не требует ни БД, ни Redis.
+"""
+import os
+import random
+import sys
+from decimal import Decimal
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from schemas.pricing import TariffSchema  # noqa: E402
+from services.pricing import calculate_shipping_cost, SHIPPING_COST_QUANT  # noqa: E402
+from services.pricing_kernel import CompiledTariffs, price_batch, kopecks_to_decimal  # noqa: E402
+from services.tariff_cache import DEFAULT_TARIFF  # noqa: E402
+
+TARIFFS = {
+    1: TariffSchema(parcel_type_id=1, per_kg_rate=Decimal("0.5"), value_rate=Decimal("0.01"), min_charge=Decimal("0")),
+    2: TariffSchema(parcel_type_id=2, per_kg_rate=Decimal("1.2345"), value_rate=Decimal("0.0125"), min_charge=Decimal("3.50")),
+    3: TariffSchema(parcel_type_id=3, per_kg_rate=Decimal("0"), value_rate=Decimal("0"), min_charge=Decimal("0")),
+    4: TariffSchema(parcel_type_id=4, per_kg_rate=Decimal("99999.9999"), value_rate=Decimal("0.9999"), min_charge=Decimal("0.01")),
+}
+# Тип 99 без тарифа считается по тарифу по умолчанию
+PARCEL_TYPE_IDS = [*TARIFFS, 99]
+RATES = [Decimal("90"), Decimal("97.1234"), Decimal("1"), Decimal("10"), Decimal("0.000001"), Decimal("1E+2"), Decimal("123.456789")]
+
+
+def expected_kopecks(grams: int, cents: int, parcel_type_id: int, usd_to_rub: Decimal) -> Decimal:
+    return calculate_shipping_cost(
+        Decimal(grams).scaleb(-3), Decimal(cents).scaleb(-2), usd_to_rub, TARIFFS.get(parcel_type_id, DEFAULT_TARIFF)
+    )
+
+
+def assert_batch_matches(grams: list[int], cents: list[int], parcel_type_ids: list[int], usd_to_rub: Decimal) -> None:
+    kopecks = price_batch(grams, cents, parcel_type_ids, CompiledTariffs(TARIFFS, DEFAULT_TARIFF), usd_to_rub)
+    actual = [kopecks_to_decimal(value) for value in kopecks]
+    expected = [expected_kopecks(*row, usd_to_rub) for row in zip(grams, cents, parcel_type_ids)]
+    assert actual == expected
+
+
+def test_half_kopeck_rounds_up():
+    """Ровно половина копейки округляется вверх, как ROUND_HALF_UP"""
+    # 1 г * 0.5 $/кг = 0.0005 $, по курсу 10 - 0.005 руб.
+    grams, cents, parcel_type_ids = [], [], []
+    for g in range(1, 200):
+        for c in (0, 1, 5, 50):
+            unrounded = (Decimal(g).scaleb(-3) * TARIFFS[1].per_kg_rate + Decimal(c).scaleb(-2) * TARIFFS[1].value_rate) * 10
+            if unrounded.scaleb(2) % 1 == Decimal("0.5"):
+                grams.append(g)
+                cents.append(c)
+                parcel_type_ids.append(1)
+    assert grams  # в выборке есть посылки ровно на половине копейки
+    assert_batch_matches(grams, cents, parcel_type_ids, Decimal("10"))
+    assert price_batch([1], [0], [1], CompiledTariffs(TARIFFS, DEFAULT_TARIFF), Decimal("10"))[0] == 1
+
+
+def test_minimum_charge_floor():
+    """Стоимость не ниже минимальной по тарифу, в том числе на границе минимальной стоимости"""
+    # Тариф 2: 1.2345 $/кг + 1.25% стоимости, минимум 3.50 $
+    grams = [1, 1000, 2835, 2836, 2834, 0]
+    cents = [0, 0, 0, 0, 2, 28000]
+    assert_batch_matches(grams, cents, [2] * len(grams), Decimal("90"))
+    kopecks = price_batch([1], [0], [2], CompiledTariffs(TARIFFS, DEFAULT_TARIFF), Decimal("90"))
+    assert kopecks_to_decimal(kopecks[0]) == (Decimal("3.50") * 90).quantize(SHIPPING_COST_QUANT)
+
+
+@pytest.mark.parametrize("usd_to_rub", RATES)
+def test_zero_value_and_zero_tariff(usd_to_rub):
+    """Нулевая стоимость содержимого и нулевой тариф"""
+    grams = [1, 500, 99_999_999, 0]
+    assert_batch_matches(grams, [0] * len(grams), [1] * len(grams), usd_to_rub)
+    assert list(price_batch(grams, [1, 2, 3, 4], [3] * 4, CompiledTariffs(TARIFFS, DEFAULT_TARIFF), usd_to_rub)) == [0] * 4
+
+
+@pytest.mark.parametrize("usd_to_rub", RATES)
+def test_random_parcels_all_tariffs(usd_to_rub):
+    """Случайные посылки всех типов, включая тип без тарифа, в одной порции"""
+    rnd = random.Random(str(usd_to_rub))
+    count = 2000
+    grams = [rnd.choice((rnd.randint(1, 99_999_999), rnd.randint(1, 5000))) for _ in range(count)]
+    cents = [rnd.choice((0, rnd.randint(1, 999_999_999), rnd.randint(1, 10_000))) for _ in range(count)]
+    parcel_type_ids = [rnd.choice(PARCEL_TYPE_IDS) for _ in range(count)]
+    assert_batch_matches(grams, cents, parcel_type_ids, usd_to_rub)
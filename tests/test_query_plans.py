@@ -0,0 +1,123 @@
+"""
+Модуль: tests/test_query_plans
+
+Проверяет по EXPLAIN, что горячие запросы к таблице parcels читаются по составным индексам
+без сортировки (filesort): страница посылок пользователя и очередь пересчета стоимости доставки.
+
+Запросы строятся теми же методами, что и в сервисах. Нужна запущенная БД с примененными миграциями
+и переменные окружения из .env (DATABASE_HOST=localhost и учетные данные MySQL).
+"""
+import os
+import sys
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+import ulid
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from models.base import DATABASE_URL  # noqa: E402
+from models.parcel import ParcelModel  # noqa: E402
+from services.parcel import ParcelService  # noqa: E402
+from services.shipping_costs_update_service import ShippingCostsUpdateService  # noqa: E402
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN для произвольного запроса SQLAlchemy (параметры запроса подставляются как обычно)."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "mysql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+# Фикстура для подключения к БД
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+# Фикстура с посылками одного пользователя двух типов, часть без стоимости доставки
+@pytest_asyncio.fixture
+async def user_session_id(engine):
+    user_session_id = uuid4()
+    async with engine.begin() as connection:
+        await connection.execute(ParcelModel.__table__.insert(), [
+            {
+                "id": str(ulid.new()),
+                "name": "Explain Parcel",
+                "weight": Decimal("1.000"),
+                "value": Decimal("10.00"),
+                "user_session_id": user_session_id,
+                "parcel_type_id": 1 + i % 2,
+                "shipping_cost": Decimal("100.00") if i % 3 else None,
+            }
+            for i in range(60)
+        ])
+    yield user_session_id
+    async with engine.begin() as connection:
+        await connection.execute(delete(ParcelModel).where(ParcelModel.user_session_id == user_session_id))
+
+
+async def explain(engine, query) -> list:
+    async with engine.connect() as connection:
+        result = await connection.execute(Explain(query))
+        return [row._mapping for row in result]
+
+
+def assert_index_without_filesort(plan: list, index: str):
+    assert len(plan) == 1
+    assert plan[0]["key"] == index
+    assert "filesort" not in (plan[0]["Extra"] or "")
+
+
+# Тесты
+@pytest.mark.asyncio
+@pytest.mark.parametrize("has_shipping_cost", [None, True, False])
+async def test_user_parcels_uses_session_index(engine, user_session_id, has_shipping_cost):
+    """Страница посылок пользователя читается по (user_session_id, id)"""
+    query = ParcelService.user_parcels_query(user_session_id, limit=30, has_shipping_cost=has_shipping_cost)
+    assert_index_without_filesort(await explain(engine, query), "ix_parcels_user_session_id_id")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("has_shipping_cost", [None, True, False])
+async def test_user_parcels_by_type_uses_session_type_index(engine, user_session_id, has_shipping_cost):
+    """Страница посылок пользователя одного типа читается по (user_session_id, parcel_type_id, id)"""
+    query = ParcelService.user_parcels_query(
+        user_session_id, limit=30, parcel_type_id=1, has_shipping_cost=has_shipping_cost
+    )
+    assert_index_without_filesort(await explain(engine, query), "ix_parcels_user_session_id_parcel_type_id_id")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parcel_type_id, index", [
+    (None, "ix_parcels_user_session_id_id"),
+    (1, "ix_parcels_user_session_id_parcel_type_id_id"),
+])
+async def test_user_parcels_cursor_page_uses_index_range(engine, user_session_id, parcel_type_id, index):
+    """Страница по курсору начинается с нужной строки индекса (range по id), без сортировки"""
+    query = ParcelService.user_parcels_query(
+        user_session_id, limit=31, parcel_type_id=parcel_type_id, cursor=str(ulid.new())
+    )
+    plan = await explain(engine, query)
+    assert_index_without_filesort(plan, index)
+    assert plan[0]["type"] == "range"
+
+@pytest.mark.asyncio
+async def test_shipping_cost_backlog_uses_backlog_index(engine, user_session_id):
+    """Порция очереди пересчета стоимости доставки читается по (shipping_cost, id)"""
+    query = ShippingCostsUpdateService.backlog_ids_query(1000)
+    assert_index_without_filesort(await explain(engine, query), "ix_parcels_shipping_cost_id")
@@ -71,3 +71,55 @@ async def test_get_parcel(client, cookies, parcel_id):
     assert float(data["weight"]) == 5.0
     assert data["parcel_type_id"] == 1
     assert float(data["value"]) == 100
+
+@pytest.mark.asyncio
+async def test_create_parcels_batch(client, cookies):
+    """Проверяем пакетную регистрацию посылок с ошибками в отдельных посылках"""
+    client.cookies = cookies  # Передаем куки в клиент
+    payload = {
+        "parcels": [
+            {"name": "Test Parcel", "weight": 5.0, "parcel_type_id": 1, "value": 100},
+            {"name": "Test Parcel", "weight": -1, "parcel_type_id": 1, "value": 100},
+            {"name": "Test Parcel", "weight": 5.0, "parcel_type_id": 999, "value": 100},
+        ]
+    }
+    response = await client.post("/api/parcels/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["registered"] == 1
+    registered, invalid, unknown_type = data["parcels"]
+    assert registered["id"] and registered["error"] is None
+    assert invalid["id"] is None and invalid["error"]
+    assert unknown_type["id"] is None and unknown_type["error"]
+
+    response = await client.get(f"/api/parcels/{registered['id']}/")
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_get_parcels_cursor_pagination(client, cookies):
+    """Проверяем постраничное получение своих посылок по курсору"""
+    client.cookies = cookies  # Передаем куки в клиент
+    payload = {
+        "name": "Test Parcel",
+        "weight": 5.0,
+        "parcel_type_id": 1,
+        "value": 100
+    }
+    created = []
+    for _ in range(3):
+        response = await client.post("/api/parcels/", json=payload)
+        assert response.status_code == 201
+        created.append(response.json()["id"])
+
+    response = await client.get("/api/parcels/", params={"limit": 2})
+    assert response.status_code == 200
+    assert [parcel["id"] for parcel in response.json()] == created[:2]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get("/api/parcels/", params={"limit": 2, "cursor": next_cursor})
+    assert response.status_code == 200
+    assert [parcel["id"] for parcel in response.json()] == created[2:]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = await client.get("/api/parcels/", params={"cursor": next_cursor, "offset": 1})
+    assert response.status_code == 400
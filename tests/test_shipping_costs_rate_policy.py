@@ -0,0 +1,106 @@
+"""
+Модуль: tests/test_shipping_costs_rate_policy
+
+Проверяет политику курса "registration" (SHIPPING_COST_RATE_POLICY) на пути, которым пересчет
+запускает Celery: очередь делится на диапазоны ULID, каждый диапазон пересчитывается отдельно
+(update_shipping_costs_range), после обновления курса пересчитываются устаревшие цены (reprice_stale).
+
+Посылки должны считаться по курсу, действовавшему при их регистрации, а новый курс не должен
+перезаписывать их цены. Нужна запущенная БД с примененными миграциями и переменные окружения из .env
+(DATABASE_HOST=localhost и учетные данные MySQL).
+"""
+import asyncio
+import os
+import sys
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+import ulid
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from models.base import DATABASE_URL  # noqa: E402
+from models.exchange_rate import ExchangeRateModel  # noqa: E402
+from models.parcel import ParcelModel  # noqa: E402
+from schemas.pricing import RateSnapshotSchema  # noqa: E402
+from services.rate_history import RateHistoryService  # noqa: E402
+from services.shipping_costs_update_service import ShippingCostsUpdateService  # noqa: E402
+from config.pricing_conf import USD_CURRENCY_CODE  # noqa: E402
+
+
+# Фикстура для подключения к БД
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+# Фикстура: курс при регистрации, посылки без стоимости доставки и более новый курс
+@pytest_asyncio.fixture
+async def registration_setup(engine):
+    registration_snapshot = RateSnapshotSchema(rate=Decimal("80.000000"), snapshot_id=str(ulid.new()))
+    async with AsyncSession(engine) as db:
+        await RateHistoryService(db).record({USD_CURRENCY_CODE: registration_snapshot.rate}, registration_snapshot.snapshot_id)
+    await asyncio.sleep(0.01)
+
+    user_session_id = uuid4()
+    parcel_ids = [str(ulid.new()) for _ in range(5)]
+    async with engine.begin() as connection:
+        await connection.execute(ParcelModel.__table__.insert(), [
+            {
+                "id": parcel_id,
+                "name": "Policy Parcel",
+                "weight": Decimal("1.000"),
+                "value": Decimal("10.00"),
+                "user_session_id": user_session_id,
+                "parcel_type_id": 1,
+            }
+            for parcel_id in parcel_ids
+        ])
+    await asyncio.sleep(0.01)
+
+    current_snapshot = RateSnapshotSchema(rate=Decimal("100.000000"), snapshot_id=str(ulid.new()))
+    async with AsyncSession(engine) as db:
+        await RateHistoryService(db).record({USD_CURRENCY_CODE: current_snapshot.rate}, current_snapshot.snapshot_id)
+
+    yield parcel_ids, registration_snapshot, current_snapshot
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(ParcelModel).where(ParcelModel.user_session_id == user_session_id))
+        await connection.execute(delete(ExchangeRateModel).where(
+            ExchangeRateModel.snapshot_id.in_([registration_snapshot.snapshot_id, current_snapshot.snapshot_id])
+        ))
+
+
+async def parcel_snapshots(engine, parcel_ids) -> set:
+    async with AsyncSession(engine) as db:
+        result = await db.execute(
+            select(ParcelModel.rate_snapshot_id, ParcelModel.shipping_cost).where(ParcelModel.id.in_(parcel_ids))
+        )
+        return set(result.all())
+
+
+@pytest.mark.asyncio
+async def test_range_update_uses_registration_rate(engine, registration_setup):
+    """Диапазон очереди (задача воркера Celery) считается по курсу регистрации, а не по текущему"""
+    parcel_ids, registration_snapshot, current_snapshot = registration_setup
+    async with AsyncSession(engine) as db:
+        service = ShippingCostsUpdateService(db, mode="chunked", rate_policy="registration")
+        updated = await service.update_shipping_costs_range(current_snapshot, parcel_ids[0], str(ulid.new()))
+    assert updated >= len(parcel_ids)
+
+    snapshots = await parcel_snapshots(engine, parcel_ids)
+    assert {snapshot_id for snapshot_id, _ in snapshots} == {registration_snapshot.snapshot_id}
+    assert all(shipping_cost is not None for _, shipping_cost in snapshots)
+
+    # Новый курс не делает устаревшими цены по курсу регистрации
+    async with AsyncSession(engine) as db:
+        await ShippingCostsUpdateService(db, rate_policy="registration").reprice_stale(current_snapshot)
+    assert await parcel_snapshots(engine, parcel_ids) == snapshots
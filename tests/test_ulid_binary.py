@@ -0,0 +1,88 @@
+"""
+Модуль: tests/test_ulid_binary
+
+Проверяет тип колонки ULIDBinary (models.types): ULID-строка переводится в BINARY(16) и обратно без потерь,
+а порядок байтов совпадает с порядком текстовой формы. На этом порядке держатся пагинация по курсору,
+диапазоны очереди пересчета и сравнения снимков курса. Также проверяется, что схема диапазона пересчета
+отклоняет некорректные ULID до запроса к БД.
+
+Не требует ни БД, ни Redis.
+"""
+import os
+import random
+import sys
+
+import pytest
+import ulid
+from dotenv import load_dotenv
+from pydantic import ValidationError
+
+load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp", "src"))
+
+from models.types import ULIDBinary  # noqa: E402
+from schemas.shipping_costs import ShippingCostsRangeSchema  # noqa: E402
+
+ULID_TYPE = ULIDBinary()
+
+
+def random_ulids(count: int) -> list[str]:
+    rnd = random.Random(count)
+    # Случайные 128 бит покрывают все пространство ULID, а ULID по текущему времени - общие старшие символы
+    return [
+        *(ulid.from_bytes(rnd.randbytes(16)).str for _ in range(count)),
+        *(str(ulid.new()) for _ in range(count)),
+    ]
+
+
+def bind(value: str) -> bytes:
+    return ULID_TYPE.process_bind_param(value, None)
+
+
+def result(value: bytes) -> str:
+    return ULID_TYPE.process_result_value(value, None)
+
+
+def test_round_trip():
+    """Строка -> BINARY(16) -> строка без потерь, None остается None"""
+    for parcel_id in random_ulids(1000):
+        value = bind(parcel_id)
+        assert isinstance(value, bytes) and len(value) == 16
+        assert result(value) == parcel_id
+    assert bind(None) is None
+    assert result(None) is None
+
+
+def test_lowercase_input():
+    """Регистр строки при записи не важен, результат - в верхнем регистре"""
+    for parcel_id in random_ulids(100):
+        assert bind(parcel_id.lower()) == bind(parcel_id)
+        assert result(bind(parcel_id.lower())) == parcel_id
+
+
+def test_byte_order_matches_text_order():
+    """Побайтовая сортировка (как в MySQL) совпадает с сортировкой текстовой формы"""
+    parcel_ids = random_ulids(2000)
+    by_bytes = [result(value) for value in sorted(bind(parcel_id) for parcel_id in parcel_ids)]
+    assert by_bytes == sorted(parcel_ids)
+    for first, second in zip(parcel_ids, parcel_ids[1:]):
+        assert (bind(first) < bind(second)) == (first < second)
+
+
+@pytest.mark.parametrize("start_id", [
+    "01ARZ3NDEKTSV4RRFFQ69G5FAI",  # символ вне алфавита Crockford
+    "81ARZ3NDEKTSV4RRFFQ69G5FAV",  # больше 128 бит
+    "01ARZ3NDEKTSV4RRFFQ69G5FA-",
+])
+def test_range_schema_rejects_malformed_ulid(start_id):
+    """Некорректный ULID в 26 символов отклоняется схемой (422), а не ошибкой в запросе к БД (500)"""
+    with pytest.raises(ValidationError):
+        ShippingCostsRangeSchema(start_id=start_id)
+    with pytest.raises(ValidationError):
+        ShippingCostsRangeSchema(start_id=str(ulid.new()), end_id=start_id)
+
+
+def test_range_schema_accepts_ulid():
+    """Корректные границы принимаются в любом регистре"""
+    start_id, end_id = str(ulid.new()), str(ulid.new())
+    assert ShippingCostsRangeSchema(start_id=start_id.lower(), end_id=end_id).end_id == end_id
@@ -30,6 +30,8 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from models.parcel_type import ParcelTypeModel  # type: ignore
 from models.parcel import ParcelModel  # type: ignore
+from models.parcel_tariff import ParcelTariffModel  # type: ignore
+from models.exchange_rate import ExchangeRateModel  # type: ignore
 from models.base import Base, DATABASE_CREDS # type: ignore
 
 
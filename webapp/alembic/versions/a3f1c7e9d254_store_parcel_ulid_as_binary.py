@@ -0,0 +1,163 @@
+"""Store parcel ULID as BINARY(16)
+
+Revision ID: a3f1c7e9d254
+Revises: e8b2f4a6c913
+Create Date: 2026-10-17 18:42:10.318604
+
+В отличие от 9f7c6009b542, где тип id менялся одним ALTER, перенос выполняется без остановки таблицы:
+    1. Добавляется колонка id_bin BINARY(16) NULL и триггер, который заполняет ее для новых посылок.
+    2. Существующие посылки заполняются порциями по BATCH_SIZE по курсору первичного ключа,
+       каждая порция - отдельная короткая транзакция.
+    3. id_bin становится NOT NULL, по ней строятся копии составных индексов (чтение и запись продолжаются).
+    4. Первичный ключ переносится на id_bin с перестроением таблицы без блокировки записи. Триггер,
+       текстовая колонка id и новый уникальный индекс по ней остаются, поэтому работающая версия
+       приложения во время перестроения и после него регистрирует и читает посылки по ULID как раньше.
+    5. Старые составные индексы удаляются (без перестроения таблицы).
+    6. Переключение: удаляются уникальный индекс по текстовому id (без перестроения таблицы) и триггер,
+       затем текстовая колонка удаляется, id_bin переименовывается в id, индексы - в прежние имена
+       одним ALTER ALGORITHM=INSTANT (MySQL 8.0.29+), без перестроения таблицы.
+
+Регистрация посылок старой версией приложения перестает работать только на шаге 6 (колонка id меняет тип),
+поэтому приложение обновляется сразу после миграции (сервис migrate в docker-compose).
+Миграция не поддерживает offline-режим (--sql): границы порций выбираются запросами.
+
+ULID переводится из текста в 16 байт на стороне MySQL: алфавит Crockford base32 заменяется на алфавит
+CONV (0-9A-V), строка переводится в шестнадцатеричную форму группами, не выходящими за 64 бита
+(2 символа в 3 цифры, затем по 4 символа в 5 цифр), старшая нулевая цифра отбрасывается.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c7e9d254'
+down_revision: Union[str, None] = 'e8b2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+TRIGGER_NAME = 'parcels_id_bin_before_insert'
+TEXT_ID_INDEX = 'ix_parcels_id_text'
+
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+CONV_BASE32 = '0123456789ABCDEFGHIJKLMNOPQRSTUV'
+
+# Составные индексы с id (модель ParcelModel, миграция e8b2f4a6c913)
+INDEXES = {
+    'ix_parcels_user_session_id_id': ['user_session_id', 'id'],
+    'ix_parcels_user_session_id_parcel_type_id_id': ['user_session_id', 'parcel_type_id', 'id'],
+    'ix_parcels_shipping_cost_id': ['shipping_cost', 'id'],
+}
+
+
+def ulid_text_to_binary_sql(column: str) -> str:
+    """SQL-выражение: ULID из строки в 26 символов в BINARY(16)."""
+    text = f'UPPER({column})'
+    # Буквы заменяются по возрастанию: каждая заменяется на предыдущую, уже обработанную
+    for crockford, conv in zip(CROCKFORD_BASE32, CONV_BASE32):
+        if crockford != conv:
+            text = f"REPLACE({text}, '{crockford}', '{conv}')"
+    groups = [f"LPAD(CONV(SUBSTRING({text}, 1, 2), 32, 16), 3, '0')"] + [
+        f"LPAD(CONV(SUBSTRING({text}, {start}, 4), 32, 16), 5, '0')" for start in range(3, 27, 4)
+    ]
+    return f"UNHEX(SUBSTRING(CONCAT({', '.join(groups)}), 2))"
+
+
+def ulid_binary_to_text_sql(column: str) -> str:
+    """SQL-выражение: ULID из BINARY(16) в строку в 26 символов."""
+    digits = f"CONCAT('0', HEX({column}))"
+    groups = [f"LPAD(CONV(SUBSTRING({digits}, 1, 3), 16, 32), 2, '0')"] + [
+        f"LPAD(CONV(SUBSTRING({digits}, {start}, 5), 16, 32), 4, '0')" for start in range(4, 34, 5)
+    ]
+    text = f"CONCAT({', '.join(groups)})"
+    # Буквы заменяются по убыванию: каждая заменяется на следующую, уже обработанную
+    for crockford, conv in reversed(list(zip(CROCKFORD_BASE32, CONV_BASE32))):
+        if crockford != conv:
+            text = f"REPLACE({text}, '{conv}', '{crockford}')"
+    return text
+
+
+def backfill(target: str, expression: str, key: str) -> None:
+    """
+    Заполняет колонку target значением expression порциями по BATCH_SIZE строк в порядке первичного ключа key.
+    Каждая порция коммитится отдельно, блокируется только диапазон ключей порции.
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        after_last = ''
+        params = {}
+        while True:
+            upper = connection.execute(
+                sa.text(
+                    f'SELECT MAX({key}) FROM '
+                    f'(SELECT {key} FROM parcels WHERE TRUE{after_last} ORDER BY {key} LIMIT :batch_size) AS chunk'
+                ),
+                {**params, 'batch_size': BATCH_SIZE}
+            ).scalar()
+            if upper is None:
+                break
+            connection.execute(
+                sa.text(f'UPDATE parcels SET {target} = {expression} WHERE {key} <= :upper{after_last}'),
+                {**params, 'upper': upper}
+            )
+            after_last = f' AND {key} > :last'
+            params = {'last': upper}
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE parcels ADD COLUMN id_bin BINARY(16) NULL, ALGORITHM=INSTANT')
+    op.execute(
+        f'CREATE TRIGGER {TRIGGER_NAME} BEFORE INSERT ON parcels FOR EACH ROW '
+        f'SET NEW.id_bin = {ulid_text_to_binary_sql("NEW.id")}'
+    )
+
+    backfill('id_bin', ulid_text_to_binary_sql('id'), 'id')
+
+    missing = op.get_bind().execute(sa.text('SELECT COUNT(*) FROM parcels WHERE id_bin IS NULL')).scalar()
+    if missing:
+        raise RuntimeError(f'После заполнения id_bin осталось {missing} посылок без значения')
+
+    # Новые посылки получают id_bin триггером до проверки NOT NULL
+    op.execute('ALTER TABLE parcels MODIFY id_bin BINARY(16) NOT NULL, ALGORITHM=INPLACE, LOCK=NONE')
+    for name, columns in INDEXES.items():
+        columns = ', '.join('id_bin' if column == 'id' else column for column in columns)
+        op.execute(f'ALTER TABLE parcels ADD INDEX {name}_bin ({columns}), ALGORITHM=INPLACE, LOCK=NONE')
+
+    # Перестроение таблицы с новым первичным ключом. Триггер продолжает заполнять id_bin новых посылок,
+    # уникальный индекс по текстовому id нужен старой версии приложения для чтения посылки по ULID
+    op.execute(
+        f'ALTER TABLE parcels DROP PRIMARY KEY, ADD PRIMARY KEY (id_bin), ADD UNIQUE INDEX {TEXT_ID_INDEX} (id), '
+        'ALGORITHM=INPLACE, LOCK=NONE'
+    )
+    op.execute(
+        'ALTER TABLE parcels '
+        + ''.join(f'DROP INDEX {name}, ' for name in INDEXES)
+        + 'ALGORITHM=INPLACE, LOCK=NONE'
+    )
+
+    # Переключение. Уникальный индекс по текстовому id удаляется только здесь: до этого старая версия
+    # приложения читает посылку по ULID по индексу, а не полным сканированием
+    op.execute(f'ALTER TABLE parcels DROP INDEX {TEXT_ID_INDEX}, ALGORITHM=INPLACE, LOCK=NONE')
+    op.execute(f'DROP TRIGGER {TRIGGER_NAME}')
+    op.execute(
+        'ALTER TABLE parcels DROP COLUMN id, RENAME COLUMN id_bin TO id, '
+        + ''.join(f'RENAME INDEX {name}_bin TO {name}, ' for name in INDEXES)
+        + 'ALGORITHM=INSTANT'
+    )
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE parcels ADD COLUMN id_text VARCHAR(26) NULL, ALGORITHM=INSTANT')
+    backfill('id_text', ulid_binary_to_text_sql('id'), 'id')
+
+    op.execute('ALTER TABLE parcels MODIFY id_text VARCHAR(26) NOT NULL')
+    op.execute(
+        'ALTER TABLE parcels DROP PRIMARY KEY, ADD PRIMARY KEY (id_text), '
+        + ''.join(f'DROP INDEX {name}, ' for name in INDEXES)
+        + 'DROP COLUMN id'
+    )
+    op.execute('ALTER TABLE parcels RENAME COLUMN id_text TO id')
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'parcels', columns, unique=False)
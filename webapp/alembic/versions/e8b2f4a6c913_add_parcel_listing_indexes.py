@@ -0,0 +1,36 @@
+"""Add composite indexes for parcel listing and shipping cost backlog
+
+Revision ID: e8b2f4a6c913
+Revises: d5a7e3f19b42
+Create Date: 2026-10-17 17:05:33.214907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2f4a6c913'
+down_revision: Union[str, None] = 'd5a7e3f19b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_parcels_user_session_id_id', 'parcels', ['user_session_id', 'id'], unique=False)
+    op.create_index(
+        'ix_parcels_user_session_id_parcel_type_id_id', 'parcels',
+        ['user_session_id', 'parcel_type_id', 'id'], unique=False
+    )
+    op.create_index('ix_parcels_shipping_cost_id', 'parcels', ['shipping_cost', 'id'], unique=False)
+    # Левый префикс (user_session_id, id), отдельный индекс по user_session_id больше не нужен
+    op.drop_index('ix_parcels_user_session_id', table_name='parcels')
+
+
+def downgrade() -> None:
+    op.create_index('ix_parcels_user_session_id', 'parcels', ['user_session_id'], unique=False)
+    op.drop_index('ix_parcels_shipping_cost_id', table_name='parcels')
+    op.drop_index('ix_parcels_user_session_id_parcel_type_id_id', table_name='parcels')
+    op.drop_index('ix_parcels_user_session_id_id', table_name='parcels')
@@ -19,6 +19,10 @@
 - /api/parcels: Обработка запросов, связанных с посылками.
 - /api/parcel-types: Обработка запросов, связанных с типами посылок.
 
+Lifespan:
+
+- lifespan.lifespan: Инициализация пула соединений Redis (нужен для расчета стоимости доставки при регистрации).
+
 Используемые зависимости:
 
 - FastAPI: Основной фреймворк для построения приложения.
@@ -36,13 +40,14 @@ from routes import parcels
 from routes import parcel_types
 from routes import healthy
 from exceptions.error_handlers import register_http_error_handlers
+from lifespan import lifespan
 
 
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 register_http_error_handlers(app)
 
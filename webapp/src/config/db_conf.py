@@ -0,0 +1,23 @@
+"""
+Модуль: config.db_conf
+
+Адреса основной БД и реплики (DATABASE_HOST, DATABASE_REPLICA_HOST) задаются в models.base.
+"""
+import os
+
+# Пул соединений MySQL на процесс (отдельно для основной БД и для реплики, если она задана).
+# Процесс держит до DATABASE_POOL_SIZE соединений и открывает еще до DATABASE_MAX_OVERFLOW при пиках;
+# при исчерпании пула запрос ждет соединение до DATABASE_POOL_TIMEOUT секунд.
+# Соединения старше DATABASE_POOL_RECYCLE секунд пересоздаются (до wait_timeout MySQL и таймаутов прокси),
+# а DATABASE_POOL_PRE_PING проверяет соединение перед выдачей из пула.
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 10))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+
+# Чтение своих записей при работе с репликой: после регистрации посылки cookie READ_PRIMARY_COOKIE
+# направляет чтения этой сессии в основную БД на DATABASE_READ_YOUR_WRITES_WINDOW секунд
+# (с запасом больше обычной задержки репликации).
+READ_PRIMARY_COOKIE = "read_primary_until"
+DATABASE_READ_YOUR_WRITES_WINDOW = int(os.getenv("DATABASE_READ_YOUR_WRITES_WINDOW", 10))
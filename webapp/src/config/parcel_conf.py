@@ -0,0 +1,41 @@
+"""
+Модуль: config.parcel_conf
+"""
+import os
+
+# Кэш карточек посылок для GET /api/parcels/{parcel_id}/ (services.parcel_cache). Посылка с рассчитанной
+# стоимостью доставки меняется только при пересчете устаревших цен, который удаляет ее карточку,
+# поэтому живет в кэше долго. Посылка без стоимости - недолго: стоимость может быть рассчитана в любой момент.
+PARCEL_CACHE_KEY_PREFIX = "parcel:"
+PARCEL_CACHE_TTL = int(os.getenv("PARCEL_CACHE_TTL", 86400))
+PARCEL_CACHE_UNPRICED_TTL = int(os.getenv("PARCEL_CACHE_UNPRICED_TTL", 60))
+# Пересчет заменяет карточку меткой удаления на PARCEL_CACHE_INVALIDATION_TTL секунд, и пока метка жива,
+# карточка посылки в кэш не записывается: запрос, прочитавший посылку до коммита пересчета, не вернет
+# в кэш старую цену, а отстающая реплика - цену, которую пересчет уже заменил. Время жизни метки должно
+# превышать время обработки запроса чтения посылки и задержку репликации.
+PARCEL_CACHE_INVALIDATED = "invalidated"
+PARCEL_CACHE_INVALIDATION_TTL = int(os.getenv("PARCEL_CACHE_INVALIDATION_TTL", 30))
+
+# Фильтр Блума зарегистрированных ULID посылок в Redis (services.parcel_id_filter): GET /api/parcels/{parcel_id}/
+# отвечает 404 без обращения к MySQL, если посылки с таким ULID точно нет. Размер битовой карты и число
+# хеш-функций вычисляются по ожидаемому числу посылок и допустимой доле ложных срабатываний; смена параметров
+# меняет ключ фильтра, и до перестроения (rebuild) фильтр не используется.
+PARCEL_ID_FILTER_REDIS_KEY = "parcel_ids_bloom"
+PARCEL_ID_FILTER_CAPACITY = int(os.getenv("PARCEL_ID_FILTER_CAPACITY", 10_000_000))
+PARCEL_ID_FILTER_ERROR_RATE = float(os.getenv("PARCEL_ID_FILTER_ERROR_RATE", 0.001))
+PARCEL_ID_FILTER_REBUILD_BATCH_SIZE = int(os.getenv("PARCEL_ID_FILTER_REBUILD_BATCH_SIZE", 10000))
+# Признак готовности фильтра живет PARCEL_ID_FILTER_READY_TTL секунд и продлевается периодическим перестроением
+# (Celery, PARCEL_ID_FILTER_REBUILD_INTERVAL). Если ULID не удалось добавить в фильтр, а отключить фильтр тоже
+# не удалось (Redis недоступен), фильтр отключится сам не позже чем через это время.
+PARCEL_ID_FILTER_READY_TTL = int(os.getenv("PARCEL_ID_FILTER_READY_TTL", 7200))
+# Допустимое опережение временной метки ULID относительно часов сервера в секундах: ULID из будущего
+# не мог быть выдан, и такой запрос отклоняется без обращения к Redis и БД
+PARCEL_ID_MAX_CLOCK_SKEW = int(os.getenv("PARCEL_ID_MAX_CLOCK_SKEW", 60))
+
+# Пагинация списка посылок GET /api/parcels/: основной способ - курсор (ULID последней посылки страницы),
+# смещение (offset) оставлено для совместимости и ограничено, так как MySQL читает и отбрасывает offset строк
+PARCEL_LIST_MAX_OFFSET = int(os.getenv("PARCEL_LIST_MAX_OFFSET", 1000))
+
+# Максимальное количество посылок в одном запросе пакетной регистрации (/api/parcels/batch).
+# Посылки пакета записываются одним INSERT, по 9 параметров на посылку (лимит MySQL - 65535 параметров)
+PARCEL_REGISTER_MAX_BATCH_SIZE = int(os.getenv("PARCEL_REGISTER_MAX_BATCH_SIZE", 500))
@@ -2,14 +2,87 @@
 Модуль: config.pricing_conf
 """
 import os
+from decimal import Decimal
 
 # Константы
 USD_EXCHANGE_API_URL = os.getenv("USD_EXCHANGE_API_URL", "https://www.cbr-xml-daily.ru/daily_json.js")
 USD_EXCHANGE_CACHE_EXPIRE = int(os.getenv("USD_EXCHANGE_INTERVAL", 3600))  # Время жизни кэша курса в секундах (1 час)
+# Stale-while-revalidate: после USD_EXCHANGE_CACHE_EXPIRE (мягкое истечение) курс еще отдается, а одна фоновая
+# задача его обновляет. Ключи курса в Redis живут до жесткого истечения USD_EXCHANGE_HARD_EXPIRE,
+# только после него вызывающие ждут обновления курса.
+USD_EXCHANGE_HARD_EXPIRE = int(os.getenv("USD_EXCHANGE_HARD_EXPIRE", USD_EXCHANGE_CACHE_EXPIRE * 6))
 
-USD_RUB_REDIS_KEY="usd_rub_exchange_rate"
+# Таймауты и размер пула HTTP-клиента для провайдера курса (в секундах и соединениях)
+USD_EXCHANGE_CONNECT_TIMEOUT = float(os.getenv("USD_EXCHANGE_CONNECT_TIMEOUT", 3))
+USD_EXCHANGE_READ_TIMEOUT = float(os.getenv("USD_EXCHANGE_READ_TIMEOUT", 10))
+USD_EXCHANGE_MAX_CONNECTIONS = int(os.getenv("USD_EXCHANGE_MAX_CONNECTIONS", 4))
 
-# Помещаем данные для редиса, потому что в теории могут использоваться другие инстансы для других задач
-REDIS_HOST = os.getenv("REDIS_HOST", "redis")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-REDIS_MAX_CONNECTIONS = 10
+# Снимок курсов всех валют документа провайдера одним хешем: код валюты -> рублей за единицу валюты,
+# плюс ULID снимка (новый при каждом обновлении курса). Хеш заменяется целиком одной транзакцией
+EXCHANGE_RATES_REDIS_KEY = "exchange_rates"
+EXCHANGE_RATES_SNAPSHOT_FIELD = "snapshot_id"
+USD_CURRENCY_CODE = "USD"
+# Время мягкого истечения курса (unix timestamp), записывается вместе с курсом
+USD_RUB_SOFT_EXPIRY_REDIS_KEY = "usd_rub_exchange_rate_soft_expiry"
+# ETag и Last-Modified последнего ответа провайдера для условных запросов, живут столько же, сколько курс
+USD_RUB_ETAG_REDIS_KEY = "usd_rub_exchange_rate_etag"
+USD_RUB_LAST_MODIFIED_REDIS_KEY = "usd_rub_exchange_rate_last_modified"
+
+# Последний известный снимок курса без времени жизни: отдается, если курс истек, а обновить его не удалось
+USD_RUB_LAST_KNOWN_REDIS_KEY = "usd_rub_exchange_rate_last_known"
+
+# Аренда на обновление курса при промахе кэша: курс запрашивает только процесс, получивший аренду,
+# остальные ждут до RATE_REFRESH_WAIT секунд, проверяя Redis раз в RATE_REFRESH_POLL_INTERVAL секунд.
+# Время жизни аренды должно превышать таймауты запроса курса.
+RATE_REFRESH_LEASE_REDIS_KEY = "usd_rub_exchange_rate_refresh_lease"
+RATE_REFRESH_LEASE_EXPIRE = int(os.getenv("RATE_REFRESH_LEASE_EXPIRE", 15))
+RATE_REFRESH_WAIT = float(os.getenv("RATE_REFRESH_WAIT", 15))
+RATE_REFRESH_POLL_INTERVAL = float(os.getenv("RATE_REFRESH_POLL_INTERVAL", 0.2))
+
+# Курс также кэшируется в памяти каждого процесса (services.rate_local_cache) не дольше RATE_LOCAL_CACHE_TTL
+# секунд и не дольше оставшегося времени жизни ключа в Redis. При обновлении курса процессы получают
+# сообщение в канал USD_RUB_UPDATES_CHANNEL и сбрасывают локальную копию.
+RATE_LOCAL_CACHE_TTL = int(os.getenv("RATE_LOCAL_CACHE_TTL", 60))
+USD_RUB_UPDATES_CHANNEL = "usd_rub_exchange_rate_updates"
+
+# Коэффициенты формулы расчета стоимости доставки по умолчанию (для типов посылок без тарифа в parcel_tariffs):
+# (вес в кг * SHIPPING_COST_PER_KG + стоимость в долларах * SHIPPING_COST_VALUE_RATE) * курс USD/RUB
+SHIPPING_COST_PER_KG = Decimal("0.5")
+SHIPPING_COST_VALUE_RATE = Decimal("0.01")
+
+# Версия тарифов в Redis. Меняется после правки таблицы parcel_tariffs, и каждый процесс перезагружает
+# свой кэш тарифов. Проверка версии выполняется в фоне раз в TARIFF_CACHE_REFRESH_INTERVAL секунд.
+TARIFFS_VERSION_REDIS_KEY = "parcel_tariffs_version"
+TARIFF_CACHE_REFRESH_INTERVAL = int(os.getenv("TARIFF_CACHE_REFRESH_INTERVAL", 30))
+
+# Версия справочника типов посылок в Redis. Меняется после правки таблицы parcel_types, и каждый процесс
+# перезагружает свой справочник. Проверка версии выполняется в фоне раз в PARCEL_TYPES_REFRESH_INTERVAL секунд.
+PARCEL_TYPES_VERSION_REDIS_KEY = "parcel_types_version"
+PARCEL_TYPES_REFRESH_INTERVAL = int(os.getenv("PARCEL_TYPES_REFRESH_INTERVAL", 30))
+
+# Максимальное количество посылок в одном запросе пакетного расчета стоимости доставки (/api/parcels/quote/batch)
+PARCEL_QUOTE_MAX_BATCH_SIZE = int(os.getenv("PARCEL_QUOTE_MAX_BATCH_SIZE", 100))
+
+# Версия формулы расчета стоимости доставки. Записывается в каждую посылку вместе со снимком курса.
+# Увеличение версии делает все ранее рассчитанные посылки устаревшими для пересчета устаревших цен.
+PRICING_FORMULA_VERSION = int(os.getenv("PRICING_FORMULA_VERSION", 1))
+
+# Режим пересчета стоимости доставки:
+#   - "chunked": обход посылок без стоимости порциями по курсору ULID, коммит после каждой порции (по умолчанию);
+#   - "sql": формула считается на стороне БД одним UPDATE ... WHERE shipping_cost IS NULL;
+#   - "orm": порции считаются пакетно на стороне приложения и записываются bulk UPDATE по id (запасной вариант).
+SHIPPING_COST_UPDATE_MODE = os.getenv("SHIPPING_COST_UPDATE_MODE", "chunked")
+
+# По какому курсу считается стоимость доставки посылок без стоимости:
+#   - "current": по текущему курсу (по умолчанию);
+#   - "registration": по курсу из истории курсов, действовавшему при регистрации посылки
+#     (если посылка старше истории - по текущему). Расчет выполняется на стороне приложения (режим "orm").
+SHIPPING_COST_RATE_POLICY = os.getenv("SHIPPING_COST_RATE_POLICY", "current")
+
+# Размер порции для режима "chunked": сколько посылок обновляется в одной транзакции
+SHIPPING_COST_UPDATE_BATCH_SIZE = int(os.getenv("SHIPPING_COST_UPDATE_BATCH_SIZE", 1000))
+
+# Ключ Redis с ULID последней закоммиченной порции, чтобы продолжить прерванный пересчет.
+# Время жизни ограничено, чтобы забытый курсор не влиял на пересчеты в будущем.
+SHIPPING_COST_CURSOR_REDIS_KEY = "shipping_costs_update_cursor"
+SHIPPING_COST_CURSOR_EXPIRE = int(os.getenv("SHIPPING_COST_CURSOR_EXPIRE", 86400))
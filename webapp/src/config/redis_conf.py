@@ -0,0 +1,15 @@
+"""
+Модуль: config.redis_conf
+"""
+import os
+
+# Помещаем данные для редиса, потому что в теории могут использоваться другие инстансы для других задач
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Пул соединений Redis один на процесс (BlockingConnectionPool): при исчерпании пула запрос ждет
+# свободное соединение до REDIS_POOL_TIMEOUT секунд, а не получает ошибку сразу.
+# Размер пула подбирается по метрикам /api/healthy/redis-pool (занятые соединения, ожидание, таймауты).
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 2))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5))
@@ -83,4 +83,19 @@ class UnauthorizedResponse(ErrorResponse):
     detail: str = Field(
         "Пользовательская сессия не установлена",
         description="Стандартное сообщение для неавторизованного доступа."
-    )
\ No newline at end of file
+    )
+
+
+class ServiceUnavailableResponse(ErrorResponse):
+    """
+    Сообщение об ошибке 503 Service Unavailable.
+
+    Attributes:
+
+        detail (str): Описание ошибки.
+        path (str): Путь, в котором возникла ошибка.
+    """
+    detail: str = Field(
+        "Сервис временно недоступен",
+        description="Стандартное сообщение, когда для ответа не хватает данных (например, курса валют)."
+    )
@@ -11,4 +11,10 @@ class ParcelDatabaseError(Exception):
     pass
 
 class ParcelValidationError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ParcelTypeNotFoundError(Exception):
+    pass
+
+class ShippingCostUnavailableError(Exception):
+    pass
@@ -7,6 +7,7 @@
 
 Классы:
     ICacheService: Протокол, задающий интерфейс для работы с кэшем курса валют.
+    ICachePipeline: Протокол конвейера команд кэша (команды отправляются за одно обращение).
 
 Методы:
     get_value(self, key: str) -> str | None:
@@ -14,9 +15,107 @@
 
     set_value(self, key: str, value: str, expire: int | None) -> None:
         Асинхронный метод для записи значения в кэш с указанием времени жизни ключа.
+
+    set_if_absent(self, key: str, value: str, expire: int | None) -> bool:
+        Асинхронный метод для записи значения, только если ключа еще нет (например, для аренды).
+
+    delete_value(self, key: str) -> None:
+        Асинхронный метод для удаления значения из кэша по ключу.
+
+    expire_value(self, key: str, expire: int) -> bool:
+        Асинхронный метод для продления времени жизни ключа.
+
+    get_ttl(self, key: str) -> int | None:
+        Асинхронный метод для получения оставшегося времени жизни ключа.
+
+    get_many(self, keys: Sequence[str]) -> list[str | None]:
+        Асинхронный метод для получения значений нескольких ключей за одно обращение.
+
+    set_many(self, values: Mapping[str, str], expire: int | None | Mapping[str, int | None]) -> None:
+        Асинхронный метод для записи нескольких значений за одно обращение, с общим временем жизни или по ключу.
+
+    increment(self, key: str, amount: int, expire: int | None) -> int:
+        Асинхронный метод для атомарного увеличения счетчика.
+
+    pipeline(self, transaction: bool) -> ICachePipeline:
+        Создает конвейер команд, выполняемых за одно обращение (и атомарно при transaction=True).
+
+    get_hash(self, key: str) -> dict[str, str]:
+        Асинхронный метод для получения всех полей хеша.
+
+    set_hash(self, key: str, mapping: dict[str, str], expire: int | None) -> None:
+        Асинхронный метод для атомарной замены хеша (например, снимка курсов всех валют).
+
+    get_hash_fields(self, key: str, *fields: str) -> list[str | None]:
+        Асинхронный метод для получения нескольких полей хеша за одно обращение.
+
+    get_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        Асинхронный метод для чтения нескольких битов битовой карты за одно обращение.
+
+    set_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        Асинхронный метод для установки нескольких битов битовой карты за одно обращение (например, фильтра Блума).
+
+    publish(self, channel: str, message: str) -> None:
+        Асинхронный метод для публикации сообщения подписчикам кэша (например, об обновлении курса).
 """
 
-from typing import Protocol
+from typing import Any, Mapping, Protocol, Sequence
+
+
+class ICachePipeline(Protocol):
+    """
+    Протокол конвейера команд кэша. Команды накапливаются и выполняются за одно обращение в execute,
+    каждая команда дает ровно один результат.
+    """
+
+    def get_value(self, key: str) -> "ICachePipeline":
+        """Добавить чтение значения (результат - значение или None)."""
+        ...
+
+    def set_value(self, key: str, value: str, expire: int | None = None) -> "ICachePipeline":
+        """Добавить запись значения с временем жизни в секундах (если указано)."""
+        ...
+
+    def delete_value(self, key: str) -> "ICachePipeline":
+        """Добавить удаление значения."""
+        ...
+
+    def expire_value(self, key: str, expire: int) -> "ICachePipeline":
+        """Добавить продление времени жизни ключа (результат - существует ли ключ)."""
+        ...
+
+    def get_ttl(self, key: str) -> "ICachePipeline":
+        """Добавить чтение оставшегося времени жизни ключа (результат - секунды, -1 без времени жизни, -2 если ключа нет)."""
+        ...
+
+    def increment(self, key: str, amount: int = 1) -> "ICachePipeline":
+        """Добавить увеличение счетчика (результат - новое значение)."""
+        ...
+
+    def set_hash_fields(self, key: str, mapping: Mapping[str, str]) -> "ICachePipeline":
+        """Добавить запись полей хеша (остальные поля не меняются)."""
+        ...
+
+    def get_hash_fields(self, key: str, *fields: str) -> "ICachePipeline":
+        """Добавить чтение полей хеша (результат - список значений или None в порядке полей)."""
+        ...
+
+    def get_bits(self, key: str, offsets: Sequence[int]) -> "ICachePipeline":
+        """Добавить чтение битов битовой карты (результат - список 0 и 1 в порядке смещений)."""
+        ...
+
+    def set_bits(self, key: str, offsets: Sequence[int]) -> "ICachePipeline":
+        """Добавить установку битов битовой карты в 1 (результат - прежние значения битов)."""
+        ...
+
+    async def execute(self) -> list[Any]:
+        """
+        Выполнить накопленные команды.
+
+        Returns:
+            list[Any]: Результаты команд в порядке их добавления.
+        """
+        ...
 
 
 class ICacheService(Protocol):
@@ -43,3 +142,176 @@ class ICacheService(Protocol):
             expire (int): Время жизни ключа в секундах.
         """
         ...
+
+    async def set_if_absent(self, key: str, value: str, expire: int | None = None) -> bool:
+        """
+        Сохранить значение, только если ключа еще нет.
+
+        Args:
+            key (str): Ключ для сохранения значения.
+            value (str): Значение для сохранения.
+            expire (int): Время жизни ключа в секундах.
+
+        Returns:
+            bool: True, если значение сохранено.
+        """
+        ...
+
+    async def delete_value(self, key: str) -> None:
+        """
+        Удалить значение из кэша.
+
+        Args:
+            key (str): Ключ, значение по которому нужно удалить.
+        """
+        ...
+
+    async def expire_value(self, key: str, expire: int) -> bool:
+        """
+        Продлить время жизни ключа.
+
+        Args:
+            key (str): Ключ.
+            expire (int): Новое время жизни в секундах.
+
+        Returns:
+            bool: True, если ключ существует и время жизни установлено.
+        """
+        ...
+
+    async def get_ttl(self, key: str) -> int | None:
+        """
+        Получить оставшееся время жизни ключа.
+
+        Args:
+            key (str): Ключ.
+
+        Returns:
+            int | None: Оставшееся время жизни в секундах или None, если ключа нет или время жизни не задано.
+        """
+        ...
+
+    async def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        """
+        Получить значения нескольких ключей за одно обращение.
+
+        Args:
+            keys (Sequence[str]): Ключи.
+
+        Returns:
+            list[str | None]: Значения в порядке ключей, None для отсутствующих.
+        """
+        ...
+
+    async def set_many(
+            self,
+            values: Mapping[str, str],
+            expire: int | None | Mapping[str, int | None] = None
+    ) -> None:
+        """
+        Сохранить несколько значений за одно обращение.
+
+        Args:
+            values (Mapping[str, str]): Значения по ключам.
+            expire (int | None | Mapping[str, int | None]): Время жизни в секундах, общее или по ключу.
+        """
+        ...
+
+    async def increment(self, key: str, amount: int = 1, expire: int | None = None) -> int:
+        """
+        Атомарно увеличить счетчик.
+
+        Args:
+            key (str): Ключ счетчика.
+            amount (int): Величина увеличения.
+            expire (int): Время жизни в секундах, задается при создании счетчика.
+
+        Returns:
+            int: Новое значение счетчика.
+        """
+        ...
+
+    def pipeline(self, transaction: bool = True) -> ICachePipeline:
+        """
+        Создать конвейер команд.
+
+        Args:
+            transaction (bool): Выполнить команды атомарно.
+
+        Returns:
+            ICachePipeline: Конвейер команд.
+        """
+        ...
+
+    async def get_hash(self, key: str) -> dict[str, str]:
+        """
+        Получить все поля хеша.
+
+        Args:
+            key (str): Ключ хеша.
+
+        Returns:
+            dict[str, str]: Поля и значения хеша, пустой словарь, если хеша нет.
+        """
+        ...
+
+    async def set_hash(self, key: str, mapping: dict[str, str], expire: int | None = None) -> None:
+        """
+        Атомарно заменить хеш: старые поля удаляются, новые записываются.
+
+        Args:
+            key (str): Ключ хеша.
+            mapping (dict[str, str]): Поля и значения хеша.
+            expire (int): Время жизни ключа в секундах.
+        """
+        ...
+
+    async def get_hash_fields(self, key: str, *fields: str) -> list[str | None]:
+        """
+        Получить несколько полей хеша за одно обращение.
+
+        Args:
+            key (str): Ключ хеша.
+            *fields (str): Поля хеша.
+
+        Returns:
+            list[str | None]: Значения полей в том же порядке, None для отсутствующих.
+        """
+        ...
+
+    async def get_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        """
+        Прочитать несколько битов битовой карты за одно обращение.
+        В отличие от чтения значений, ошибка кэша не заменяется значением по умолчанию, а пробрасывается.
+
+        Args:
+            key (str): Ключ битовой карты.
+            offsets (Sequence[int]): Смещения битов.
+
+        Returns:
+            list[int]: Значения битов (0 или 1) в порядке смещений, 0 для отсутствующей карты.
+        """
+        ...
+
+    async def set_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        """
+        Установить несколько битов битовой карты в 1 за одно обращение.
+
+        Args:
+            key (str): Ключ битовой карты.
+            offsets (Sequence[int]): Смещения битов.
+
+        Returns:
+            list[int]: Прежние значения битов в порядке смещений.
+        """
+        ...
+
+    async def publish(self, channel: str, message: str) -> None:
+        """
+        Опубликовать сообщение в канал.
+
+        Args:
+            channel (str): Канал.
+            message (str): Сообщение.
+        """
+        ...
@@ -9,9 +9,11 @@
 
 Интерфейсы:
     register_parcel(parcel_data: ParcelSchema) -> None: Асинхронный метод, предназначенный для регистрации новой посылки
+    register_parcels(parcels: Sequence[ParcelSchema]) -> list[str | None]: Асинхронный метод для регистрации
+        пакета посылок, возвращает причину отказа для каждой незарегистрированной посылки
 """
 
-from typing import Protocol
+from typing import Protocol, Sequence
 from schemas.parcel import ParcelSchema
 
 class IParcelRegisterService(Protocol):
@@ -26,5 +28,23 @@ class IParcelRegisterService(Protocol):
 
         Returns:
             None
+
+        Raises:
+            ParcelTypeNotFoundError: Если тип посылки неизвестен.
+        """
+        ...
+
+    async def register_parcels(self, parcels: Sequence[ParcelSchema]) -> list[str | None]:
+        """
+        Зарегистрировать пакет новых посылок в одной транзакции.
+
+        Args:
+            parcels (Sequence[ParcelSchema]): Данные для регистрации новых посылок.
+
+        Returns:
+            list[str | None]: Причина отказа для каждой посылки в том же порядке или None, если посылка зарегистрирована.
+
+        Raises:
+            ParcelDatabaseError: Если пакет не удалось записать.
         """
-        ...
\ No newline at end of file
+        ...
@@ -2,7 +2,8 @@
 
 import logging
 from fastapi import FastAPI
-from routes.internal_services import router, lifespan
+from routes.internal_services import router
+from lifespan import lifespan
 from routes import healthy
 
 # Настраиваем логгирование приложения
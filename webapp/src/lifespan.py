@@ -0,0 +1,73 @@
+"""
+Модуль: lifespan
+
+Определяет общий lifespan для приложений FastAPI (webapp и internal_services_app):
+инициализацию ресурсов при старте и их освобождение при завершении работы.
+
+Ресурсы:
+    - Клиент и пул соединений Redis (один на процесс): используется для кеширования курса валют и служебных данных.
+    - Кэш тарифов доставки: загружается при старте и перезагружается фоновой задачей
+      при изменении версии тарифов в Redis.
+    - Справочник типов посылок: загружается при старте и перезагружается фоновой задачей
+      при изменении версии справочника в Redis.
+    - HTTP-клиент провайдера курса: пул keep-alive соединений с таймаутами (services.currency_fetch).
+    - Подписка на обновления курса: сбрасывает локальную копию курса в процессе (services.rate_local_cache).
+    - Фабрика сессий БД для записи истории курсов (services.rate_history).
+    - Пулы соединений основной БД и реплики: закрываются при завершении работы.
+"""
+
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+
+from services.redis_wrapper import initialize_redis_pool, close_redis_pool, RedisWrapper
+from services.currency_fetch import initialize_http_client, close_http_client
+from services.tariff_cache import tariff_cache
+from services.parcel_type_registry import parcel_type_registry
+from services.rate_local_cache import rate_local_cache
+from services.currency_service import CurrencyService
+from routes.dependencies import AsyncSessionLocal, close_db_engines
+from config.redis_conf import (
+    REDIS_HOST, REDIS_PORT, REDIS_MAX_CONNECTIONS, REDIS_POOL_TIMEOUT, REDIS_CONNECT_TIMEOUT, REDIS_SOCKET_TIMEOUT
+)
+from config.pricing_conf import TARIFF_CACHE_REFRESH_INTERVAL, PARCEL_TYPES_REFRESH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    background_tasks = []
+    try:
+        await initialize_redis_pool(
+            REDIS_HOST, REDIS_PORT,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            pool_timeout=REDIS_POOL_TIMEOUT,
+            connect_timeout=REDIS_CONNECT_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT
+        )
+        logger.info("Redis pool инициализирован при старте FastAPI приложения.")
+        await initialize_http_client()
+        CurrencyService.history_session_factory = AsyncSessionLocal
+        # Первая загрузка тарифов и типов посылок выполняется сразу в фоновых задачах, старт приложения ее не ждет
+        background_tasks.append(asyncio.create_task(
+            tariff_cache.run_refresher(AsyncSessionLocal, RedisWrapper(), TARIFF_CACHE_REFRESH_INTERVAL)
+        ))
+        background_tasks.append(asyncio.create_task(
+            parcel_type_registry.run_refresher(AsyncSessionLocal, RedisWrapper(), PARCEL_TYPES_REFRESH_INTERVAL)
+        ))
+        background_tasks.append(asyncio.create_task(rate_local_cache.run_subscriber()))
+        yield
+    except Exception as e:
+        logger.critical(f"Ошибка при инициализации Redis: {e}")
+        raise RuntimeError("Не удалось инициализировать Redis.")
+    finally:
+        for task in background_tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await close_http_client()
+        await close_db_engines()
+        await close_redis_pool()
+        logger.info("Redis pool закрыт при завершении работы FastAPI приложения.")
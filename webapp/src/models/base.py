@@ -9,10 +9,12 @@
     - MYSQL_DATABASE: Имя базы данных.
     - MYSQL_USER: Имя пользователя для подключения к базе данных.
     - MYSQL_PASSWORD: Пароль пользователя для подключения.
+    - DATABASE_REPLICA_HOST: Хост реплики для чтения (необязательно, с теми же учетными данными и именем БД).
 
 Объекты для импорта:
     - `Base`: для создания ORM-моделей.
     - `DATABASE_CREDS`: для получения DATABASE_URL в Alembic (для синхронной работы с БД).
+    - `DATABASE_URL`, `DATABASE_REPLICA_URL`: адреса основной БД и реплики (None, если реплика не задана).
 """
 
 import os
@@ -29,6 +31,12 @@ MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 DATABASE_CREDS = f"{MYSQL_USER}:{MYSQL_PASSWORD}@{DATABASE_HOST}/{MYSQL_DATABASE}"
 DATABASE_URL = f"mysql+aiomysql://{DATABASE_CREDS}"
 
+DATABASE_REPLICA_HOST = os.getenv("DATABASE_REPLICA_HOST")
+DATABASE_REPLICA_URL = (
+    f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{DATABASE_REPLICA_HOST}/{MYSQL_DATABASE}"
+    if DATABASE_REPLICA_HOST else None
+)
+
 
 
 
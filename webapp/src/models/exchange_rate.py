@@ -0,0 +1,70 @@
+"""
+Модуль: models.exchange_rate
+
+Содержит определение ORM-модели истории курсов валют.
+
+Каждое обновление курса (новый снимок) добавляет по строке на каждую валюту документа провайдера.
+Курс действует с момента valid_from до valid_from следующего снимка той же валюты, поэтому
+курс на момент T - это последняя строка валюты с valid_from <= T (один поиск по индексу (currency, valid_from)).
+
+Атрибуты класса:
+    currency (String(3)): Код валюты, часть первичного ключа.
+        Пример: "USD";
+
+    snapshot_id (String(26)): ULID снимка курса, часть первичного ключа.
+        Совпадает с rate_snapshot_id посылок, рассчитанных по этому снимку.
+        Пример: "01ARZ3NDEKTSV4RRFFQ69G5FAV";
+
+    rate (Decimal(16, 6)): Курс валюты в рублях за единицу валюты.
+        Пример: 91.234500;
+
+    valid_from (DateTime(3)): Момент, с которого действует курс (время ULID снимка, UTC).
+        Пример: 2024-11-20 12:00:00.000;
+"""
+
+from sqlalchemy import Column, String, DateTime, DECIMAL, Index
+from sqlalchemy.dialects import mysql
+
+from .base import Base
+
+
+class ExchangeRateModel(Base):
+    """
+    ORM-модель курса валюты в истории курсов.
+
+    Attributes:
+        currency (str): Код валюты.
+        snapshot_id (str): ULID снимка курса.
+        rate (Decimal): Курс валюты в рублях за единицу валюты.
+        valid_from (datetime): Момент, с которого действует курс (UTC).
+    """
+
+    __tablename__ = 'exchange_rates'
+    __table_args__ = (
+        Index('ix_exchange_rates_currency_valid_from', 'currency', 'valid_from'),
+    )
+
+    currency = Column(
+        String(3),
+        primary_key=True,
+        comment="Код валюты"
+    )
+
+    snapshot_id = Column(
+        String(26),
+        primary_key=True,
+        comment="ULID снимка курса"
+    )
+
+    rate = Column(
+        DECIMAL(precision=16, scale=6),
+        nullable=False,
+        comment="Курс валюты в рублях за единицу валюты"
+    )
+
+    valid_from = Column(
+        # Миллисекунды как у ULID: посылка и снимок в пределах одной секунды должны различаться
+        DateTime().with_variant(mysql.DATETIME(fsp=3), "mysql"),
+        nullable=False,
+        comment="Момент, с которого действует курс (UTC)"
+    )
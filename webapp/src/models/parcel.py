@@ -5,9 +5,11 @@
 использованием SQLAlchemy.
 
 Атрибуты класса:
-    id (String(26)): ULID идентификатор посылки, строка длиной 26 символов.
+    id (ULIDBinary): ULID идентификатор посылки. Хранится как BINARY(16),
+        в Python и API - строка длиной 26 символов.
         ULID является компактным идентификатором, который обеспечивает
-        естественную сортировку благодаря встроенной временной метке.
+        естественную сортировку благодаря встроенной временной метке
+        (порядок байтов совпадает с порядком строк).
         Пример: "01ARZ3NDEKTSV4RRFFQ69G5FAV";
 
     name (String(255)): Имя отправления, строка длиной до 255 символов.
@@ -34,14 +36,30 @@
     parcel_type_id (Int): Идентификатор типа посылки, внешний ключ для
         модели ParcelTypeModel.
         Пример: 1;
+
+    rate_snapshot_id (String(26) | None): ULID снимка курса USD/RUB,
+        по которому рассчитана стоимость доставки. Снимки упорядочены по времени,
+        поэтому посылки, рассчитанные по устаревшему курсу, выбираются диапазоном по индексу.
+        Пример: "01ARZ3NDEKTSV4RRFFQ69G5FAV";
+
+    pricing_version (Int | None): Версия формулы, по которой рассчитана стоимость доставки.
+        Пример: 1;
+
+Индексы подобраны под запросы:
+    ix_parcels_user_session_id_id: список посылок пользователя по возрастанию ULID
+        (WHERE user_session_id = ? ORDER BY id) без сортировки (filesort);
+    ix_parcels_user_session_id_parcel_type_id_id: то же с фильтром по типу посылки;
+    ix_parcels_shipping_cost_id: очередь пересчета стоимости доставки
+        (WHERE shipping_cost IS NULL AND id > ? ORDER BY id).
 """
 
-from sqlalchemy import Column, ForeignKey, String, Integer, DECIMAL
+from sqlalchemy import Column, ForeignKey, String, Integer, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy_utils import UUIDType
 from decimal import Decimal
 
 from .base import Base
+from .types import ULIDBinary
 from .parcel_type import ParcelTypeModel  # type: ignore
 
 
@@ -58,17 +76,24 @@ class ParcelModel(Base):
         shipping_cost (Decimal | None): Стоимость доставки посылки.
         parcel_type_id (int): Идентификатор типа посылки.
         parcel_type (ParcelTypeModel): Связь с моделью ParcelTypeModel.
+        rate_snapshot_id (str | None): ULID снимка курса, по которому рассчитана стоимость доставки.
+        pricing_version (int | None): Версия формулы расчета стоимости доставки.
     """
 
     __tablename__ = 'parcels'
+    __table_args__ = (
+        Index('ix_parcels_user_session_id_id', 'user_session_id', 'id'),
+        Index('ix_parcels_user_session_id_parcel_type_id_id', 'user_session_id', 'parcel_type_id', 'id'),
+        Index('ix_parcels_shipping_cost_id', 'shipping_cost', 'id'),
+    )
 
     id = Column(
-        String(26),  # ULID хранится как строка длиной 26 символов
+        ULIDBinary,  # ULID хранится как BINARY(16), в Python - строка длиной 26 символов
         primary_key=True,
         nullable=False,
         doc=(
             "Уникальный идентификатор посылки, в формате ULID, "
-            "хранится как строка"
+            "хранится как 16 байт"
         )
     )
 
@@ -94,7 +119,6 @@ class ParcelModel(Base):
     user_session_id = Column(
         UUIDType(binary=True),
         nullable=False,
-        index=True,
         doc="Идентификатор сессии пользователя, UUID"
     )
 
@@ -111,6 +135,20 @@ class ParcelModel(Base):
         doc="Идентификатор типа посылки, связанное поле"
     )
 
+    rate_snapshot_id = Column(
+        String(26),
+        nullable=True,
+        index=True,
+        doc="ULID снимка курса USD/RUB, по которому рассчитана стоимость доставки"
+    )
+
+    pricing_version = Column(
+        Integer,
+        nullable=True,
+        index=True,
+        doc="Версия формулы расчета стоимости доставки"
+    )
+
     parcel_type = relationship(
         "ParcelTypeModel",
         doc="Объект, представляющий тип посылки, связь с ParcelTypeModel"
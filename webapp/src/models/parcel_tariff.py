@@ -0,0 +1,66 @@
+"""
+Модуль: models.parcel_tariff
+
+Содержит определение ORM-модели тарифа доставки для типа посылки.
+
+Стоимость доставки в рублях рассчитывается по тарифу типа посылки:
+    max(вес в кг * per_kg_rate + стоимость в долларах * value_rate, min_charge) * курс USD/RUB
+
+Атрибуты класса:
+    parcel_type_id (Int): Идентификатор типа посылки, первичный и внешний ключ для модели ParcelTypeModel.
+        Пример: 1;
+
+    per_kg_rate (Decimal(9, 4)): Ставка за килограмм веса в долларах.
+        Пример: 0.5000;
+
+    value_rate (Decimal(6, 4)): Доля стоимости содержимого посылки.
+        Пример: 0.0100 (1%);
+
+    min_charge (Decimal(9, 2)): Минимальная стоимость доставки в долларах.
+        Пример: 0.00;
+"""
+
+from sqlalchemy import Column, ForeignKey, Integer, DECIMAL
+
+from .base import Base
+from .parcel_type import ParcelTypeModel  # type: ignore
+
+
+class ParcelTariffModel(Base):
+    """
+    ORM-модель тарифа доставки для типа посылки.
+
+    Attributes:
+        parcel_type_id (int): Идентификатор типа посылки.
+        per_kg_rate (Decimal): Ставка за килограмм веса в долларах.
+        value_rate (Decimal): Доля стоимости содержимого посылки.
+        min_charge (Decimal): Минимальная стоимость доставки в долларах.
+    """
+
+    __tablename__ = 'parcel_tariffs'
+
+    parcel_type_id = Column(
+        Integer,
+        ForeignKey('parcel_types.id'),
+        primary_key=True,
+        comment="Идентификатор типа посылки"
+    )
+
+    per_kg_rate = Column(
+        DECIMAL(precision=9, scale=4),
+        nullable=False,
+        comment="Ставка за килограмм веса в долларах"
+    )
+
+    value_rate = Column(
+        DECIMAL(precision=6, scale=4),
+        nullable=False,
+        comment="Доля стоимости содержимого посылки"
+    )
+
+    min_charge = Column(
+        DECIMAL(precision=9, scale=2),
+        nullable=False,
+        default=0,
+        comment="Минимальная стоимость доставки в долларах"
+    )
@@ -0,0 +1,39 @@
+"""
+Модуль: models.types
+
+Содержит типы колонок SQLAlchemy, общие для ORM-моделей.
+
+Типы:
+    ULIDBinary: ULID, хранимый как BINARY(16). В Python значение - строка из 26 символов.
+"""
+
+import ulid
+from sqlalchemy.types import TypeDecorator, BINARY
+
+
+class ULIDBinary(TypeDecorator):
+    """
+    ULID в колонке BINARY(16).
+
+    128 бит ULID записываются в порядке big-endian (временная метка в старших байтах), поэтому
+    побайтовая сортировка в БД совпадает с лексикографической сортировкой текстовой формы:
+    ORDER BY id и сравнения с курсором (id > ?) работают так же, как для строки из 26 символов.
+    Ключ занимает 16 байт вместо до 104 байт VARCHAR(26) в utf8mb4, как в первичном ключе,
+    так и в каждом вторичном индексе (InnoDB хранит в них первичный ключ).
+
+    Параметры запросов и результаты - строки ULID (регистр при записи не важен),
+    API и сервисы работают с текстовой формой, как и раньше.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect) -> bytes | None:
+        if value is None:
+            return None
+        return ulid.from_str(value.upper()).bytes
+
+    def process_result_value(self, value: bytes | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return ulid.from_bytes(value).str
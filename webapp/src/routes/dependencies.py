@@ -2,32 +2,86 @@
 Модуль: routes.dependencies
 
 Определяет зависимости для использования в маршрутах FastAPI, такие как подключение
-к базе данных и проверка пользовательской сессии.
+к базе данных и Redis и проверка пользовательской сессии.
+
+Базы данных:
+    - get_db: сессия основной БД. Используется для записи (регистрация, пересчет стоимости доставки)
+      и служебных маршрутов.
+    - get_read_db: сессия реплики для чтения (GET-маршруты). Если реплика не задана (DATABASE_REPLICA_HOST),
+      это сессия основной БД. После регистрации посылки маршрут вызывает read_own_writes, и чтения
+      этой пользовательской сессии в течение DATABASE_READ_YOUR_WRITES_WINDOW секунд идут в основную БД:
+      иначе только что зарегистрированная посылка могла бы еще не дойти до реплики.
+    - Параметры пулов соединений задаются переменными окружения (config.db_conf).
 """
 
 import logging
+import time
 from uuid import UUID
 
-from fastapi import HTTPException, Cookie, status
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from fastapi import HTTPException, Cookie, Response, status
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from models.base import DATABASE_URL
+from models.base import DATABASE_URL, DATABASE_REPLICA_URL
+from config.db_conf import (
+    DATABASE_POOL_SIZE, DATABASE_MAX_OVERFLOW, DATABASE_POOL_TIMEOUT, DATABASE_POOL_RECYCLE, DATABASE_POOL_PRE_PING,
+    READ_PRIMARY_COOKIE, DATABASE_READ_YOUR_WRITES_WINDOW
+)
+from interfaces.cache import ICacheService
+from services.redis_wrapper import RedisWrapper
 
 logger = logging.getLogger(__name__)
 
-# Создание асинхронного движка для работы с базой данных
-engine = create_async_engine(DATABASE_URL, future=True, echo=False)
 
-# Создание фабрики сессий для работы с базой данных
+def create_engine(url: str) -> AsyncEngine:
+    """
+    Создает асинхронный движок с пулом соединений по настройкам из окружения.
+
+    Args:
+        url (str): Адрес базы данных.
+
+    Returns:
+        AsyncEngine: Асинхронный движок SQLAlchemy.
+    """
+    return create_async_engine(
+        url,
+        future=True,
+        echo=False,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+        pool_recycle=DATABASE_POOL_RECYCLE,
+        pool_pre_ping=DATABASE_POOL_PRE_PING
+    )
+
+
+# Создание асинхронного движка для работы с основной базой данных
+engine = create_engine(DATABASE_URL)
+
+# Движок реплики для чтения. Без реплики чтение идет в основную БД
+replica_engine = create_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+# Создание фабрик сессий для работы с базой данных
 AsyncSessionLocal = sessionmaker(  # type: ignore
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
+AsyncReadSessionLocal = sessionmaker(  # type: ignore
+    bind=replica_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+async def close_db_engines() -> None:
+    """
+    Закрывает пулы соединений основной БД и реплики. Вызывается при завершении работы приложения.
+    """
+    await engine.dispose()
+    if replica_engine is not engine:
+        await replica_engine.dispose()
 
 
 async def get_db() -> AsyncSession:
     """
-    Получение асинхронной сессии работы с базой данных.
+    Получение асинхронной сессии работы с основной базой данных (для записи).
 
     Yields:
         AsyncSession: Асинхронная сессия для выполнения операций с базой данных.
@@ -36,6 +90,61 @@ async def get_db() -> AsyncSession:
         yield session
 
 
+async def get_read_db(read_primary_until: str | None = Cookie(
+    None,
+    alias=READ_PRIMARY_COOKIE,
+    include_in_schema=False
+)) -> AsyncSession:
+    """
+    Получение асинхронной сессии для чтения: реплика или основная БД сразу после записи этой сессии.
+
+    Args:
+        read_primary_until (str | None): Время (unix, секунды), до которого чтения идут в основную БД.
+
+    Yields:
+        AsyncSession: Асинхронная сессия для чтения.
+    """
+    session_factory = AsyncReadSessionLocal
+    if read_primary_until and replica_engine is not engine:
+        try:
+            if int(read_primary_until) >= time.time():
+                session_factory = AsyncSessionLocal
+        except ValueError:
+            logger.debug(f"Некорректное значение cookie {READ_PRIMARY_COOKIE}: {read_primary_until}")
+    async with session_factory() as session:
+        yield session
+
+
+def read_own_writes(response: Response) -> None:
+    """
+    Направляет чтения текущей пользовательской сессии в основную БД на DATABASE_READ_YOUR_WRITES_WINDOW секунд.
+    Вызывается маршрутами записи после коммита. Без реплики ничего не делает.
+
+    Args:
+        response (Response): Ответ, в который устанавливается cookie.
+    """
+    if replica_engine is engine:
+        return
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        str(int(time.time()) + DATABASE_READ_YOUR_WRITES_WINDOW),
+        max_age=DATABASE_READ_YOUR_WRITES_WINDOW,
+        httponly=True,
+        samesite="lax"
+    )
+
+
+async def get_redis_wrapper() -> ICacheService:
+    """
+    Получение обертки для работы с Redis.
+    Пул соединений Redis инициализируется в lifespan приложения.
+
+    Returns:
+        ICacheService: Обертка над пулом соединений Redis.
+    """
+    return RedisWrapper()
+
+
 def get_user_session(user_session_id: str = Cookie(
     None,
     description="Сессия пользователя в формате UUID, только для примера (в Swagger не устанавливается)",
@@ -5,15 +5,17 @@
 
 Маршруты:
     - GET /api/healthy - возвращает статус Healthy.
+    - GET /api/healthy/redis-pool - возвращает состояние и метрики пула соединений Redis процесса.
 
 """
 
 import logging
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
 
-from schemas.statuses import HealthySchema
-from exceptions.error_schemas import InternalServerErrorResponse
+from schemas.statuses import HealthySchema, RedisPoolStatsSchema
+from exceptions.error_schemas import InternalServerErrorResponse, ServiceUnavailableResponse
+import services.redis_wrapper as redis_wrapper
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -40,3 +42,29 @@ async def healthy() -> HealthySchema:
     """
     logger.info("Healthy route called")
     return HealthySchema()
+
+
+@router.get(
+    "/redis-pool",
+    response_model=RedisPoolStatsSchema,
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    summary="Получить состояние пула соединений Redis",
+    description=(
+        "Возвращает размер пула, занятые и свободные соединения, время ожидания соединения "
+        "и количество таймаутов с момента старта процесса. Метрики относятся к процессу, обработавшему запрос."
+    )
+)
+async def redis_pool_stats() -> RedisPoolStatsSchema:
+    """
+    Метрики пула соединений Redis для подбора его размера
+    """
+    if redis_wrapper.redis_pool is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Пул соединений Redis не инициализирован"
+        )
+    return RedisPoolStatsSchema(**redis_wrapper.redis_pool.stats())
@@ -7,19 +7,21 @@
     - Не сделана межсервисная авторизация
  """
 import logging
-from contextlib import asynccontextmanager
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from interfaces.cache import ICacheService
 from exceptions.error_schemas import InternalServerErrorResponse
-from services.redis_wrapper import RedisWrapper, initialize_redis_pool, close_redis_pool
+from services.redis_wrapper import RedisWrapper
 from services.currency_service import CurrencyService
+from services.parcel_id_filter import ParcelIdFilter
 from services.shipping_costs_update_service import ShippingCostsUpdateService
-from schemas.statuses import MessageSchema
-from .dependencies import get_db
-from config.pricing_conf import REDIS_HOST, REDIS_PORT, REDIS_MAX_CONNECTIONS
+from services.tariff_cache import tariff_cache
+from services.parcel_type_registry import parcel_type_registry
+from schemas.statuses import MessageSchema, ShippingCostsUpdateSchema
+from schemas.shipping_costs import ShippingCostsRangeSchema, ShippingCostsRangesSchema
+from .dependencies import get_db, get_redis_wrapper
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -27,24 +29,6 @@ logging.basicConfig(level=logging.INFO)
 router = APIRouter()
 
 
-@asynccontextmanager
-async def lifespan(app):
-    try:
-        await initialize_redis_pool(REDIS_HOST, REDIS_PORT, max_connections=REDIS_MAX_CONNECTIONS)
-        logger.info("Redis pool инициализирован при старте FastAPI приложения.")
-        yield
-    except Exception as e:
-        logger.critical(f"Ошибка при инициализации Redis: {e}")
-        raise RuntimeError("Не удалось инициализировать Redis.")
-    finally:
-        await close_redis_pool()
-        logger.info("Redis pool закрыт при завершении работы FastAPI приложения.")
-
-
-async def get_redis_wrapper() -> ICacheService:
-    return RedisWrapper()
-
-
 @router.post(
     "/update_usd_rate",
     response_model=MessageSchema,
@@ -72,7 +56,7 @@ async def update_usd_rate(redis_wrapper: ICacheService = Depends(get_redis_wrapp
 
 @router.post(
     "/update_shipping_costs",
-    response_model=MessageSchema,
+    response_model=ShippingCostsUpdateSchema,
     responses={
         status.HTTP_500_INTERNAL_SERVER_ERROR: {
             "model": InternalServerErrorResponse,
@@ -84,19 +68,23 @@ async def update_usd_rate(redis_wrapper: ICacheService = Depends(get_redis_wrapp
 async def update_shipping_costs(
     redis_wrapper: RedisWrapper = Depends(get_redis_wrapper),
     db: AsyncSession = Depends(get_db)
-) -> MessageSchema:
+) -> ShippingCostsUpdateSchema:
     """
     Обновляет стоимость доставки на основе актуального курса доллара.
+    Возвращает количество посылок, для которых рассчитана стоимость.
     """
     try:
-        usd_to_rub = await CurrencyService.get_usd_rate(redis_wrapper)
-        logger.info(f"Используем курс USD/RUB: {usd_to_rub}")
+        rate_snapshot = await CurrencyService.get_rate_snapshot(redis_wrapper)
+        logger.info(f"Используем курс USD/RUB: {rate_snapshot.rate}, снимок {rate_snapshot.snapshot_id}")
 
-        shipping_costs_update_service = ShippingCostsUpdateService(db)
-        await shipping_costs_update_service.update_shipping_costs(usd_to_rub)
+        shipping_costs_update_service = ShippingCostsUpdateService(db, cache=redis_wrapper)
+        updated = await shipping_costs_update_service.update_shipping_costs(rate_snapshot)
 
-        logger.info("Стоимость доставки обновлена для всех посылок.")
-        return MessageSchema(message="Стоимость доставки обновлена для всех посылок.")
+        logger.info(f"Стоимость доставки обновлена для {updated} посылок.")
+        return ShippingCostsUpdateSchema(
+            message=f"Стоимость доставки обновлена для {updated} посылок.",
+            updated=updated
+        )
     except ValueError as e:
         logger.warning(f"Ошибка получения курса валют: {e}")
         raise HTTPException(
@@ -109,3 +97,224 @@ async def update_shipping_costs(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ошибка при обновлении стоимости доставки."
         )
+
+
+@router.get(
+    "/shipping_costs_ranges",
+    response_model=ShippingCostsRangesSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Разделить очередь пересчета на диапазоны",
+    description="Служит для вызова из Celery: координатор раздает диапазоны воркерам",
+)
+async def get_shipping_costs_ranges(
+    parts: int = Query(4, ge=1, le=256, description="Желаемое количество диапазонов"),
+    db: AsyncSession = Depends(get_db)
+) -> ShippingCostsRangesSchema:
+    """
+    Делит посылки без стоимости доставки на непересекающиеся диапазоны ULID.
+    """
+    try:
+        shipping_costs_update_service = ShippingCostsUpdateService(db)
+        ranges = await shipping_costs_update_service.split_backlog(parts)
+        return ShippingCostsRangesSchema(
+            ranges=[ShippingCostsRangeSchema(start_id=start_id, end_id=end_id) for start_id, end_id in ranges]
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при делении очереди пересчета стоимости доставки: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при делении очереди пересчета стоимости доставки."
+        )
+
+
+@router.post(
+    "/update_shipping_costs_range",
+    response_model=ShippingCostsUpdateSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Обновить цены доставки в диапазоне ULID",
+    description="Служит для вызова из Celery: каждый воркер обрабатывает свой диапазон",
+)
+async def update_shipping_costs_range(
+    shipping_costs_range: ShippingCostsRangeSchema,
+    redis_wrapper: ICacheService = Depends(get_redis_wrapper),
+    db: AsyncSession = Depends(get_db)
+) -> ShippingCostsUpdateSchema:
+    """
+    Обновляет стоимость доставки посылок в диапазоне ULID. Повторный вызов для того же диапазона безопасен.
+    """
+    start_id = shipping_costs_range.start_id
+    end_id = shipping_costs_range.end_id
+    try:
+        rate_snapshot = await CurrencyService.get_rate_snapshot(redis_wrapper)
+
+        shipping_costs_update_service = ShippingCostsUpdateService(db, cache=redis_wrapper)
+        updated = await shipping_costs_update_service.update_shipping_costs_range(rate_snapshot, start_id, end_id)
+
+        logger.info(f"Стоимость доставки обновлена для {updated} посылок в диапазоне [{start_id}, {end_id}).")
+        return ShippingCostsUpdateSchema(
+            message=f"Стоимость доставки обновлена для {updated} посылок в диапазоне.",
+            updated=updated
+        )
+    except ValueError as e:
+        logger.warning(f"Ошибка получения курса валют: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при обновлении стоимости доставки в диапазоне [{start_id}, {end_id}): {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при обновлении стоимости доставки."
+        )
+
+
+@router.post(
+    "/reprice_stale_shipping_costs",
+    response_model=ShippingCostsUpdateSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Пересчитать устаревшие цены доставки",
+    description=(
+        "Служит для вызова из Celery после обновления курса: пересчитывает только посылки, "
+        "рассчитанные по устаревшему снимку курса или версии формулы"
+    ),
+)
+async def reprice_stale_shipping_costs(
+    redis_wrapper: ICacheService = Depends(get_redis_wrapper),
+    db: AsyncSession = Depends(get_db)
+) -> ShippingCostsUpdateSchema:
+    """
+    Пересчитывает стоимость доставки посылок с устаревшим снимком курса или версией формулы.
+    """
+    try:
+        rate_snapshot = await CurrencyService.get_rate_snapshot(redis_wrapper)
+
+        shipping_costs_update_service = ShippingCostsUpdateService(db, cache=redis_wrapper)
+        updated = await shipping_costs_update_service.reprice_stale(rate_snapshot)
+
+        return ShippingCostsUpdateSchema(
+            message=f"Пересчитана стоимость доставки для {updated} посылок с устаревшей ценой.",
+            updated=updated
+        )
+    except ValueError as e:
+        logger.warning(f"Ошибка получения снимка курса валют: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при пересчете устаревших цен доставки: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при пересчете устаревших цен доставки."
+        )
+
+
+@router.post(
+    "/bump_tariffs_version",
+    response_model=MessageSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Сменить версию тарифов доставки",
+    description=(
+        "Вызывается после изменения таблицы parcel_tariffs: все процессы перезагрузят тарифы "
+        "при следующей проверке версии"
+    ),
+)
+async def bump_tariffs_version(
+    redis_wrapper: ICacheService = Depends(get_redis_wrapper),
+    db: AsyncSession = Depends(get_db)
+) -> MessageSchema:
+    """
+    Записывает новую версию тарифов в Redis и сразу перезагружает тарифы в текущем процессе.
+    """
+    try:
+        version = await tariff_cache.bump_version(redis_wrapper)
+        await tariff_cache.refresh(db, redis_wrapper)
+        return MessageSchema(message=f"Версия тарифов доставки изменена на {version}")
+    except Exception as e:
+        logger.error(f"Ошибка при смене версии тарифов доставки: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при смене версии тарифов доставки."
+        )
+
+
+@router.post(
+    "/bump_parcel_types_version",
+    response_model=MessageSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Сменить версию справочника типов посылок",
+    description=(
+        "Вызывается после изменения таблицы parcel_types: все процессы перезагрузят справочник типов "
+        "при следующей проверке версии"
+    ),
+)
+async def bump_parcel_types_version(
+    redis_wrapper: ICacheService = Depends(get_redis_wrapper),
+    db: AsyncSession = Depends(get_db)
+) -> MessageSchema:
+    """
+    Записывает новую версию справочника типов посылок в Redis и сразу перезагружает его в текущем процессе.
+    """
+    try:
+        version = await parcel_type_registry.bump_version(redis_wrapper)
+        await parcel_type_registry.refresh(db, redis_wrapper)
+        return MessageSchema(message=f"Версия справочника типов посылок изменена на {version}")
+    except Exception as e:
+        logger.error(f"Ошибка при смене версии справочника типов посылок: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при смене версии справочника типов посылок."
+        )
+
+
+@router.post(
+    "/rebuild_parcel_id_filter",
+    response_model=MessageSchema,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "model": InternalServerErrorResponse,
+        },
+    },
+    summary="Перестроить фильтр ULID посылок",
+    description=(
+        "Служит для вызова из Celery при старте и вручную: добавляет в фильтр Блума ULID всех посылок "
+        "и включает отсеивание несуществующих посылок до обращения к БД"
+    ),
+)
+async def rebuild_parcel_id_filter(
+    redis_wrapper: ICacheService = Depends(get_redis_wrapper),
+    db: AsyncSession = Depends(get_db)
+) -> MessageSchema:
+    """
+    Перестраивает фильтр зарегистрированных ULID посылок из таблицы parcels.
+    """
+    try:
+        added = await ParcelIdFilter(redis_wrapper).rebuild(db)
+        return MessageSchema(message=f"Фильтр посылок перестроен, добавлено {added} ULID")
+    except Exception as e:
+        logger.error(f"Ошибка при перестроении фильтра посылок: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при перестроении фильтра посылок."
+        )
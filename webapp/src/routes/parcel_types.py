@@ -19,14 +19,14 @@ from schemas.parcel_type import ParcelTypeResponseSchema
 from services.parcel_type import ParcelTypeService
 from exceptions.exceptions import ParcelDatabaseError, ParcelValidationError
 from exceptions.error_schemas import InternalServerErrorResponse
-from .dependencies import get_db
+from .dependencies import get_read_db
 
 logger = logging.getLogger(__name__)
 logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
 
 router = APIRouter()
 
-def get_parcel_type_service(db: AsyncSession = Depends(get_db)) -> ParcelTypeService:
+def get_parcel_type_service(db: AsyncSession = Depends(get_read_db)) -> ParcelTypeService:
     """
     Получение экземпляра сервиса ParcelTypeService.
 
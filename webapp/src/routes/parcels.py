@@ -7,11 +7,30 @@
 
 Использует сервис ParcelService для асинхронной выборки данных из базы данных и
 сервис ParcelRegisterService для регистрации посылки с прямой записью в БД (асинхронно).
+При регистрации стоимость доставки рассчитывается сразу сервисом ParcelPricingService,
+если курс доллара уже есть в кэше; иначе ее рассчитает периодическая задача.
+Предварительный расчет (quote) использует только курс из кэша и тарифы в памяти процесса
+и не открывает сессию БД.
+Тип посылки проверяется по справочнику типов в памяти процесса (services.parcel_type_registry):
+неизвестный тип отклоняется с кодом 400 до записи в БД.
+
+Чтение посылок идет в реплику (get_read_db), регистрация - в основную БД (get_db).
+После регистрации чтения этой пользовательской сессии некоторое время идут в основную БД.
 
 Маршруты, предоставляемые модулем:
     - POST /api/parcels/: Регистрация новой посылки.
+    - POST /api/parcels/batch: Пакетная регистрация посылок одним многострочным INSERT.
+      Каждая посылка валидируется отдельно, ответ содержит ULID или причину отказа для каждой посылки.
+    - POST /api/parcels/quote: Предварительный расчет стоимости доставки посылки без регистрации.
+    - POST /api/parcels/quote/batch: Предварительный расчет стоимости доставки для набора посылок.
     - GET /api/parcels/: Получение списка всех посылок, связанных с текущим пользователем.
+      Пагинация по курсору (ULID последней посылки страницы), курсор следующей страницы
+      возвращается в заголовке X-Next-Cursor. Смещение (offset) ограничено и оставлено для совместимости.
     - GET /api/parcels/{parcel_id}/: Получение информации о конкретной посылке по её ULID.
+      Карточка посылки читается через кэш в Redis (services.parcel_cache). Сессия БД открывается
+      лениво, поэтому при попадании в кэш соединение из пула БД не берется.
+      Несуществующие ULID отсеиваются до БД (services.parcel_id_filter): синтаксически неверный ULID
+      или ULID из будущего - без обращений к Redis, незарегистрированный ULID - по фильтру Блума.
 
 """
 
@@ -20,16 +39,29 @@ from typing import List
 from uuid import UUID
 
 import ulid
-from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Response, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from exceptions.error_schemas import *
-from exceptions.exceptions import ParcelNotFoundError, ParcelDatabaseError, ParcelValidationError
+from exceptions.exceptions import (
+    ParcelNotFoundError, ParcelDatabaseError, ParcelValidationError, ShippingCostUnavailableError,
+    ParcelTypeNotFoundError
+)
+from interfaces.cache import ICacheService
 from interfaces.parcel import IParcelRegisterService
-from schemas.parcel import ParcelRegisterSchema, ParcelSchema, ParcelReceivedSchema, ParcelResponseSchema
+from schemas.parcel import (
+    ParcelRegisterSchema, ParcelSchema, ParcelReceivedSchema, ParcelResponseSchema, ParcelQuoteBatchSchema,
+    ParcelRegisterBatchSchema, ParcelBatchItemResultSchema, ParcelRegisterBatchResultSchema
+)
+from schemas.pricing import ShippingCostSchema, ShippingCostsQuoteSchema
 from services.parcel import ParcelService
+from services.parcel_cache import ParcelCache
+from services.parcel_id_filter import ParcelIdFilter, is_valid_parcel_id
 from services.parcel_register import ParcelRegisterService
-from .dependencies import get_db, get_user_session
+from services.pricing import ParcelPricingService
+from config.parcel_conf import PARCEL_LIST_MAX_OFFSET
+from .dependencies import get_db, get_read_db, read_own_writes, get_user_session, get_redis_wrapper
 
 logger = logging.getLogger(__name__)
 logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
@@ -38,21 +70,36 @@ logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
 router = APIRouter()
 
 
-def get_parcel_service(db: AsyncSession = Depends(get_db)) -> ParcelService:
+def get_parcel_service(db: AsyncSession = Depends(get_read_db)) -> ParcelService:
     return ParcelService(db=db)
 
 
-def get_parcel_register_service(db: AsyncSession = Depends(get_db)) -> IParcelRegisterService:
+def get_parcel_cache(redis_wrapper: ICacheService = Depends(get_redis_wrapper)) -> ParcelCache:
+    return ParcelCache(cache=redis_wrapper)
+
+
+def get_parcel_id_filter(redis_wrapper: ICacheService = Depends(get_redis_wrapper)) -> ParcelIdFilter:
+    return ParcelIdFilter(cache=redis_wrapper)
+
+
+def get_parcel_register_service(
+        db: AsyncSession = Depends(get_db),
+        parcel_id_filter: ParcelIdFilter = Depends(get_parcel_id_filter)) -> IParcelRegisterService:
     """
     Возвращает реализацию сервиса регистрации посылок.
 
     Args:
         db (AsyncSession): Асинхронная сессия базы данных, полученная через зависимость FastAPI.
+        parcel_id_filter (ParcelIdFilter): Фильтр зарегистрированных ULID посылок.
 
     Returns:
         IParcelRegisterService: Реализация интерфейса для сервиса регистрации посылок.
     """
-    return ParcelRegisterService(db=db)
+    return ParcelRegisterService(db=db, id_filter=parcel_id_filter)
+
+
+def get_parcel_pricing_service(redis_wrapper: ICacheService = Depends(get_redis_wrapper)) -> ParcelPricingService:
+    return ParcelPricingService(cache=redis_wrapper)
 
 
 @router.post(
@@ -68,16 +115,23 @@ def get_parcel_register_service(db: AsyncSession = Depends(get_db)) -> IParcelRe
     description=(
             "Регистрация новой посылки. Данные принимаются в формате JSON и валидируются. "
             "Успешно зарегистрированная посылка возвращает индивидуальный id в формате ULID "
-            "в контексте сессии пользователя. На дубли не проверяется."
+            "в контексте сессии пользователя. На дубли не проверяется. "
+            "Если курс доллара уже известен, стоимость доставки рассчитывается сразу. "
+            "Для неизвестного типа посылки возвращается 400."
     ),
 )
 async def create_parcel(
         parcel: ParcelRegisterSchema,
+        response: Response,
         parcel_register_service: IParcelRegisterService = Depends(get_parcel_register_service),
+        parcel_pricing_service: ParcelPricingService = Depends(get_parcel_pricing_service),
         user_session_id: UUID = Depends(get_user_session)):
     try:
         ulid_id = str(ulid.new())
 
+        # Стоимость доставки считаем сразу, только если курс есть в кэше (без обращения к внешнему API)
+        shipping_cost = await parcel_pricing_service.get_shipping_cost(parcel)
+
         parcel_data = ParcelSchema(
             id=ulid_id,
             name=parcel.name,
@@ -85,13 +139,21 @@ async def create_parcel(
             value=parcel.value,
             parcel_type_id=parcel.parcel_type_id,
             user_session_id=user_session_id,
-            shipping_cost=None,
+            shipping_cost=shipping_cost.shipping_cost if shipping_cost else None,
+            rate_snapshot_id=shipping_cost.rate_snapshot_id if shipping_cost else None,
+            pricing_version=shipping_cost.pricing_version if shipping_cost else None,
         )
 
         await parcel_register_service.register_parcel(parcel_data)
+        # Следующие чтения этой сессии идут в основную БД, пока посылка доходит до реплики
+        read_own_writes(response)
 
         return ParcelReceivedSchema(id=ulid_id)
 
+    except ParcelTypeNotFoundError as e:
+        logger.info(f"Посылка {parcel.name} не зарегистрирована: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     except ParcelValidationError as e:  # ошибка внутри бизнес-логики, потому 500, а не 422
         logger.exception(f"Ошибка в данных посылки {parcel.name}")
         raise HTTPException(
@@ -114,6 +176,177 @@ async def create_parcel(
         )
 
 
+def validation_error_message(error: ValidationError) -> str:
+    """
+    Возвращает ошибки валидации посылки одной строкой: "поле: сообщение; ...".
+    """
+    return "; ".join(
+        f"{'.'.join(map(str, item['loc'])) or 'посылка'}: {item['msg']}" for item in error.errors()
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=ParcelRegisterBatchResultSchema,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"model": UnauthorizedResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": InternalServerErrorResponse},
+    },
+    summary="Зарегистрировать пакет посылок",
+    description=(
+            "Пакетная регистрация посылок в контексте сессии пользователя. Каждая посылка принимается "
+            "в формате POST /api/parcels/ и валидируется отдельно. Посылки с ошибками валидации "
+            "или неизвестным типом отклоняются, остальные записываются одним запросом в одной транзакции. "
+            "Ответ содержит ULID или причину отказа для каждой посылки в порядке запроса. "
+            "Если курс доллара уже известен, стоимость доставки рассчитывается сразу. "
+            "При ошибке БД не регистрируется ни одна посылка (500)."
+    ),
+)
+async def create_parcels(
+        parcel_batch: ParcelRegisterBatchSchema,
+        response: Response,
+        parcel_register_service: IParcelRegisterService = Depends(get_parcel_register_service),
+        parcel_pricing_service: ParcelPricingService = Depends(get_parcel_pricing_service),
+        user_session_id: UUID = Depends(get_user_session)):
+    try:
+        results = [ParcelBatchItemResultSchema() for _ in parcel_batch.parcels]
+        positions, parcels = [], []
+        for position, item in enumerate(parcel_batch.parcels):
+            try:
+                parcels.append(ParcelRegisterSchema.model_validate(item))
+                positions.append(position)
+            except ValidationError as e:
+                results[position].error = validation_error_message(e)
+
+        # Стоимость доставки считаем сразу, только если курс есть в кэше (без обращения к внешнему API)
+        shipping_costs = await parcel_pricing_service.get_shipping_costs(parcels)
+
+        parcels_data = [
+            ParcelSchema(
+                id=str(ulid.new()),
+                name=parcel.name,
+                weight=parcel.weight,
+                value=parcel.value,
+                parcel_type_id=parcel.parcel_type_id,
+                user_session_id=user_session_id,
+                shipping_cost=shipping_cost.shipping_cost if shipping_cost else None,
+                rate_snapshot_id=shipping_cost.rate_snapshot_id if shipping_cost else None,
+                pricing_version=shipping_cost.pricing_version if shipping_cost else None,
+            )
+            for parcel, shipping_cost in zip(parcels, shipping_costs)
+        ]
+
+        errors = await parcel_register_service.register_parcels(parcels_data) if parcels_data else []
+        for position, parcel_data, error in zip(positions, parcels_data, errors):
+            if error is None:
+                results[position].id = parcel_data.id
+            else:
+                results[position].error = error
+
+        registered = sum(result.id is not None for result in results)
+        if registered:
+            # Следующие чтения этой сессии идут в основную БД, пока посылки доходят до реплики
+            read_own_writes(response)
+        logger.info(f"Зарегистрировано {registered} из {len(results)} посылок пакета для сессии {user_session_id}")
+
+        return ParcelRegisterBatchResultSchema(parcels=results, registered=registered)
+
+    except ParcelDatabaseError as e:
+        logger.exception(f"Ошибка базы данных при создании пакета из {len(parcel_batch.parcels)} посылок")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Внутренняя ошибка сервера"
+        )
+
+    except Exception as e:
+        logger.exception(f"Неизвестная ошибка при создании пакета из {len(parcel_batch.parcels)} посылок")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Неизвестная ошибка"
+        )
+
+
+@router.post(
+    "/quote",
+    response_model=ShippingCostSchema,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": BadRequestResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": InternalServerErrorResponse},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ServiceUnavailableResponse},
+    },
+    summary="Рассчитать стоимость доставки без регистрации",
+    description=(
+            "Предварительный расчет стоимости доставки посылки. Данные принимаются в том же формате, "
+            "что и при регистрации. Посылка не сохраняется, БД не используется. "
+            "Для неизвестного типа посылки возвращается 400, если курс доллара еще не получен - 503."
+    ),
+)
+async def quote_parcel(
+        parcel: ParcelRegisterSchema,
+        parcel_pricing_service: ParcelPricingService = Depends(get_parcel_pricing_service)):
+    try:
+        shipping_costs = await parcel_pricing_service.quote([parcel])
+        return shipping_costs[0]
+
+    except ParcelTypeNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    except ShippingCostUnavailableError as e:
+        logger.warning(f"Стоимость доставки посылки {parcel.name} не рассчитана: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+    except Exception as e:
+        logger.exception(f"Неизвестная ошибка при расчете стоимости доставки посылки {parcel.name}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Неизвестная ошибка"
+        )
+
+
+@router.post(
+    "/quote/batch",
+    response_model=ShippingCostsQuoteSchema,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": BadRequestResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": InternalServerErrorResponse},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ServiceUnavailableResponse},
+    },
+    summary="Рассчитать стоимость доставки для набора посылок",
+    description=(
+            "Предварительный расчет стоимости доставки для нескольких посылок одним запросом. "
+            "Все посылки считаются по одному снимку курса, стоимость возвращается в порядке запроса. "
+            "БД не используется. Если тип какой-либо посылки неизвестен, возвращается 400, "
+            "если курс доллара еще не получен - 503."
+    ),
+)
+async def quote_parcels(
+        quote_batch: ParcelQuoteBatchSchema,
+        parcel_pricing_service: ParcelPricingService = Depends(get_parcel_pricing_service)):
+    try:
+        shipping_costs = await parcel_pricing_service.quote(quote_batch.parcels)
+        return ShippingCostsQuoteSchema(shipping_costs=shipping_costs)
+
+    except ParcelTypeNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    except ShippingCostUnavailableError as e:
+        logger.warning(f"Стоимость доставки для {len(quote_batch.parcels)} посылок не рассчитана: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+    except Exception as e:
+        logger.exception(f"Неизвестная ошибка при расчете стоимости доставки для {len(quote_batch.parcels)} посылок")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Неизвестная ошибка"
+        )
+
+
 @router.get(
     "/{parcel_id}/",
     response_model=ParcelResponseSchema,
@@ -132,16 +365,31 @@ async def get_parcel(
             ...,
             description="Уникальный id посылки в формате ulid, 26 символов",
             example="01ARZ3NDEKTSV4RRFFQ69G5FAV"),
-        parcel_service: ParcelService = Depends(get_parcel_service)):
+        parcel_service: ParcelService = Depends(get_parcel_service),
+        parcel_cache: ParcelCache = Depends(get_parcel_cache),
+        parcel_id_filter: ParcelIdFilter = Depends(get_parcel_id_filter)):
     try:
+        if not is_valid_parcel_id(parcel_id):
+            raise ParcelNotFoundError(f"Посылка с ID {parcel_id} не найдена (некорректный ULID).")
+
+        # AsyncSession берет соединение только при первом запросе, поэтому попадание в кэш обходится без БД
+        parcel_data = await parcel_cache.get(parcel_id)
+        if parcel_data is not None:
+            return parcel_data
+
+        if not await parcel_id_filter.might_contain(parcel_id):
+            raise ParcelNotFoundError(f"Посылка с ID {parcel_id} не найдена (нет в фильтре посылок).")
+
         parcel_data = await parcel_service.get_parcel_by_id(parcel_id)
+        await parcel_cache.set(parcel_data)
         return parcel_data
 
     except ParcelNotFoundError as e:
-        logger.info(str(e))
+        # Запросы несуществующих посылок (опечатки, перебор ссылок) - штатная ситуация
+        logger.debug(str(e))
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            detail=f"Посылка с ID {parcel_id} не найдена."
         )
 
     except ParcelValidationError as e:  # ошибка внутри бизнес-логики, потому 500, а не 422
@@ -169,28 +417,60 @@ async def get_parcel(
 @router.get("/",
             response_model=List[ParcelResponseSchema],
             responses={
+                status.HTTP_200_OK: {
+                    "headers": {
+                        "X-Next-Cursor": {
+                            "description": "Курсор следующей страницы (нет на последней странице)",
+                            "schema": {"type": "string"},
+                        },
+                    },
+                },
                 status.HTTP_400_BAD_REQUEST: {"model": BadRequestResponse},
                 status.HTTP_401_UNAUTHORIZED: {"model": UnauthorizedResponse},
                 status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": InternalServerErrorResponse},
             },
             summary="Получить список своих посылок",
             description="Возвращает список всех посылок текущего пользователя, включая их типы и стоимость доставки. "
-                        "Поддерживает пагинацию и фильтрацию по типу и факту наличия стоимости доставки.")
+                        "Поддерживает пагинацию и фильтрацию по типу и факту наличия стоимости доставки. "
+                        "Для перехода на следующую страницу передайте в cursor значение заголовка X-Next-Cursor.")
 async def get_user_parcels(
-        offset: int = 0,
-        limit: int = 30,
+        response: Response,
+        offset: int = Query(
+            0, ge=0, le=PARCEL_LIST_MAX_OFFSET,
+            description="Смещение (для совместимости, вместо него используйте cursor)"),
+        limit: int = Query(30, ge=1, description="Количество посылок на странице"),
+        cursor: str | None = Query(
+            None,
+            description="Курсор страницы: значение заголовка X-Next-Cursor предыдущей страницы",
+            example="01ARZ3NDEKTSV4RRFFQ69G5FAV"),
         parcel_type_id: int | None = Query(None),
         has_shipping_cost: bool | None = Query(None),
         parcel_service: ParcelService = Depends(get_parcel_service),
         user_session_id: UUID = Depends(get_user_session)):
+    if cursor is not None:
+        if offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Параметры cursor и offset нельзя использовать вместе"
+            )
+        if not is_valid_parcel_id(cursor):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Неверный формат курсора"
+            )
+        cursor = cursor.upper()
+
     try:
-        parcels = await parcel_service.get_user_parcels(
+        parcels, next_cursor = await parcel_service.get_user_parcels_page(
             user_session_id=user_session_id,
             offset=offset,
             limit=limit,
             parcel_type_id=parcel_type_id,
-            has_shipping_cost=has_shipping_cost
+            has_shipping_cost=has_shipping_cost,
+            cursor=cursor
         )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
 
         return parcels
 
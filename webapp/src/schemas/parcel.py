@@ -7,6 +7,10 @@
 Содержит схемы:
     - ParcelBaseSchema: Базовая схема для представления основной информации о посылке.
     - ParcelRegisterSchema: Схема для создания новой посылки, основанная на ParcelBaseSchema.
+    - ParcelQuoteBatchSchema: Схема для пакетного предварительного расчета стоимости доставки.
+    - ParcelRegisterBatchSchema: Схема для пакетной регистрации посылок.
+    - ParcelBatchItemResultSchema: Схема результата регистрации одной посылки пакета (ULID или ошибка).
+    - ParcelRegisterBatchResultSchema: Схема ответа пакетной регистрации.
     - ParcelReceivedSchema: Схема для ответа о приеме посылки, содержащая только ULID.
     - ParcelSafeSchema: Расширенная схема без информации о пользовательской сессии.
     - ParcelSchema: Полная схема для работы с данными о посылке, включая пользовательскую сессию.
@@ -15,9 +19,12 @@
 
 
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 from pydantic import BaseModel, Field
 
+from config.pricing_conf import PARCEL_QUOTE_MAX_BATCH_SIZE
+from config.parcel_conf import PARCEL_REGISTER_MAX_BATCH_SIZE
 from .ulid import ULIDSchema
 
 class ParcelBaseSchema(BaseModel):
@@ -68,6 +75,86 @@ class ParcelRegisterSchema(ParcelBaseSchema):
     pass
 
 
+class ParcelQuoteBatchSchema(BaseModel):
+    """
+    Pydantic схема для пакетного предварительного расчета стоимости доставки.
+
+    Attributes:
+
+        parcels (list[ParcelRegisterSchema]): Посылки в формате регистрации,
+            не менее одной и не более PARCEL_QUOTE_MAX_BATCH_SIZE.
+    """
+    parcels: list[ParcelRegisterSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=PARCEL_QUOTE_MAX_BATCH_SIZE,
+        description=f"Посылки для расчета стоимости доставки, не более {PARCEL_QUOTE_MAX_BATCH_SIZE}."
+    )
+
+
+class ParcelRegisterBatchSchema(BaseModel):
+    """
+    Pydantic схема для пакетной регистрации посылок.
+
+    Элементы валидируются по ParcelRegisterSchema по отдельности при регистрации,
+    чтобы ошибка в одной посылке не отклоняла весь пакет.
+
+    Attributes:
+
+        parcels (list[dict]): Посылки в формате регистрации (ParcelRegisterSchema),
+            не менее одной и не более PARCEL_REGISTER_MAX_BATCH_SIZE.
+    """
+    parcels: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=PARCEL_REGISTER_MAX_BATCH_SIZE,
+        description=(
+            "Посылки в формате регистрации (как в POST /api/parcels/), "
+            f"не более {PARCEL_REGISTER_MAX_BATCH_SIZE}."
+        ),
+        examples=[[{"name": "Платье белое в горошек", "weight": 0.2, "parcel_type_id": 1, "value": 100.0}]]
+    )
+
+
+class ParcelBatchItemResultSchema(BaseModel):
+    """
+    Pydantic схема результата регистрации одной посылки пакета.
+
+    Attributes:
+
+        id (str|None): ULID зарегистрированной посылки или None, если посылка отклонена,
+        error (str|None): Причина отказа или None, если посылка зарегистрирована.
+    """
+    id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        description="ULID зарегистрированной посылки.",
+        examples=["01ARZ3NDEKTSV4RRFFQ69G5FAV"]
+    )
+    error: str | None = Field(
+        None,
+        description="Причина отказа в регистрации посылки.",
+        examples=["Неизвестный тип посылки: 99"]
+    )
+
+
+class ParcelRegisterBatchResultSchema(BaseModel):
+    """
+    Pydantic схема ответа пакетной регистрации посылок.
+
+    Attributes:
+
+        parcels (list[ParcelBatchItemResultSchema]): Результаты в порядке запроса,
+        registered (int): Количество зарегистрированных посылок.
+    """
+    parcels: list[ParcelBatchItemResultSchema] = Field(
+        ...,
+        description="Результат регистрации каждой посылки в порядке запроса."
+    )
+    registered: int = Field(..., ge=0, description="Количество зарегистрированных посылок.")
+
+
 
 
 class ParcelReceivedSchema(ULIDSchema):
@@ -95,6 +182,7 @@ class ParcelSafeSchema(ParcelBaseSchema, ULIDSchema):
             должна быть положительной,
         id (str): Уникальный идентификатор посылки в формате ULID, должен быть строкой длиной 26 символов,
         shipping_cost (Decimal|None): Стоимость доставки посылки, в рублях, если рассчитана. Может быть None.
+            Может быть нулевой: тариф с нулевыми коэффициентами и min_charge = 0 дает нулевую стоимость.
     """
 
 
@@ -103,7 +191,7 @@ class ParcelSafeSchema(ParcelBaseSchema, ULIDSchema):
         None,
         max_digits=9,
         decimal_places=2,
-        gt=0,
+        ge=0,
         description="Стоимость доставки посылки, если рассчитана. Может быть None."
     )
 
@@ -121,7 +209,9 @@ class ParcelSchema(ParcelSafeSchema):
             должна быть положительной,
         id (str): Уникальный идентификатор посылки в формате ULID, должен быть строкой длиной 26 символов,
         user_session_id (UUID): UUID идентификатор сессии пользователя,
-        shipping_cost (Decimal|None): Стоимость доставки посылки, в рублях, если рассчитана. Может быть None.
+        shipping_cost (Decimal|None): Стоимость доставки посылки, в рублях, если рассчитана. Может быть None,
+        rate_snapshot_id (str|None): ULID снимка курса, по которому рассчитана стоимость доставки,
+        pricing_version (int|None): Версия формулы расчета стоимости доставки.
     """
 
     user_session_id: UUID = Field(
@@ -130,6 +220,19 @@ class ParcelSchema(ParcelSafeSchema):
         examples=["123e4567-e89b-12d3-a456-426614174000"]
     )
 
+    rate_snapshot_id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        description="ULID снимка курса, по которому рассчитана стоимость доставки."
+    )
+
+    pricing_version: int | None = Field(
+        None,
+        ge=1,
+        description="Версия формулы расчета стоимости доставки."
+    )
+
 class ParcelResponseSchema(ParcelSafeSchema):
     """
     Схема для представления полной информации о посылке.
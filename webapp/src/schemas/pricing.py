@@ -0,0 +1,174 @@
+"""
+Модуль: schemas.pricing
+
+Модуль содержит Pydantic схемы, связанные с расчетом стоимости доставки.
+
+Содержит схемы:
+    - RateSnapshotSchema: Снимок курса USD/RUB с его идентификатором.
+    - RatesSnapshotSchema: Снимок курсов нескольких валют к RUB с его идентификатором.
+    - RateFetchResultSchema: Результат (условного) запроса курса у провайдера.
+    - ShippingCostSchema: Рассчитанная стоимость доставки с указанием снимка курса и версии формулы.
+    - ShippingCostsQuoteSchema: Рассчитанная стоимость доставки для набора посылок.
+    - TariffSchema: Тариф доставки для типа посылки.
+"""
+
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+
+class RateSnapshotSchema(BaseModel):
+    """
+    Pydantic схема снимка курса USD/RUB.
+
+    Каждое обновление курса получает новый идентификатор снимка в формате ULID,
+    поэтому снимки упорядочены по времени и сравнимы как строки.
+
+    Attributes:
+        rate (Decimal): Курс доллара к рублю.
+        snapshot_id (str | None): ULID снимка курса. None - курс записан без снимка (до введения снимков).
+    """
+
+    rate: Decimal = Field(
+        ...,
+        gt=0,
+        description="Курс доллара к рублю.",
+        examples=[100.5]
+    )
+    snapshot_id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        description="ULID снимка курса.",
+        examples=["01ARZ3NDEKTSV4RRFFQ69G5FAV"]
+    )
+
+
+class RatesSnapshotSchema(BaseModel):
+    """
+    Pydantic схема снимка курсов нескольких валют к RUB.
+
+    Attributes:
+        rates (dict[str, Decimal]): Курсы (рублей за единицу валюты) по кодам валют.
+        snapshot_id (str | None): ULID снимка курсов.
+    """
+
+    rates: dict[str, Decimal] = Field(
+        ...,
+        description="Курсы валют к рублю по кодам валют.",
+        examples=[{"USD": 100.5, "EUR": 108.25}]
+    )
+    snapshot_id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        description="ULID снимка курсов.",
+        examples=["01ARZ3NDEKTSV4RRFFQ69G5FAV"]
+    )
+
+
+class RateFetchResultSchema(BaseModel):
+    """
+    Pydantic схема результата запроса курса у провайдера.
+
+    Attributes:
+        rate (Decimal | None): Курс доллара к рублю. None, если документ не изменился (304).
+        rates (dict[str, Decimal] | None): Курсы всех валют документа (рублей за единицу валюты).
+        etag (str | None): ETag ответа для следующего условного запроса.
+        last_modified (str | None): Last-Modified ответа для следующего условного запроса.
+        not_modified (bool): Провайдер ответил 304 Not Modified.
+    """
+
+    rate: Decimal | None = Field(None, gt=0, description="Курс доллара к рублю.")
+    rates: dict[str, Decimal] | None = Field(None, description="Курсы всех валют документа к рублю.")
+    etag: str | None = Field(None, description="ETag ответа провайдера.")
+    last_modified: str | None = Field(None, description="Last-Modified ответа провайдера.")
+    not_modified: bool = Field(False, description="Документ с курсом не изменился (304).")
+
+
+class ShippingCostSchema(BaseModel):
+    """
+    Pydantic схема рассчитанной стоимости доставки.
+
+    Attributes:
+        shipping_cost (Decimal): Стоимость доставки в рублях.
+        rate_snapshot_id (str | None): ULID снимка курса, по которому рассчитана стоимость.
+        pricing_version (int): Версия формулы расчета.
+    """
+
+    shipping_cost: Decimal = Field(
+        ...,
+        max_digits=9,
+        decimal_places=2,
+        description="Стоимость доставки в рублях."
+    )
+    rate_snapshot_id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        description="ULID снимка курса, по которому рассчитана стоимость."
+    )
+    pricing_version: int = Field(
+        ...,
+        ge=1,
+        description="Версия формулы расчета стоимости доставки."
+    )
+
+
+class ShippingCostsQuoteSchema(BaseModel):
+    """
+    Pydantic схема ответа пакетного предварительного расчета стоимости доставки.
+
+    Attributes:
+        shipping_costs (list[ShippingCostSchema]): Стоимость доставки каждой посылки в порядке запроса.
+    """
+
+    shipping_costs: list[ShippingCostSchema] = Field(
+        ...,
+        description="Стоимость доставки каждой посылки в порядке запроса."
+    )
+
+
+class TariffSchema(BaseModel):
+    """
+    Pydantic схема тарифа доставки для типа посылки.
+
+    Стоимость доставки: max(вес * per_kg_rate + стоимость * value_rate, min_charge) * курс USD/RUB.
+
+    Attributes:
+        parcel_type_id (int | None): Идентификатор типа посылки. None - тариф по умолчанию.
+        per_kg_rate (Decimal): Ставка за килограмм веса в долларах.
+        value_rate (Decimal): Доля стоимости содержимого посылки.
+        min_charge (Decimal): Минимальная стоимость доставки в долларах.
+    """
+
+    model_config = {"frozen": True}
+
+    parcel_type_id: int | None = Field(
+        None,
+        description="Идентификатор типа посылки. Пусто - тариф по умолчанию.",
+        examples=[1]
+    )
+    per_kg_rate: Decimal = Field(
+        ...,
+        ge=0,
+        max_digits=9,
+        decimal_places=4,
+        description="Ставка за килограмм веса в долларах.",
+        examples=[0.5]
+    )
+    value_rate: Decimal = Field(
+        ...,
+        ge=0,
+        max_digits=6,
+        decimal_places=4,
+        description="Доля стоимости содержимого посылки.",
+        examples=[0.01]
+    )
+    min_charge: Decimal = Field(
+        Decimal("0"),
+        ge=0,
+        max_digits=9,
+        decimal_places=2,
+        description="Минимальная стоимость доставки в долларах.",
+        examples=[0]
+    )
@@ -0,0 +1,60 @@
+"""
+Модуль: schemas.shipping_costs
+
+Модуль содержит Pydantic схемы для распределенного пересчета стоимости доставки
+по диапазонам ULID между воркерами Celery.
+
+Содержит схемы:
+    - ShippingCostsRangeSchema: Диапазон ULID посылок для пересчета.
+    - ShippingCostsRangesSchema: Список диапазонов, на которые разделена очередь пересчета.
+"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+from .ulid import ULID_PATTERN
+
+
+class ShippingCostsRangeSchema(BaseModel):
+    """
+    Pydantic схема диапазона ULID посылок для пересчета стоимости доставки.
+
+    Attributes:
+        start_id (str): Начало диапазона (включительно), ULID длиной 26 символов.
+        end_id (str | None): Конец диапазона (не включительно), ULID длиной 26 символов.
+            None - диапазон без верхней границы.
+
+    Границы сравниваются с колонкой BINARY(16), поэтому проверяются как ULID: некорректный ULID
+    отклоняется с 422, а не ошибкой преобразования в запросе к БД.
+    """
+
+    start_id: str = Field(
+        ...,
+        min_length=26,
+        max_length=26,
+        pattern=ULID_PATTERN,
+        description="Начало диапазона ULID (включительно).",
+        examples=["01ARZ3NDEKTSV4RRFFQ69G5FAV"]
+    )
+    end_id: str | None = Field(
+        None,
+        min_length=26,
+        max_length=26,
+        pattern=ULID_PATTERN,
+        description="Конец диапазона ULID (не включительно). Пусто - без верхней границы.",
+        examples=["01ARZ3NDEKTSV4RRFFQ69G5FAW"]
+    )
+
+
+class ShippingCostsRangesSchema(BaseModel):
+    """
+    Pydantic схема для ответа со списком диапазонов очереди пересчета.
+
+    Attributes:
+        ranges (List[ShippingCostsRangeSchema]): Непересекающиеся диапазоны ULID, упорядоченные по возрастанию.
+    """
+
+    ranges: List[ShippingCostsRangeSchema] = Field(
+        default_factory=list,
+        description="Непересекающиеся диапазоны ULID посылок без стоимости доставки."
+    )
@@ -6,6 +6,9 @@
 Содержит следующую схему:
 
     HealthySchema: Схема для ответа о healthy сервиса.
+    MessageSchema: Схема для ответа о результате операции с сообщением.
+    ShippingCostsUpdateSchema: Схема для ответа о результате пересчета стоимости доставки.
+    RedisPoolStatsSchema: Схема для ответа о состоянии пула соединений Redis.
 
 """
 
@@ -35,4 +38,43 @@ class MessageSchema(BaseModel):
     message: str = Field(
         default="Операция успешно завершена",
         description="Сообщение об успешности операции",
-    )
\ No newline at end of file
+    )
+
+class ShippingCostsUpdateSchema(MessageSchema):
+    """
+    Pydantic схема для ответа о результате пересчета стоимости доставки
+
+    Attributes:
+        message (str): Описание успешного действия
+        updated (int): Количество посылок, для которых рассчитана стоимость доставки
+    """
+
+    updated: int = Field(
+        default=0,
+        ge=0,
+        description="Количество посылок, для которых рассчитана стоимость доставки",
+    )
+
+class RedisPoolStatsSchema(BaseModel):
+    """
+    Pydantic схема для ответа о состоянии пула соединений Redis процесса
+
+    Attributes:
+        max_connections (int): Размер пула
+        in_use (int): Занятые соединения
+        idle (int): Свободные открытые соединения
+        acquisitions (int): Сколько раз соединение получено из пула
+        timeouts (int): Сколько раз соединение не дождались
+        wait_time_total (float): Суммарное время получения соединения, секунд
+        wait_time_avg (float): Среднее время получения соединения, секунд
+        wait_time_max (float): Максимальное время получения соединения, секунд
+    """
+
+    max_connections: int = Field(..., ge=0, description="Размер пула")
+    in_use: int = Field(..., ge=0, description="Занятые соединения")
+    idle: int = Field(..., ge=0, description="Свободные открытые соединения")
+    acquisitions: int = Field(..., ge=0, description="Сколько раз соединение получено из пула")
+    timeouts: int = Field(..., ge=0, description="Сколько раз свободное соединение не дождались")
+    wait_time_total: float = Field(..., ge=0, description="Суммарное время получения соединения, секунд")
+    wait_time_avg: float = Field(..., ge=0, description="Среднее время получения соединения, секунд")
+    wait_time_max: float = Field(..., ge=0, description="Максимальное время получения соединения, секунд")
@@ -13,6 +13,9 @@ ULID (Universally Unique Lexicographically Sortable Identifier) предоста
 
 from pydantic import BaseModel, Field
 
+# ULID в алфавите Crockford base32 (без I, L, O, U) в любом регистре; первый символ не больше 7 (128 бит)
+ULID_PATTERN = r"^[0-7][0-9A-HJKMNP-TV-Za-hjkmnp-tv-z]{25}$"
+
 class ULIDSchema(BaseModel):
     """
     Pydantic схема для представления ULID идентификатора посылки.
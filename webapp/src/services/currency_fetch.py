@@ -5,7 +5,14 @@
     Предоставляет функциональность для получения курса доллара с удаленного API, указанного в `USD_EXCHANGE_API_URL`.
 
 Ключевые особенности:
-    - Использует асинхронный HTTP-клиент для выполнения запросов.
+    - Использует один долгоживущий асинхронный HTTP-клиент с пулом keep-alive соединений.
+      Клиент создается и закрывается в lifespan приложения (initialize_http_client / close_http_client),
+      поэтому повторные запросы не открывают новое TCP+TLS соединение.
+    - Таймауты на соединение и чтение заданы явно: медленный провайдер не может занять задачу бесконечно.
+    - Поддерживает условные запросы (ETag / If-Modified-Since): если документ не изменился,
+      провайдер отвечает 304 без тела.
+    - Разбирает курсы всех валют документа (`Valute`) за один запрос: курс приводится к рублям
+      за единицу валюты с учетом номинала (например, курс JPY публикуется за 100 иен).
     - Преобразует данные из ответа API в значение `Decimal`.
     - Логирует ошибки и предоставляет механизм для обработки исключений.
 
@@ -13,19 +20,59 @@
     - httpx: для выполнения HTTP-запросов.
     - decimal: для работы с денежными значениями.
     - logging: для логирования.
-    - config.pricing_conf: содержит конфигурацию URL для API.
+    - config.pricing_conf: содержит конфигурацию URL для API и таймаутов.
 """
 
 import httpx
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import logging
 
-from config.pricing_conf import USD_EXCHANGE_API_URL
+from schemas.pricing import RateFetchResultSchema
+from config.pricing_conf import (
+    USD_EXCHANGE_API_URL, USD_EXCHANGE_CONNECT_TIMEOUT, USD_EXCHANGE_READ_TIMEOUT, USD_EXCHANGE_MAX_CONNECTIONS,
+    USD_CURRENCY_CODE
+)
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+HTTP_TIMEOUT = httpx.Timeout(
+    USD_EXCHANGE_READ_TIMEOUT,
+    connect=USD_EXCHANGE_CONNECT_TIMEOUT,
+    pool=USD_EXCHANGE_CONNECT_TIMEOUT
+)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=USD_EXCHANGE_MAX_CONNECTIONS,
+    max_keepalive_connections=USD_EXCHANGE_MAX_CONNECTIONS
+)
+
+# --- HTTP-клиент для провайдера курса ---
+http_client: httpx.AsyncClient | None = None
+
+
+async def initialize_http_client() -> None:
+    """
+    Создание HTTP-клиента с пулом соединений при старте приложения.
+    """
+    global http_client
+    http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    logger.info("HTTP-клиент для получения курса валют инициализирован.")
+
+
+async def close_http_client() -> None:
+    """
+    Закрытие HTTP-клиента при завершении работы приложения.
+    """
+    global http_client
+    if http_client:
+        try:
+            await http_client.aclose()
+            logger.info("HTTP-клиент для получения курса валют закрыт.")
+        except Exception as e:
+            logger.error(f"Ошибка при закрытии HTTP-клиента: {e}")
+        http_client = None
+
 
 class CurrencyFetchService:
     """
@@ -33,6 +80,8 @@ class CurrencyFetchService:
 
        Методы:
            - fetch_currency_rate: Асинхронный метод для получения курса доллара.
+           - fetch_currency_rate_conditional: Условный запрос курсов валют (ETag / If-Modified-Since).
+           - parse_rates: Разбор курсов всех валют из документа провайдера.
 
        """
     @staticmethod
@@ -49,18 +98,63 @@ class CurrencyFetchService:
 
         Raises:
             httpx.HTTPStatusError: Если API возвращает ошибочный HTTP-статус.
-            httpx.RequestError: Если возникает ошибка при выполнении HTTP-запроса.
+            httpx.RequestError: Если возникает ошибка при выполнении HTTP-запроса (в том числе таймаут).
             decimal.InvalidOperation: Если ответ API не удалось преобразовать в Decimal.
         """
+        result = await CurrencyFetchService.fetch_currency_rate_conditional(api_url)
+        return result.rate
+
+    @staticmethod
+    async def fetch_currency_rate_conditional(
+            api_url: str | None = USD_EXCHANGE_API_URL,
+            etag: str | None = None,
+            last_modified: str | None = None
+    ) -> RateFetchResultSchema:
+        """
+        Асинхронно получает курс доллара условным запросом.
+
+        Если переданы валидаторы предыдущего ответа и документ не изменился, провайдер отвечает 304,
+        и курс в результате не заполняется (not_modified=True).
+
+        Args:
+            api_url (str, optional): URL API для получения курса доллара.
+            etag (str | None): ETag предыдущего ответа.
+            last_modified (str | None): Last-Modified предыдущего ответа.
+
+        Returns:
+            RateFetchResultSchema: Курсы всех валют (если документ изменился) и валидаторы нового ответа.
+
+        Raises:
+            httpx.HTTPStatusError: Если API возвращает ошибочный HTTP-статус.
+            httpx.RequestError: Если возникает ошибка при выполнении HTTP-запроса (в том числе таймаут).
+            decimal.InvalidOperation: Если ответ API не удалось преобразовать в Decimal.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(api_url)
-                response.raise_for_status()
-                data = response.json()
-                rate = Decimal(data['Valute']['USD']['Value'])
-                rate = rate.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
-                return rate
+            if http_client is not None:
+                response = await http_client.get(api_url, headers=headers)
+            else:
+                # Вне lifespan приложения (например, в скриптах) используем временный клиент
+                async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+                    response = await client.get(api_url, headers=headers)
+
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                logger.info("Курс валют не изменился (304 Not Modified).")
+                return RateFetchResultSchema(not_modified=True, etag=etag, last_modified=last_modified)
+
+            response.raise_for_status()
+            rates = CurrencyFetchService.parse_rates(response.json())
+            return RateFetchResultSchema(
+                rate=rates.get(USD_CURRENCY_CODE),
+                rates=rates,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
         except httpx.HTTPStatusError as e:
             logger.exception(f"HTTP ошибка: {e.response.status_code}")
             raise
@@ -71,5 +165,30 @@ class CurrencyFetchService:
             logger.exception(f"Ошибка преобразования в Decimal: {e}")
             raise
         except Exception as e:
-            print(f"Неожиданная ошибка: {e}")
+            logger.exception(f"Неожиданная ошибка: {e}")
             raise
+
+    @staticmethod
+    def parse_rates(data: dict) -> dict[str, Decimal]:
+        """
+        Разбирает курсы всех валют из документа провайдера.
+
+        Курс публикуется за `Nominal` единиц валюты и округляется до 4 знаков, как у провайдера;
+        результат - рублей за одну единицу валюты.
+
+        Args:
+            data (dict): Документ провайдера с разделом `Valute`.
+
+        Returns:
+            dict[str, Decimal]: Курсы по кодам валют.
+
+        Raises:
+            KeyError: Если в документе нет раздела `Valute` или у валюты нет курса.
+            decimal.InvalidOperation: Если курс не удалось преобразовать в Decimal.
+        """
+        rates = {}
+        for code, currency in data['Valute'].items():
+            value = Decimal(str(currency['Value'])).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+            nominal = int(currency.get('Nominal', 1))
+            rates[code] = value / nominal if nominal != 1 else value
+        return rates
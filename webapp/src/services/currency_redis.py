@@ -2,12 +2,18 @@
 Модуль: services.currency_redis
 
 Назначение:
-    Предоставляет методы для работы с курсом доллара (USD к RUB) в Redis.
-    Служит для получения текущего курса и его сохранения с использованием обертки Redis.
+    Предоставляет методы для работы с курсами валют (к RUB) в Redis.
+    Служит для получения текущих курсов и их сохранения с использованием обертки Redis.
 
 Ключевые особенности:
-    - Получение курса доллара из Redis.
-    - Сохранение курса доллара в Redis с указанием времени жизни ключа.
+    - Курсы всех валют документа провайдера хранятся одним хешем вместе с ULID снимка
+      (меняется при каждом обновлении курса). Хеш заменяется целиком одной транзакцией,
+      поэтому читатель никогда не видит курсы разных снимков вперемешку.
+    - Курсы любого набора валют читаются за одно обращение к Redis (HMGET).
+    - Снимок курса, его оставшееся время жизни и мягкое истечение читаются одним конвейером команд.
+    - Оповещение процессов об обновлении курса.
+    - Хранение валидаторов ответа провайдера (ETag, Last-Modified) и продление времени жизни курса,
+      если провайдер ответил, что курс не изменился.
     - Логирование успешных операций и ошибок.
 
 Зависимости:
@@ -18,7 +24,13 @@
 
 from decimal import Decimal, InvalidOperation
 import logging
-from config.pricing_conf import USD_EXCHANGE_CACHE_EXPIRE, USD_RUB_REDIS_KEY
+from config.pricing_conf import (
+    USD_EXCHANGE_HARD_EXPIRE, EXCHANGE_RATES_REDIS_KEY, EXCHANGE_RATES_SNAPSHOT_FIELD, USD_CURRENCY_CODE,
+    USD_RUB_UPDATES_CHANNEL,
+    USD_RUB_ETAG_REDIS_KEY, USD_RUB_LAST_MODIFIED_REDIS_KEY, USD_RUB_LAST_KNOWN_REDIS_KEY,
+    USD_RUB_SOFT_EXPIRY_REDIS_KEY
+)
+from schemas.pricing import RateSnapshotSchema, RatesSnapshotSchema
 from services.redis_wrapper import RedisWrapper
 from interfaces.cache import ICacheService
 
@@ -32,8 +44,19 @@ class CurrencyRedisService:
     Сервис для работы с курсом доллара в Redis.
 
     Методы:
+        - get_rates: Получает курсы нескольких валют и ULID снимка за одно обращение к Redis.
+        - set_rates: Атомарно сохраняет снимок курсов всех валют с указанием времени жизни.
         - get_usd_rub: Получает курс USD к RUB из Redis.
-        - set_usd_rub: Сохраняет курс USD к RUB в Redis с указанием времени жизни.
+        - get_usd_rub_snapshot: Получает курс USD к RUB вместе с ULID снимка.
+        - get_usd_rub_with_expiry: Получает снимок курса, его время жизни и мягкое истечение за одно обращение.
+        - publish_update: Оповещает процессы об обновлении курса.
+        - get_validators: Получает ETag и Last-Modified последнего ответа провайдера.
+        - set_validators: Сохраняет ETag и Last-Modified ответа провайдера.
+        - extend_usd_rub: Продлевает время жизни курса, снимка и валидаторов.
+        - get_soft_expiry: Получает время мягкого истечения курса.
+        - set_soft_expiry: Сохраняет время мягкого истечения курса.
+        - get_last_known: Получает последний известный снимок курса (без времени жизни).
+        - set_last_known: Сохраняет последний известный снимок курса.
 
     Attributes:
         redis_wrapper (RedisWrapper): Обертка для работы с Redis.
@@ -48,6 +71,59 @@ class CurrencyRedisService:
         """
         self.redis_wrapper = redis_wrapper
 
+    async def get_rates(self, *codes: str) -> RatesSnapshotSchema | None:
+        """
+        Асинхронный метод для получения курсов нескольких валют к RUB за одно обращение к Redis.
+        Курсы и ULID снимка читаются одной командой HMGET из одного хеша, поэтому всегда согласованы.
+
+        Args:
+            *codes (str): Коды валют (например, "USD", "EUR", "CNY").
+
+        Returns:
+            RatesSnapshotSchema | None: Курсы найденных валют и ULID снимка или None, если снимка курсов в Redis нет.
+                Валюты, которых нет в снимке, в результат не попадают.
+        """
+        try:
+            *values, snapshot_id = await self.redis_wrapper.get_hash_fields(
+                EXCHANGE_RATES_REDIS_KEY, *codes, EXCHANGE_RATES_SNAPSHOT_FIELD
+            )
+            rates = {code: Decimal(value) for code, value in zip(codes, values) if value is not None}
+            if snapshot_id is None and not rates:
+                logger.debug("Снимок курсов валют не найден в Redis.")
+                return None
+            return RatesSnapshotSchema(rates=rates, snapshot_id=snapshot_id)
+        except InvalidOperation as e:
+            logger.error(f"Ошибка конвертации значения курса в Decimal: {e}")
+        except Exception as e:
+            logger.error(f"Ошибка при получении курсов валют из Redis: {e}")
+        return None
+
+    async def set_rates(
+            self,
+            rates: dict[str, Decimal],
+            snapshot_id: str,
+            expire: int | None = USD_EXCHANGE_HARD_EXPIRE
+    ) -> None:
+        """
+        Асинхронный метод для атомарной замены снимка курсов всех валют в Redis.
+
+        Args:
+            rates (dict[str, Decimal]): Курсы валют к RUB по кодам валют.
+            snapshot_id (str): ULID снимка курсов.
+            expire (int | None): Время жизни снимка в секундах.
+
+        Raises:
+            :exception: если операция не завершилась успешно.
+        """
+        try:
+            mapping = {code: str(rate) for code, rate in rates.items()}
+            mapping[EXCHANGE_RATES_SNAPSHOT_FIELD] = snapshot_id
+            await self.redis_wrapper.set_hash(EXCHANGE_RATES_REDIS_KEY, mapping, expire)
+            logger.info(f"Снимок курсов {len(rates)} валют успешно сохранен в Redis.")
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении снимка курсов валют в Redis: {e}")
+            raise
+
     async def get_usd_rub(self) -> Decimal | None:
         """
         Асинхронный метод для получения курса USD к RUB из Redis.
@@ -55,38 +131,196 @@ class CurrencyRedisService:
         Returns:
             Decimal | None: Курс USD к RUB, если значение существует, иначе None.
 
-        В отличие от set_usd_rub в случае исключения не передает ее наверх, а возвращает None.
+        В отличие от set_rates в случае исключения не передает ее наверх, а возвращает None.
         Так удобнее обрабатывать
         """
+        rates_snapshot = await self.get_rates(USD_CURRENCY_CODE)
+        if rates_snapshot is None:
+            return None
+        return rates_snapshot.rates.get(USD_CURRENCY_CODE)
+
+    async def get_usd_rub_snapshot(self) -> RateSnapshotSchema | None:
+        """
+        Асинхронный метод для получения снимка курса USD к RUB (курс и ULID снимка) за одно обращение к Redis.
+
+        Returns:
+            RateSnapshotSchema | None: Снимок курса или None, если курса USD в Redis нет.
+        """
+        rates_snapshot = await self.get_rates(USD_CURRENCY_CODE)
+        if rates_snapshot is None or USD_CURRENCY_CODE not in rates_snapshot.rates:
+            return None
+        return RateSnapshotSchema(rate=rates_snapshot.rates[USD_CURRENCY_CODE], snapshot_id=rates_snapshot.snapshot_id)
+
+    async def get_usd_rub_with_expiry(self) -> tuple[RateSnapshotSchema | None, int | None, float | None]:
+        """
+        Асинхронный метод для получения снимка курса USD к RUB, оставшегося времени жизни курса
+        и времени его мягкого истечения одним конвейером команд (HMGET, TTL, GET) за одно обращение к Redis.
+
+        Returns:
+            tuple[RateSnapshotSchema | None, int | None, float | None]: Снимок курса или None, если курса USD
+                в Redis нет; оставшееся время жизни в секундах или None, если оно не задано;
+                Unix timestamp мягкого истечения или None, если он не записан.
+        """
         try:
-            value = await self.redis_wrapper.get_value(USD_RUB_REDIS_KEY)
-            if value is not None:
-                rate = Decimal(value)
-                logger.info("Курс USD к RUB успешно получен из Redis.")
-                return rate
-            logger.warning("Курс USD к RUB не найден в Redis.")
+            (rate, snapshot_id), ttl, soft_expires_at = await (
+                self.redis_wrapper.pipeline()
+                .get_hash_fields(EXCHANGE_RATES_REDIS_KEY, USD_CURRENCY_CODE, EXCHANGE_RATES_SNAPSHOT_FIELD)
+                .get_ttl(EXCHANGE_RATES_REDIS_KEY)
+                .get_value(USD_RUB_SOFT_EXPIRY_REDIS_KEY)
+                .execute()
+            )
+            if rate is None:
+                logger.debug("Курс USD к RUB не найден в Redis.")
+                return None, None, None
+            return (
+                RateSnapshotSchema(rate=Decimal(rate), snapshot_id=snapshot_id),
+                ttl if ttl >= 0 else None,
+                float(soft_expires_at) if soft_expires_at is not None else None
+            )
         except InvalidOperation as e:
             logger.error(f"Ошибка конвертации значения курса в Decimal: {e}")
         except Exception as e:
-            logger.error(f"Ошибка при получении курса USD к RUB из Redis: {e}")
+            logger.error(f"Ошибка при получении курса USD к RUB и его времени жизни из Redis: {e}")
+        return None, None, None
+
+    async def publish_update(self, snapshot_id: str) -> None:
+        """
+        Асинхронный метод для оповещения процессов об обновлении курса USD к RUB.
+        Ошибка не передается наверх: устаревание локальных копий ограничено их временем жизни.
+
+        Args:
+            snapshot_id (str): ULID нового снимка курса.
+        """
+        try:
+            await self.redis_wrapper.publish(USD_RUB_UPDATES_CHANNEL, snapshot_id)
+        except Exception as e:
+            logger.warning(f"Не удалось оповестить процессы об обновлении курса USD к RUB: {e}")
+
+    async def get_validators(self) -> tuple[str | None, str | None]:
+        """
+        Асинхронный метод для получения валидаторов последнего ответа провайдера курса.
+
+        Returns:
+            tuple[str | None, str | None]: ETag и Last-Modified или None, если их нет.
+        """
+        try:
+            etag, last_modified = await self.redis_wrapper.get_many(
+                (USD_RUB_ETAG_REDIS_KEY, USD_RUB_LAST_MODIFIED_REDIS_KEY)
+            )
+            return etag, last_modified
+        except Exception as e:
+            logger.error(f"Ошибка при получении валидаторов курса USD к RUB из Redis: {e}")
+        return None, None
+
+    async def set_validators(
+            self,
+            etag: str | None,
+            last_modified: str | None,
+            expire: int | None = USD_EXCHANGE_HARD_EXPIRE
+    ) -> None:
+        """
+        Асинхронный метод для сохранения валидаторов ответа провайдера курса.
+        Отсутствующий валидатор удаляется, чтобы не отправлять устаревший.
+
+        Args:
+            etag (str | None): ETag ответа.
+            last_modified (str | None): Last-Modified ответа.
+            expire (int | None): Время жизни ключей в секундах.
+        """
+        try:
+            pipeline = self.redis_wrapper.pipeline(transaction=False)
+            for key, value in ((USD_RUB_ETAG_REDIS_KEY, etag), (USD_RUB_LAST_MODIFIED_REDIS_KEY, last_modified)):
+                if value:
+                    pipeline.set_value(key, value, expire)
+                else:
+                    pipeline.delete_value(key)
+            await pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить валидаторы курса USD к RUB в Redis: {e}")
+
+    async def extend_usd_rub(self, expire: int = USD_EXCHANGE_HARD_EXPIRE) -> bool:
+        """
+        Асинхронный метод для продления времени жизни курса, его снимка, мягкого истечения и валидаторов.
+
+        Args:
+            expire (int): Новое время жизни в секундах.
+
+        Returns:
+            bool: True, если курс еще есть в Redis и его время жизни продлено.
+        """
+        try:
+            pipeline = self.redis_wrapper.pipeline()
+            for key in (
+                    EXCHANGE_RATES_REDIS_KEY, USD_RUB_SOFT_EXPIRY_REDIS_KEY,
+                    USD_RUB_ETAG_REDIS_KEY, USD_RUB_LAST_MODIFIED_REDIS_KEY
+            ):
+                pipeline.expire_value(key, expire)
+            extended, *_ = await pipeline.execute()
+            if not extended:
+                return False
+            logger.info("Время жизни курса USD к RUB в Redis продлено.")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при продлении времени жизни курса USD к RUB в Redis: {e}")
+        return False
+
+    async def get_soft_expiry(self) -> float | None:
+        """
+        Асинхронный метод для получения времени мягкого истечения курса USD к RUB.
+
+        Returns:
+            float | None: Unix timestamp мягкого истечения или None, если он не записан.
+        """
+        try:
+            value = await self.redis_wrapper.get_value(USD_RUB_SOFT_EXPIRY_REDIS_KEY)
+            if value is not None:
+                return float(value)
+        except Exception as e:
+            logger.error(f"Ошибка при получении мягкого истечения курса USD к RUB из Redis: {e}")
         return None
 
-    async def set_usd_rub(self, value: Decimal, expire: int | None = USD_EXCHANGE_CACHE_EXPIRE) -> None:
+    async def set_soft_expiry(self, soft_expires_at: float, expire: int | None = USD_EXCHANGE_HARD_EXPIRE) -> None:
         """
-        Асинхронный метод для установки курса USD к RUB в Redis.
+        Асинхронный метод для сохранения времени мягкого истечения курса USD к RUB.
 
         Args:
-            value (Decimal): Значение курса USD к RUB для сохранения.
-            expire (int | None) : Время жизни ключа в секундах (по умолчанию 3600 секунд).
+            soft_expires_at (float): Unix timestamp мягкого истечения.
+            expire (int | None): Время жизни ключа в секундах (жесткое истечение курса).
 
         Raises:
             :exception: если операция не завершилась успешно.
+        """
+        try:
+            await self.redis_wrapper.set_value(USD_RUB_SOFT_EXPIRY_REDIS_KEY, str(soft_expires_at), expire)
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении мягкого истечения курса USD к RUB в Redis: {e}")
+            raise
+
+    async def get_last_known(self) -> RateSnapshotSchema | None:
+        """
+        Асинхронный метод для получения последнего известного снимка курса USD к RUB.
+        Ключ не имеет времени жизни и используется, только если актуальный курс получить не удалось.
 
+        Returns:
+            RateSnapshotSchema | None: Последний известный снимок курса или None.
         """
         try:
-            await self.redis_wrapper.set_value(USD_RUB_REDIS_KEY, str(value), expire)
+            value = await self.redis_wrapper.get_value(USD_RUB_LAST_KNOWN_REDIS_KEY)
+            if value is not None:
+                return RateSnapshotSchema.model_validate_json(value)
+        except Exception as e:
+            logger.error(f"Ошибка при получении последнего известного курса USD к RUB из Redis: {e}")
+        return None
 
-            logger.info("Курс USD к RUB успешно сохранен в Redis.")
+    async def set_last_known(self, rate_snapshot: RateSnapshotSchema) -> None:
+        """
+        Асинхронный метод для сохранения последнего известного снимка курса USD к RUB (без времени жизни).
+        Ошибка не передается наверх: это резервная копия.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса.
+        """
+        try:
+            await self.redis_wrapper.set_value(USD_RUB_LAST_KNOWN_REDIS_KEY, rate_snapshot.model_dump_json())
         except Exception as e:
-            logger.error(f"Ошибка при сохранении курса USD к RUB в Redis: {e}")
-            raise
+            logger.warning(f"Не удалось сохранить последний известный курс USD к RUB в Redis: {e}")
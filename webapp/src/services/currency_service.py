@@ -4,25 +4,57 @@
 Назначение:
     Предоставляет сервис для работы с курсом доллара:
     - Получение курса из Redis.
-    - Обновление курса доллара с удаленного API и сохранение его в Redis.
+    - Обновление курсов валют с удаленного API и сохранение их в Redis.
 
 Особенности:
     - Использует асинхронные вызовы для работы с Redis и API.
     - Инкапсулирует бизнес-логику работы с валютами.
+    - Один запрос к провайдеру обновляет курсы всех валют документа. Каждое обновление получает ULID
+      снимка, который хранится в одном хеше с курсами и заменяется вместе с ними атомарно,
+      поэтому курс и снимок всегда согласованы.
+    - Курс запрашивается условным запросом; ответ 304 только продлевает время жизни курса в Redis.
+    - Снимок курса кэшируется в памяти процесса (services.rate_local_cache) не дольше RATE_LOCAL_CACHE_TTL
+      и не дольше оставшегося времени жизни курса в Redis. После обновления курса процессы оповещаются
+      через Redis pub/sub и сбрасывают локальную копию.
+    - Промах кэша обновляет курс не более одного раза: внутри процесса конкурентные вызовы ждут одну задачу
+      обновления, между процессами курс запрашивает только владелец аренды в Redis, остальные ждут
+      появления курса в Redis. Если курс получить не удалось, отдается последний известный снимок.
+    - Stale-while-revalidate: курс хранится в Redis до жесткого истечения USD_EXCHANGE_HARD_EXPIRE, а после
+      мягкого истечения USD_EXCHANGE_CACHE_EXPIRE еще отдается без ожидания, пока одна фоновая задача
+      (под той же арендой) его обновляет. Ждать обновления приходится, только если курса в Redis нет.
+      После неудачного обновления аренда не освобождается и истекает сама, поэтому провайдер
+      опрашивается не чаще раза в RATE_REFRESH_LEASE_EXPIRE секунд.
+    - Каждый новый снимок курсов добавляется в историю курсов в БД (services.rate_history), если задана
+      фабрика сессий history_session_factory (задается в lifespan). Ошибка записи истории не отменяет
+      обновление курса в Redis.
 
 Зависимости:
     - services.currency_redis: Для взаимодействия с Redis.
     - services.currency_fetch: Для получения курса доллара с удаленного API.
+    - services.rate_local_cache: Локальная копия снимка курса.
+    - services.rate_history: История курсов в БД.
     - config.pricing_conf: Конфигурация, содержащая настройки API и Redis.
 """
 
+import asyncio
 import logging
+import time
 from decimal import Decimal
+from typing import Callable
+
+import ulid
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.currency_redis import CurrencyRedisService
 from services.currency_fetch import CurrencyFetchService
-from config.pricing_conf import USD_EXCHANGE_API_URL, USD_EXCHANGE_CACHE_EXPIRE
+from services.rate_local_cache import rate_local_cache
+from services.rate_history import RateHistoryService
+from config.pricing_conf import (
+    USD_EXCHANGE_API_URL, USD_EXCHANGE_CACHE_EXPIRE, USD_EXCHANGE_HARD_EXPIRE, RATE_LOCAL_CACHE_TTL, RATE_REFRESH_LEASE_REDIS_KEY,
+    RATE_REFRESH_LEASE_EXPIRE, RATE_REFRESH_WAIT, RATE_REFRESH_POLL_INTERVAL
+)
 from interfaces.cache import ICacheService
+from schemas.pricing import RateSnapshotSchema, RatesSnapshotSchema
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +70,30 @@ class CurrencyService:
     Методы:
         - update_usd_rate: Обновляет курс доллара, получая данные из API.
         - get_usd_rate: Возвращает курс доллара из Redis, при необходимости обновляет его.
+        - get_cached_rates: Возвращает курсы нескольких валют только из Redis за одно обращение.
+        - get_cached_usd_rate: Возвращает курс доллара только из Redis, без обращения к API.
+        - get_rate_snapshot: Возвращает снимок курса (курс и его ULID), при необходимости обновляет курс.
+        - get_cached_rate_snapshot: Возвращает снимок курса только из Redis, без обращения к API.
+        - refresh_rate_snapshot: Обновляет курс при промахе кэша не более одного раза на все процессы.
+        - schedule_revalidation: Запускает фоновое обновление устаревшего курса.
     """
 
+    # Задача обновления курса при промахе кэша, общая для всех конкурентных вызовов в процессе
+    _refresh_task: asyncio.Task | None = None
+    # Фоновая задача обновления устаревшего курса, не больше одной на процесс
+    _revalidate_task: asyncio.Task | None = None
+    # Фабрика сессий БД для записи истории курсов. None - история не ведется (например, вне приложения)
+    history_session_factory: Callable[[], AsyncSession] | None = None
+
     @staticmethod
     async def update_usd_rate(redis_wrapper: ICacheService) -> None:
         """
         Обновляет курс доллара в Redis.
 
+        Запрос к провайдеру условный (ETag / If-Modified-Since). Если документ не изменился,
+        время жизни курса в Redis продлевается, а новый снимок не создается. В обоих случаях
+        мягкое истечение курса сдвигается на USD_EXCHANGE_CACHE_EXPIRE от текущего момента.
+
         Args:
             redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
 
@@ -53,18 +102,77 @@ class CurrencyService:
             RuntimeError: Если возникает ошибка при обновлении курса.
         """
         try:
-            rate = await CurrencyFetchService.fetch_currency_rate(USD_EXCHANGE_API_URL)
+            pricing_currency = CurrencyRedisService(redis_wrapper)
+
+            # Условный запрос имеет смысл, только пока курс есть в Redis: иначе продлевать нечего
+            etag, last_modified = None, None
+            if await pricing_currency.get_usd_rub():
+                etag, last_modified = await pricing_currency.get_validators()
+            result = await CurrencyFetchService.fetch_currency_rate_conditional(
+                USD_EXCHANGE_API_URL, etag, last_modified
+            )
+
+            if result.not_modified:
+                # Курс не изменился: продлеваем время жизни, снимок остается прежним
+                if await pricing_currency.extend_usd_rub(USD_EXCHANGE_HARD_EXPIRE):
+                    await pricing_currency.set_soft_expiry(time.time() + USD_EXCHANGE_CACHE_EXPIRE)
+                    rate_local_cache.invalidate()
+                    logger.info("Курс доллара не изменился, время жизни продлено.")
+                    return
+                # Курс успел истечь между проверкой и ответом, запрашиваем документ целиком
+                result = await CurrencyFetchService.fetch_currency_rate_conditional(USD_EXCHANGE_API_URL)
+
+            rate = result.rate
             if not rate:
                 raise ValueError("API не вернул данные о курсе валют.")
 
-            pricing_currency = CurrencyRedisService(redis_wrapper)
-            await pricing_currency.set_usd_rub(rate, USD_EXCHANGE_CACHE_EXPIRE)
-            logger.info(f"Курс доллара успешно обновлен: {rate}")
+            snapshot_id = str(ulid.new())
+            await pricing_currency.set_rates(result.rates, snapshot_id, USD_EXCHANGE_HARD_EXPIRE)
+            await pricing_currency.set_soft_expiry(time.time() + USD_EXCHANGE_CACHE_EXPIRE)
+            await pricing_currency.set_validators(result.etag, result.last_modified, USD_EXCHANGE_HARD_EXPIRE)
+            await pricing_currency.set_last_known(RateSnapshotSchema(rate=rate, snapshot_id=snapshot_id))
+            rate_local_cache.invalidate()
+            await pricing_currency.publish_update(snapshot_id)
+            logger.info(f"Курс доллара успешно обновлен: {rate}, снимок {snapshot_id}")
+            await CurrencyService._record_history(result.rates, snapshot_id)
 
         except Exception as e:
             logger.error(f"Ошибка при обновлении курса доллара: {e}")
             raise RuntimeError(f"Ошибка при обновлении курса доллара: {e}")
 
+    @staticmethod
+    async def _record_history(rates: dict[str, Decimal], snapshot_id: str) -> None:
+        """
+        Добавляет снимок курсов в историю курсов в БД.
+        Ошибка не передается наверх: курс в Redis уже обновлен.
+
+        Args:
+            rates (dict[str, Decimal]): Курсы валют к рублю по кодам валют.
+            snapshot_id (str): ULID снимка курсов.
+        """
+        if CurrencyService.history_session_factory is None:
+            logger.debug(f"История курсов не ведется, снимок {snapshot_id} в нее не записан.")
+            return
+        try:
+            async with CurrencyService.history_session_factory() as db:
+                await RateHistoryService(db).record(rates, snapshot_id)
+        except Exception as e:
+            logger.error(f"Не удалось записать снимок курсов {snapshot_id} в историю: {e}")
+
+    @staticmethod
+    async def get_cached_rates(redis_wrapper: ICacheService, *codes: str) -> RatesSnapshotSchema | None:
+        """
+        Получает курсы нескольких валют к рублю только из Redis за одно обращение. Внешний API не вызывается.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+            *codes (str): Коды валют (например, "EUR", "CNY").
+
+        Returns:
+            RatesSnapshotSchema | None: Курсы найденных валют и ULID снимка или None, если курсов в Redis нет.
+        """
+        return await CurrencyRedisService(redis_wrapper).get_rates(*codes)
+
     @staticmethod
     async def get_usd_rate(redis_wrapper: ICacheService) -> Decimal:
         """
@@ -80,12 +188,204 @@ class CurrencyService:
             ValueError: Если курс недоступен даже после обновления.
 
         """
-        pricing_currency = CurrencyRedisService(redis_wrapper)
-        usd_to_rub = await pricing_currency.get_usd_rub()
-        if not usd_to_rub:
+        rate_snapshot = await CurrencyService.get_rate_snapshot(redis_wrapper)
+        return rate_snapshot.rate
+
+    @staticmethod
+    async def get_cached_usd_rate(redis_wrapper: ICacheService) -> Decimal | None:
+        """
+        Получает курс доллара только из Redis. Внешний API не вызывается.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+
+        Returns:
+            Decimal | None: Курс доллара или None, если в Redis его нет.
+        """
+        rate_snapshot = await CurrencyService.get_cached_rate_snapshot(redis_wrapper)
+        return rate_snapshot.rate if rate_snapshot else None
+
+    @staticmethod
+    async def get_rate_snapshot(redis_wrapper: ICacheService) -> RateSnapshotSchema:
+        """
+        Получает снимок курса доллара из Redis. Если курс отсутствует, инициирует его обновление.
+        Устаревший курс возвращается сразу, а его обновление запускается в фоне.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+
+        Returns:
+            RateSnapshotSchema: Курс доллара и ULID его снимка.
+
+        Raises:
+            ValueError: Если курс недоступен даже после обновления.
+        """
+        rate_snapshot = await CurrencyService.get_cached_rate_snapshot(redis_wrapper, revalidate=True)
+        if not rate_snapshot:
             logger.info("Курс валюты отсутствует в Redis, обновляем...")
-            await CurrencyService.update_usd_rate(redis_wrapper)
-            usd_to_rub = await pricing_currency.get_usd_rub()
-            if not usd_to_rub:
-                raise ValueError("Курс валют недоступен даже после обновления.")
-        return usd_to_rub
+            rate_snapshot = await CurrencyService.refresh_rate_snapshot(redis_wrapper)
+        return rate_snapshot
+
+    @staticmethod
+    async def refresh_rate_snapshot(redis_wrapper: ICacheService) -> RateSnapshotSchema:
+        """
+        Обновляет курс при промахе кэша. Конкурентные вызовы в процессе ждут одну и ту же задачу обновления.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+
+        Returns:
+            RateSnapshotSchema: Актуальный или последний известный снимок курса.
+
+        Raises:
+            ValueError: Если курс недоступен даже после обновления и последнего известного курса нет.
+        """
+        task = CurrencyService._refresh_task
+        if task is None or task.done():
+            task = asyncio.create_task(CurrencyService._refresh_rate_snapshot(redis_wrapper))
+            CurrencyService._refresh_task = task
+        # shield: отмена одного из ожидающих запросов не должна отменять общее обновление
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _refresh_rate_snapshot(redis_wrapper: ICacheService) -> RateSnapshotSchema:
+        """
+        Обновляет курс под арендой в Redis: курс у провайдера запрашивает только один процесс.
+
+        Владелец аренды обновляет курс и после успешного обновления освобождает аренду (после неудачного
+        аренда истекает сама). Остальные процессы ждут до RATE_REFRESH_WAIT секунд появления курса в Redis. Если курс так и не появился (или обновление не удалось),
+        возвращается последний известный снимок курса.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+
+        Returns:
+            RateSnapshotSchema: Актуальный или последний известный снимок курса.
+
+        Raises:
+            ValueError: Если курс недоступен и последнего известного курса нет.
+        """
+        lease_id = str(ulid.new())
+        if await redis_wrapper.set_if_absent(RATE_REFRESH_LEASE_REDIS_KEY, lease_id, RATE_REFRESH_LEASE_EXPIRE):
+            try:
+                # Курс мог обновить предыдущий владелец аренды, пока мы получали свою
+                rate_snapshot = await CurrencyService.get_cached_rate_snapshot(redis_wrapper)
+                if rate_snapshot:
+                    await CurrencyService._release_refresh_lease(redis_wrapper, lease_id)
+                    return rate_snapshot
+                await CurrencyService.update_usd_rate(redis_wrapper)
+                await CurrencyService._release_refresh_lease(redis_wrapper, lease_id)
+            except RuntimeError as e:
+                # Аренду не освобождаем: повторная попытка не раньше чем через RATE_REFRESH_LEASE_EXPIRE
+                logger.warning(f"Не удалось обновить курс при промахе кэша: {e}")
+            rate_snapshot = await CurrencyService.get_cached_rate_snapshot(redis_wrapper)
+            if rate_snapshot:
+                return rate_snapshot
+        else:
+            logger.info("Курс обновляет другой процесс, ожидаем...")
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + RATE_REFRESH_WAIT
+            while loop.time() < deadline:
+                await asyncio.sleep(RATE_REFRESH_POLL_INTERVAL)
+                rate_snapshot = await CurrencyService.get_cached_rate_snapshot(redis_wrapper)
+                if rate_snapshot:
+                    return rate_snapshot
+
+        rate_snapshot = await CurrencyRedisService(redis_wrapper).get_last_known()
+        if rate_snapshot:
+            logger.warning(f"Используем последний известный курс {rate_snapshot.rate}, снимок {rate_snapshot.snapshot_id}")
+            return rate_snapshot
+        raise ValueError("Курс валют недоступен даже после обновления.")
+
+    @staticmethod
+    def schedule_revalidation(redis_wrapper: ICacheService) -> None:
+        """
+        Запускает фоновое обновление устаревшего курса, если оно еще не идет в этом процессе.
+        Вызывающий не ждет обновления и продолжает работать с устаревшим курсом.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+        """
+        for task in (CurrencyService._refresh_task, CurrencyService._revalidate_task):
+            if task is not None and not task.done():
+                return
+        CurrencyService._revalidate_task = asyncio.create_task(CurrencyService._revalidate(redis_wrapper))
+
+    @staticmethod
+    async def _revalidate(redis_wrapper: ICacheService) -> None:
+        """
+        Обновляет устаревший курс под арендой в Redis. Если аренда занята, курс уже обновляет другой процесс.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+        """
+        lease_id = str(ulid.new())
+        try:
+            if not await redis_wrapper.set_if_absent(
+                    RATE_REFRESH_LEASE_REDIS_KEY, lease_id, RATE_REFRESH_LEASE_EXPIRE
+            ):
+                return
+            # Курс мог обновить другой процесс, пока локальная копия считала его устаревшим
+            soft_expires_at = await CurrencyRedisService(redis_wrapper).get_soft_expiry()
+            if soft_expires_at is not None and time.time() < soft_expires_at:
+                rate_local_cache.invalidate()
+            else:
+                await CurrencyService.update_usd_rate(redis_wrapper)
+            await CurrencyService._release_refresh_lease(redis_wrapper, lease_id)
+        except Exception as e:
+            # Аренду не освобождаем: устаревший курс продолжает отдаваться, повтор - после ее истечения
+            logger.warning(f"Не удалось обновить устаревший курс в фоне: {e}")
+
+    @staticmethod
+    async def _release_refresh_lease(redis_wrapper: ICacheService, lease_id: str) -> None:
+        """
+        Освобождает аренду на обновление курса, если она все еще принадлежит этому вызову.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+            lease_id (str): Идентификатор аренды.
+        """
+        try:
+            if await redis_wrapper.get_value(RATE_REFRESH_LEASE_REDIS_KEY) == lease_id:
+                await redis_wrapper.delete_value(RATE_REFRESH_LEASE_REDIS_KEY)
+        except Exception as e:
+            # Аренда освободится сама по истечении RATE_REFRESH_LEASE_EXPIRE
+            logger.warning(f"Не удалось освободить аренду на обновление курса: {e}")
+
+    @staticmethod
+    async def get_cached_rate_snapshot(
+            redis_wrapper: ICacheService,
+            revalidate: bool = False
+    ) -> RateSnapshotSchema | None:
+        """
+        Получает снимок курса доллара из локальной копии процесса или из Redis. Внешний API не вызывается.
+
+        Курс, ULID снимка, время жизни курса и его мягкое истечение читаются из Redis одним обращением
+        (конвейер команд). Прочитанный из Redis снимок сохраняется
+        в локальную копию на время не больше оставшегося времени жизни курса в Redis.
+
+        Args:
+            redis_wrapper (ICacheService): Экземпляр обертки для взаимодействия с Redis.
+            revalidate (bool): Запустить фоновое обновление, если курс прошел мягкое истечение.
+
+        Returns:
+            RateSnapshotSchema | None: Курс доллара и ULID его снимка или None, если курса в Redis нет.
+        """
+        rate_snapshot = rate_local_cache.get()
+        if rate_snapshot:
+            if revalidate and rate_local_cache.is_stale():
+                CurrencyService.schedule_revalidation(redis_wrapper)
+            return rate_snapshot
+
+        rate_snapshot, ttl, soft_expires_at = await CurrencyRedisService(redis_wrapper).get_usd_rub_with_expiry()
+        if not rate_snapshot:
+            return None
+
+        rate_local_cache.set(
+            rate_snapshot,
+            RATE_LOCAL_CACHE_TTL if ttl is None else min(ttl, RATE_LOCAL_CACHE_TTL),
+            soft_expires_at
+        )
+        if revalidate and rate_local_cache.is_stale():
+            CurrencyService.schedule_revalidation(redis_wrapper)
+        return rate_snapshot
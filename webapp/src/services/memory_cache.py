@@ -0,0 +1,237 @@
+"""
+Модуль: services.memory_cache
+
+Назначение:
+    Реализация интерфейса ICacheService в памяти процесса для тестов. tests/test_cache_contract.py
+    проверяет, что она возвращает те же результаты, что и RedisWrapper.
+
+Ключевые особенности:
+    - Поддерживает те же операции, что и RedisWrapper: значения и хеши со временем жизни, SET NX,
+      операции над несколькими ключами, счетчики, битовые карты, конвейер команд, публикацию и подписку.
+    - Битовая карта хранится как множество смещений установленных битов.
+    - Время жизни отсчитывается по time.monotonic(), истекшие ключи удаляются при обращении.
+    - Конвейер выполняет команды подряд без переключения задач, поэтому он всегда атомарен.
+    - Не разделяется между процессами и не заменяет Redis в приложении.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Mapping, Sequence
+
+
+class InMemoryPipeline:
+    """
+    Конвейер команд InMemoryCacheService: команды накапливаются и выполняются подряд в execute.
+    """
+
+    def __init__(self, cache: "InMemoryCacheService"):
+        self._cache = cache
+        self._commands: list[Callable[[], Any]] = []
+
+    def get_value(self, key: str) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._get(key))
+        return self
+
+    def set_value(self, key: str, value: str, expire: int | None = None) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._set(key, value, expire))
+        return self
+
+    def delete_value(self, key: str) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._delete(key))
+        return self
+
+    def expire_value(self, key: str, expire: int) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._expire(key, expire))
+        return self
+
+    def get_ttl(self, key: str) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._ttl(key))
+        return self
+
+    def increment(self, key: str, amount: int = 1) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._increment(key, amount))
+        return self
+
+    def set_hash_fields(self, key: str, mapping: Mapping[str, str]) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._set_hash_fields(key, mapping))
+        return self
+
+    def get_hash_fields(self, key: str, *fields: str) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._get_hash_fields(key, fields))
+        return self
+
+    def get_bits(self, key: str, offsets: Sequence[int]) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._get_bits(key, offsets))
+        return self
+
+    def set_bits(self, key: str, offsets: Sequence[int]) -> "InMemoryPipeline":
+        self._commands.append(lambda: self._cache._set_bits(key, offsets))
+        return self
+
+    async def execute(self) -> list[Any]:
+        """
+        Выполняет накопленные команды.
+
+        Returns:
+            list[Any]: Результаты команд в порядке их добавления.
+        """
+        commands, self._commands = self._commands, []
+        return [command() for command in commands]
+
+
+class InMemoryCacheService:
+    """
+    Кэш в памяти процесса с интерфейсом ICacheService.
+    """
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+        self._expires_at: dict[str, float] = {}
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+
+    # --- Синхронные операции, общие для методов и конвейера ---
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._delete(key)
+        return key in self._data
+
+    def _get(self, key: str) -> Any:
+        return self._data.get(key) if self._alive(key) else None
+
+    def _set(self, key: str, value: Any, expire: int | None) -> bool:
+        self._data[key] = value
+        if expire is not None:
+            self._expires_at[key] = time.monotonic() + expire
+        else:
+            self._expires_at.pop(key, None)
+        return True
+
+    def _delete(self, key: str) -> int:
+        self._expires_at.pop(key, None)
+        return 1 if self._data.pop(key, None) is not None else 0
+
+    def _expire(self, key: str, expire: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires_at[key] = time.monotonic() + expire
+        return True
+
+    def _ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        if key not in self._expires_at:
+            return -1
+        return max(0, round(self._expires_at[key] - time.monotonic()))
+
+    def _increment(self, key: str, amount: int) -> int:
+        value = int(self._get(key) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    def _set_hash_fields(self, key: str, mapping: Mapping[str, str]) -> int:
+        fields = self._get(key)
+        if fields is None:
+            fields = self._data[key] = {}
+        added = sum(1 for field in mapping if field not in fields)
+        fields.update(mapping)
+        return added
+
+    def _get_hash_fields(self, key: str, fields: Sequence[str]) -> list[str | None]:
+        values = self._get(key) or {}
+        return [values.get(field) for field in fields]
+
+    def _get_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        bits = self._get(key) or set()
+        return [1 if offset in bits else 0 for offset in offsets]
+
+    def _set_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        bits = self._get(key)
+        if bits is None:
+            bits = self._data[key] = set()
+        previous = []
+        for offset in offsets:
+            previous.append(1 if offset in bits else 0)
+            bits.add(offset)
+        return previous
+
+    # --- ICacheService ---
+
+    async def get_value(self, key: str) -> str | None:
+        return self._get(key)
+
+    async def set_value(self, key: str, value: str, expire: int | None = None) -> None:
+        self._set(key, value, expire)
+
+    async def set_if_absent(self, key: str, value: str, expire: int | None = None) -> bool:
+        if self._alive(key):
+            return False
+        return self._set(key, value, expire)
+
+    async def delete_value(self, key: str) -> None:
+        self._delete(key)
+
+    async def expire_value(self, key: str, expire: int) -> bool:
+        return self._expire(key, expire)
+
+    async def get_ttl(self, key: str) -> int | None:
+        ttl = self._ttl(key)
+        return ttl if ttl >= 0 else None
+
+    async def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        return [self._get(key) for key in keys]
+
+    async def set_many(
+            self,
+            values: Mapping[str, str],
+            expire: int | None | Mapping[str, int | None] = None
+    ) -> None:
+        for key, value in values.items():
+            self._set(key, value, expire.get(key) if isinstance(expire, Mapping) else expire)
+
+    async def increment(self, key: str, amount: int = 1, expire: int | None = None) -> int:
+        value = self._increment(key, amount)
+        if expire is not None and value == amount:
+            self._expire(key, expire)
+        return value
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    async def get_hash(self, key: str) -> dict[str, str]:
+        return dict(self._get(key) or {})
+
+    async def set_hash(self, key: str, mapping: dict[str, str], expire: int | None = None) -> None:
+        self._set(key, dict(mapping), expire)
+
+    async def get_hash_fields(self, key: str, *fields: str) -> list[str | None]:
+        return self._get_hash_fields(key, fields)
+
+    async def get_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        return self._get_bits(key, offsets)
+
+    async def set_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        return self._set_bits(key, offsets)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(message)
+
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        """
+        Подписывается на канал и возвращает сообщения, опубликованные после подписки.
+
+        Args:
+            channel (str): Канал.
+
+        Yields:
+            str: Сообщение из канала.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
@@ -4,11 +4,20 @@
 Служит для получения информации о посылках из базы данных, используя SQLAlchemy.
 Предоставляет методы для получения данных о конкретной посылке и списка посылок для пользователя,
 с поддержкой фильтрации и пагинации.
+
+Имя типа посылки подставляется из справочника типов в памяти процесса (services.parcel_type_registry),
+поэтому чтение посылок - один запрос к таблице parcels, без загрузки parcel_types.
+
+Посылки читаются проекцией колонок (PARCEL_RESPONSE_COLUMNS), а не ORM-сущностями: строки результата
+не попадают в identity map сессии, а user_session_id и служебные колонки расчета стоимости не выбираются.
+Строки переносятся в ParcelResponseSchema без повторной валидации (model_construct): значения уже
+ограничены типами и ограничениями колонок БД.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import ValidationError
 from uuid import UUID
@@ -17,6 +26,7 @@ import logging
 
 from models.parcel import ParcelModel
 from schemas.parcel import ParcelResponseSchema
+from services.parcel_type_registry import parcel_type_registry
 from exceptions.exceptions import ParcelNotFoundError, ParcelDatabaseError, ParcelValidationError
 
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +36,16 @@ logger = logging.getLogger(__name__)
 # Можно было бы сделать через pydantic, но мы сделаем просто попроще.
 SHIPPING_COST_NOT_CALCULATED = "Не рассчитано"
 
+# Колонки карточки посылки. Пользовательская сессия не выбирается (в ответ она не включается)
+PARCEL_RESPONSE_COLUMNS = (
+    ParcelModel.id,
+    ParcelModel.name,
+    ParcelModel.weight,
+    ParcelModel.parcel_type_id,
+    ParcelModel.value,
+    ParcelModel.shipping_cost,
+)
+
 
 class ParcelService:
     """
@@ -42,6 +62,36 @@ class ParcelService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @staticmethod
+    def response_from_row(row: Row, parcel_type_names: dict[int, str]) -> ParcelResponseSchema:
+        """
+        Формирует карточку посылки из строки с колонками PARCEL_RESPONSE_COLUMNS.
+
+        Значения из БД не валидируются повторно. Если имени типа посылки нет в справочнике,
+        карточка строится с полной валидацией, которая завершится ошибкой.
+
+        Args:
+            row (Row): Строка результата запроса.
+            parcel_type_names (dict[int, str]): Имена типов посылок по идентификатору.
+
+        Returns:
+            ParcelResponseSchema: Карточка посылки.
+
+        Raises:
+            ValidationError: Если имя типа посылки неизвестно.
+        """
+        parcel_type_name = parcel_type_names.get(row.parcel_type_id)
+        schema = ParcelResponseSchema if parcel_type_name is None else ParcelResponseSchema.model_construct
+        return schema(
+            id=row.id,
+            name=row.name,
+            weight=row.weight,
+            parcel_type_id=row.parcel_type_id,
+            parcel_type_name=parcel_type_name,
+            value=row.value,
+            shipping_cost=row.shipping_cost or SHIPPING_COST_NOT_CALCULATED
+        )
+
     async def get_parcel_by_id(self, parcel_id: str) -> ParcelResponseSchema:
         """
         Получает данные о посылке по её ID.
@@ -62,26 +112,18 @@ class ParcelService:
             logger.info(f"Поиск информации о посылке {parcel_id}")
 
             result = await self.db.execute(
-                select(ParcelModel)
-                .options(selectinload(ParcelModel.parcel_type))
-                .where(ParcelModel.id == parcel_id)  # type: ignore
+                select(*PARCEL_RESPONSE_COLUMNS).where(ParcelModel.id == parcel_id)  # type: ignore
             )
-            parcel = result.scalars().first()
+            parcel = result.first()
 
             if not parcel:
-                logger.warning(f"Посылка с ID {parcel_id} не найдена.")
+                logger.info(f"Посылка с ID {parcel_id} не найдена.")
                 raise ParcelNotFoundError(f"Посылка с ID {parcel_id} не найдена.")
 
+            parcel_type_names = await parcel_type_registry.resolve_names(self.db, [parcel.parcel_type_id])
+
             # Формирование ответа. Важно: пользовательскую сессию не включаем (из соображений безопасности)
-            response = ParcelResponseSchema(
-                id=parcel.id,
-                name=parcel.name,
-                weight=parcel.weight,
-                parcel_type_id=parcel.parcel_type_id,
-                parcel_type_name=parcel.parcel_type.name,
-                value=parcel.value,
-                shipping_cost=parcel.shipping_cost or SHIPPING_COST_NOT_CALCULATED
-            )
+            response = self.response_from_row(parcel, parcel_type_names)
 
             logger.info(f"Посылка с ID {parcel_id} успешно найдена.")
             return response
@@ -103,13 +145,64 @@ class ParcelService:
             raise e
 
 
+    @staticmethod
+    def user_parcels_query(
+            user_session_id: UUID,
+            offset: int = 0,
+            limit: int = 30,
+            parcel_type_id: int | None = None,
+            has_shipping_cost: bool | None = None,
+            cursor: str | None = None
+    ) -> Select:
+        """
+        Строит запрос страницы посылок пользователя.
+
+        Форма запроса (WHERE user_session_id = ? [AND parcel_type_id = ?] [AND id > ?] ORDER BY id) совпадает
+        с индексами ix_parcels_user_session_id_id и ix_parcels_user_session_id_parcel_type_id_id, поэтому страница
+        читается по индексу в порядке ULID без сортировки. С курсором (keyset) страница начинается сразу
+        с нужной строки индекса, а со смещением MySQL читает и отбрасывает offset строк.
+        Используется также в тестах плана запроса.
+
+        Args:
+            user_session_id (UUID): Идентификатор пользовательской сессии,
+            offset (int): Смещение для пагинации,
+            limit (int): Максимальное количество посылок,
+            parcel_type_id (int|None): Фильтр по ID типа посылки,
+            has_shipping_cost (bool|None): Фильтр по факту наличия рассчитанной стоимости доставки,
+            cursor (str|None): ULID последней посылки предыдущей страницы, страница начинается после него.
+
+        Returns:
+            Select: Запрос колонок карточек посылок (PARCEL_RESPONSE_COLUMNS).
+        """
+        query = select(*PARCEL_RESPONSE_COLUMNS).where(
+            ParcelModel.user_session_id == user_session_id  # type: ignore
+        )
+
+        # если задана фильтрация по типу посылки...
+        if parcel_type_id is not None:
+            query = query.where(ParcelModel.parcel_type_id == parcel_type_id)
+
+        # если задана фильтрация по факту наличия рассчитанной стоимости доставки...
+        if has_shipping_cost is not None:
+            if has_shipping_cost:
+                query = query.where(ParcelModel.shipping_cost.isnot(None))
+            else:
+                query = query.where(ParcelModel.shipping_cost.is_(None))
+
+        if cursor is not None:
+            query = query.where(ParcelModel.id > cursor)
+
+        # Так как используем ULID, добавляем сортировку по полю id
+        return query.order_by(ParcelModel.id).offset(offset).limit(limit)
+
     async def get_user_parcels(
             self,
             user_session_id: UUID,
             offset: int = 0,
             limit: int = 30,
             parcel_type_id: int | None = None,
-            has_shipping_cost: bool | None  = None
+            has_shipping_cost: bool | None  = None,
+            cursor: str | None = None
     ) -> List[ParcelResponseSchema]:
         """
         Получает список посылок текущего пользователя с возможностью фильтрации.
@@ -120,7 +213,8 @@ class ParcelService:
             limit (int): Максимальное количество посылок для получения, по умолчанию 30,
             parcel_type_id (int|None): Необязательный параметр для возможности фильтровать посылки по ID типа посылки,
             has_shipping_cost (bool|None): Необязательный параметр для возможности фильтровать посылки
-                по факту наличия рассчитанной стоимости доставки.
+                по факту наличия рассчитанной стоимости доставки,
+            cursor (str|None): ULID последней посылки предыдущей страницы (keyset-пагинация).
 
         Returns:
             List[ParcelResponseSchema]: Список объектов ParcelResponseSchema с информацией о посылках.
@@ -132,38 +226,13 @@ class ParcelService:
         """
         try:
             logger.info(f"Поиск информации о посылках для пользователя с сессией {user_session_id}.")
-            query = select(ParcelModel).options(selectinload(ParcelModel.parcel_type)).where(
-                ParcelModel.user_session_id == user_session_id  # type: ignore
+            query = self.user_parcels_query(user_session_id, offset, limit, parcel_type_id, has_shipping_cost, cursor)
+            result = await self.db.execute(query)
+            parcels = result.all()
+            parcel_type_names = await parcel_type_registry.resolve_names(
+                self.db, {parcel.parcel_type_id for parcel in parcels}
             )
-
-            # если задана фильтрация по типу посылки...
-            if parcel_type_id is not None:
-                query = query.where(ParcelModel.parcel_type_id == parcel_type_id)
-
-            # если задана фильтрация по факту наличия рассчитанной стоимости доставки...
-            if has_shipping_cost is not None:
-                if has_shipping_cost:
-                    query = query.where(ParcelModel.shipping_cost.isnot(None))
-                else:
-                    query = query.where(ParcelModel.shipping_cost.is_(None))
-
-            # Так как используем ULID, добавляем сортировку по полю id
-            query = query.order_by(ParcelModel.id)
-
-            result = await self.db.execute(query.offset(offset).limit(limit))
-            parcels = result.scalars().all()
-            response_list = [
-                ParcelResponseSchema(
-                    id=parcel.id,
-                    name=parcel.name,
-                    weight=parcel.weight,
-                    parcel_type_id=parcel.parcel_type_id,
-                    parcel_type_name=parcel.parcel_type.name,
-                    value=parcel.value,
-                    shipping_cost = parcel.shipping_cost or SHIPPING_COST_NOT_CALCULATED
-                )
-                for parcel in parcels
-            ]
+            response_list = [self.response_from_row(parcel, parcel_type_names) for parcel in parcels]
 
             logger.info(f"Получено {len(response_list)} посылок для пользователя с сессией {user_session_id}.")
             return response_list
@@ -178,4 +247,38 @@ class ParcelService:
 
         except Exception as e:
             logger.exception(f"Неизвестная ошибка при получении посылок для пользователя {user_session_id}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def get_user_parcels_page(
+            self,
+            user_session_id: UUID,
+            offset: int = 0,
+            limit: int = 30,
+            parcel_type_id: int | None = None,
+            has_shipping_cost: bool | None = None,
+            cursor: str | None = None
+    ) -> tuple[List[ParcelResponseSchema], str | None]:
+        """
+        Получает страницу посылок пользователя и курсор следующей страницы.
+
+        Запрашивается limit + 1 посылка: лишняя посылка означает, что следующая страница есть,
+        и отдельный запрос количества не нужен.
+
+        Args:
+            user_session_id (UUID): Идентификатор пользовательской сессии,
+            offset (int): Смещение для пагинации (для совместимости, с курсором не используется),
+            limit (int): Максимальное количество посылок на странице,
+            parcel_type_id (int|None): Фильтр по ID типа посылки,
+            has_shipping_cost (bool|None): Фильтр по факту наличия рассчитанной стоимости доставки,
+            cursor (str|None): ULID последней посылки предыдущей страницы.
+
+        Returns:
+            tuple[List[ParcelResponseSchema], str | None]: Посылки страницы и курсор следующей страницы
+                (ULID последней посылки страницы) или None, если страница последняя.
+        """
+        parcels = await self.get_user_parcels(
+            user_session_id, offset, limit + 1, parcel_type_id, has_shipping_cost, cursor
+        )
+        if len(parcels) <= limit:
+            return parcels, None
+        return parcels[:limit], parcels[limit - 1].id
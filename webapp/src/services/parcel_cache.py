@@ -0,0 +1,125 @@
+"""
+Модуль: services.parcel_cache
+
+Назначение:
+    Кэш карточек посылок (ParcelResponseSchema) в Redis для чтения посылки по ID (read-through).
+
+Ключевые особенности:
+    - Карточка хранится в виде JSON под ключом PARCEL_CACHE_KEY_PREFIX + ULID посылки.
+    - Посылка с рассчитанной стоимостью доставки меняется только при пересчете устаревших цен, поэтому
+      живет в кэше долго (PARCEL_CACHE_TTL). Посылка без стоимости живет недолго (PARCEL_CACHE_UNPRICED_TTL):
+      стоимость может быть рассчитана в любой момент.
+    - Пересчет стоимости доставки (services.shipping_costs_update_service) после коммита каждой порции
+      заменяет карточки ее посылок меткой удаления (PARCEL_CACHE_INVALIDATED) на PARCEL_CACHE_INVALIDATION_TTL.
+      Режим "sql" обновляет посылки без списка id, и для него устаревание ограничено коротким временем жизни
+      карточки без стоимости.
+    - Карточка записывается только если ключа нет (SET NX), поэтому метка удаления не перезаписывается.
+      Запрос, прочитавший посылку из БД до коммита пересчета и записывающий карточку после него, иначе
+      оставил бы в кэше карточку без стоимости или, при пересчете устаревших цен (reprice_stale),
+      со старой ценой на PARCEL_CACHE_TTL.
+    - Метка удаления живет дольше задержки репликации, поэтому отстающая реплика тоже не вернет в кэш
+      цену, которую пересчет уже заменил. Карточки из реплики живут столько же, сколько из основной БД.
+    - Ошибки кэша только логируются: при недоступном Redis посылка читается из БД.
+
+Зависимости:
+    - interfaces.cache: Интерфейс кэша.
+"""
+
+import logging
+from typing import Sequence
+
+from pydantic import ValidationError
+
+from interfaces.cache import ICacheService
+from schemas.parcel import ParcelResponseSchema
+from config.parcel_conf import (
+    PARCEL_CACHE_KEY_PREFIX, PARCEL_CACHE_TTL, PARCEL_CACHE_UNPRICED_TTL,
+    PARCEL_CACHE_INVALIDATED, PARCEL_CACHE_INVALIDATION_TTL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ParcelCache:
+    """
+    Кэш карточек посылок.
+
+    Attributes:
+        cache (ICacheService): Кэш для хранения карточек.
+    """
+
+    def __init__(self, cache: ICacheService):
+        self.cache = cache
+
+    @staticmethod
+    def key(parcel_id: str) -> str:
+        """
+        Возвращает ключ карточки посылки в кэше.
+
+        Args:
+            parcel_id (str): ULID посылки.
+
+        Returns:
+            str: Ключ в кэше.
+        """
+        return f"{PARCEL_CACHE_KEY_PREFIX}{parcel_id}"
+
+    async def get(self, parcel_id: str) -> ParcelResponseSchema | None:
+        """
+        Возвращает карточку посылки из кэша.
+
+        Args:
+            parcel_id (str): ULID посылки.
+
+        Returns:
+            ParcelResponseSchema | None: Карточка посылки или None при промахе, метке удаления и ошибке кэша.
+        """
+        try:
+            value = await self.cache.get_value(self.key(parcel_id))
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать посылку {parcel_id} из кэша: {e}")
+            return None
+        if value is None or value == PARCEL_CACHE_INVALIDATED:
+            return None
+        try:
+            return ParcelResponseSchema.model_validate_json(value)
+        except ValidationError as e:
+            # Карточка в старом формате: считаем промахом, она будет перезаписана
+            logger.warning(f"Некорректная карточка посылки {parcel_id} в кэше: {e}")
+            return None
+
+    async def set(self, parcel: ParcelResponseSchema) -> None:
+        """
+        Сохраняет карточку посылки в кэш, если ключа нет: живая метка удаления означает, что посылка
+        могла быть прочитана до коммита пересчета. Время жизни зависит от того, рассчитана ли стоимость доставки.
+
+        Args:
+            parcel (ParcelResponseSchema): Карточка посылки.
+        """
+        priced = parcel.shipping_cost is not None and not isinstance(parcel.shipping_cost, str)
+        try:
+            await self.cache.set_if_absent(
+                self.key(parcel.id),
+                parcel.model_dump_json(),
+                PARCEL_CACHE_TTL if priced else PARCEL_CACHE_UNPRICED_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить посылку {parcel.id} в кэш: {e}")
+
+    async def invalidate(self, parcel_ids: Sequence[str]) -> None:
+        """
+        Заменяет карточки посылок меткой удаления одним конвейером команд. До истечения метки
+        карточки не записываются в кэш.
+
+        Args:
+            parcel_ids (Sequence[str]): ULID посылок.
+        """
+        if not parcel_ids:
+            return
+        pipeline = self.cache.pipeline(transaction=False)
+        for parcel_id in parcel_ids:
+            pipeline.set_value(self.key(parcel_id), PARCEL_CACHE_INVALIDATED, PARCEL_CACHE_INVALIDATION_TTL)
+        try:
+            await pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось удалить из кэша карточки {len(parcel_ids)} посылок: {e}")
@@ -0,0 +1,221 @@
+"""
+Модуль: services.parcel_id_filter
+
+Назначение:
+    Отсеивание запросов несуществующих посылок до обращения к БД: синтаксическая проверка ULID
+    и фильтр Блума зарегистрированных ULID в Redis.
+
+Ключевые особенности:
+    - is_valid_parcel_id не выполняет ввода-вывода: ULID должен состоять из 26 символов алфавита
+      Crockford base32 (без I, L, O, U), первый символ не больше 7 (128 бит), а временная метка не должна
+      опережать часы сервера больше чем на PARCEL_ID_MAX_CLOCK_SKEW секунд.
+    - Фильтр Блума - битовая карта в Redis. Смещения битов ULID получаются двойным хешированием
+      (blake2b), все биты читаются и устанавливаются одной командой. Ответ "нет" точный, ответ "возможно"
+      ошибается с долей PARCEL_ID_FILTER_ERROR_RATE при заполнении до PARCEL_ID_FILTER_CAPACITY посылок.
+    - ULID посылки добавляется в фильтр до коммита регистрации, поэтому посылка, уже видимая в БД,
+      всегда есть в фильтре. Добавление ULID несохраненной посылки дает лишь ложное "возможно".
+    - Регистрация не зависит от Redis: если добавить ULID не удалось, add только отключает фильтр,
+      увеличивая номер поколения. Признак готовности хранит поколение, с которого начато перестроение,
+      и фильтр используется, только пока поколения совпадают: посылка без битов в фильтре не получит 404,
+      даже если перестроение шло параллельно с регистрацией.
+    - Если Redis недоступен и поколение увеличить не удалось, фильтр отключится сам: признак готовности
+      живет PARCEL_ID_FILTER_READY_TTL и продлевается только периодическим перестроением из таблицы,
+      которое добавит и эти посылки.
+    - Фильтр используется только после полного перестроения из таблицы (rebuild), которое ставит
+      признак готовности.
+    - Посылки не удаляются, поэтому перестроение только добавляет биты и выполняется без остановки
+      регистрации. При ошибке Redis проверка отвечает "возможно", и запрос идет в БД.
+
+Зависимости:
+    - interfaces.cache: Интерфейс кэша с операциями над битовыми картами.
+    - models.parcel: ORM-модель посылки (для перестроения фильтра).
+"""
+
+import logging
+import math
+import re
+import time
+from hashlib import blake2b
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from interfaces.cache import ICacheService
+from models.parcel import ParcelModel
+from config.parcel_conf import (
+    PARCEL_ID_FILTER_REDIS_KEY, PARCEL_ID_FILTER_CAPACITY, PARCEL_ID_FILTER_ERROR_RATE,
+    PARCEL_ID_FILTER_REBUILD_BATCH_SIZE, PARCEL_ID_FILTER_READY_TTL, PARCEL_ID_MAX_CLOCK_SKEW
+)
+
+logger = logging.getLogger(__name__)
+
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ULID_PATTERN = re.compile(r"^[0-7][0-9A-HJKMNP-TV-Z]{25}$")
+# Битовая карта Redis не может быть длиннее 2^32 бит (512 МБ)
+MAX_FILTER_BITS = 2 ** 32
+
+
+def is_valid_parcel_id(parcel_id: str) -> bool:
+    """
+    Проверяет, может ли строка быть ULID посылки, выданным этим сервисом. Не обращается ни к Redis, ни к БД.
+
+    Args:
+        parcel_id (str): Строка из запроса.
+
+    Returns:
+        bool: False, если посылки с таким ULID точно нет.
+    """
+    parcel_id = parcel_id.upper()
+    if not ULID_PATTERN.match(parcel_id):
+        return False
+    timestamp_ms = 0
+    for char in parcel_id[:10]:
+        timestamp_ms = timestamp_ms * 32 + CROCKFORD_BASE32.index(char)
+    return timestamp_ms <= (time.time() + PARCEL_ID_MAX_CLOCK_SKEW) * 1000
+
+
+def filter_parameters(capacity: int, error_rate: float) -> tuple[int, int]:
+    """
+    Вычисляет размер битовой карты и число хеш-функций фильтра Блума.
+
+    Args:
+        capacity (int): Ожидаемое количество элементов.
+        error_rate (float): Допустимая доля ложных срабатываний.
+
+    Returns:
+        tuple[int, int]: Размер битовой карты в битах и число хеш-функций.
+    """
+    bits = min(MAX_FILTER_BITS, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class ParcelIdFilter:
+    """
+    Фильтр Блума зарегистрированных ULID посылок в кэше.
+
+    Attributes:
+        cache (ICacheService): Кэш, в котором хранится битовая карта.
+        bits (int): Размер битовой карты в битах.
+        hashes (int): Число хеш-функций (битов на ULID).
+        key (str): Ключ битовой карты (включает параметры фильтра).
+        ready_key (str): Ключ признака готовности фильтра (значение - поколение фильтра при перестроении).
+        generation_key (str): Ключ номера поколения фильтра (увеличивается, если ULID не удалось добавить).
+    """
+
+    def __init__(
+            self,
+            cache: ICacheService,
+            capacity: int = PARCEL_ID_FILTER_CAPACITY,
+            error_rate: float = PARCEL_ID_FILTER_ERROR_RATE
+    ):
+        self.cache = cache
+        self.bits, self.hashes = filter_parameters(capacity, error_rate)
+        self.key = f"{PARCEL_ID_FILTER_REDIS_KEY}:{self.bits}:{self.hashes}"
+        self.ready_key = f"{self.key}:ready"
+        self.generation_key = f"{self.key}:generation"
+
+    def offsets(self, parcel_id: str) -> list[int]:
+        """
+        Возвращает смещения битов ULID в битовой карте (двойное хеширование).
+
+        Args:
+            parcel_id (str): ULID посылки.
+
+        Returns:
+            list[int]: Смещения битов.
+        """
+        digest = blake2b(parcel_id.upper().encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    async def might_contain(self, parcel_id: str) -> bool:
+        """
+        Проверяет, может ли посылка с ULID быть зарегистрирована. Одно обращение к кэшу.
+
+        Args:
+            parcel_id (str): ULID посылки.
+
+        Returns:
+            bool: False, если посылки точно нет; True, если она возможно есть, фильтр не готов
+                или отключен, или кэш недоступен.
+        """
+        try:
+            ready, generation, bits = await (
+                self.cache.pipeline(transaction=False)
+                .get_value(self.ready_key)
+                .get_value(self.generation_key)
+                .get_bits(self.key, self.offsets(parcel_id))
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось проверить ULID {parcel_id} по фильтру посылок: {e}")
+            return True
+        if ready is None or ready != (generation or "0"):
+            return True
+        return all(bits)
+
+    async def add(self, parcel_ids: Sequence[str]) -> None:
+        """
+        Добавляет ULID посылок в фильтр. Вызывается до коммита регистрации.
+        Ошибки не прерывают регистрацию: если ULID не удалось добавить, фильтр отключается
+        до следующего перестроения.
+
+        Args:
+            parcel_ids (Sequence[str]): ULID посылок.
+        """
+        if not parcel_ids:
+            return
+        try:
+            await self.cache.set_bits(self.key, [offset for parcel_id in parcel_ids for offset in self.offsets(parcel_id)])
+            return
+        except Exception as e:
+            logger.error(f"Не удалось добавить в фильтр посылок {len(parcel_ids)} ULID, фильтр отключается: {e}")
+        try:
+            await self.cache.increment(self.generation_key)
+        except Exception as e:
+            logger.error(
+                f"Не удалось отключить фильтр посылок, он отключится через {PARCEL_ID_FILTER_READY_TTL} с "
+                f"без перестроения: {e}"
+            )
+
+    async def rebuild(self, db: AsyncSession, batch_size: int = PARCEL_ID_FILTER_REBUILD_BATCH_SIZE) -> int:
+        """
+        Добавляет в фильтр ULID всех посылок из таблицы и ставит признак готовности фильтра
+        на PARCEL_ID_FILTER_READY_TTL секунд. Признак хранит поколение фильтра на начало перестроения:
+        если во время перестроения ULID не удалось добавить, фильтр останется отключенным.
+
+        Таблица обходится порциями по keyset-курсору ULID, выбирается только колонка id,
+        каждая порция записывается в фильтр одной командой.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            batch_size (int): Количество ULID в порции.
+
+        Returns:
+            int: Количество посылок, добавленных в фильтр.
+        """
+        generation = await self.cache.get_value(self.generation_key) or "0"
+        added = 0
+        cursor = None
+        while True:
+            query = select(ParcelModel.id)
+            if cursor:
+                query = query.where(ParcelModel.id > cursor)
+            result = await db.execute(query.order_by(ParcelModel.id).limit(batch_size))
+            parcel_ids = result.scalars().all()
+            if not parcel_ids:
+                break
+            await self.cache.set_bits(self.key, [offset for parcel_id in parcel_ids for offset in self.offsets(parcel_id)])
+            added += len(parcel_ids)
+            cursor = parcel_ids[-1]
+            if len(parcel_ids) < batch_size:
+                break
+
+        await self.cache.set_value(self.ready_key, generation, PARCEL_ID_FILTER_READY_TTL)
+        logger.info(
+            f"Фильтр посылок перестроен: {added} ULID, {self.bits} бит, {self.hashes} хеш-функций."
+        )
+        return added
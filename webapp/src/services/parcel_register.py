@@ -1,9 +1,13 @@
 """
 Сервис: services.parcel_create
 
-Сервис для записи посылки непосредственно в БД
+Сервис для записи посылки непосредственно в БД.
+Пакет посылок записывается одним многострочным INSERT в одной транзакции.
 """
 
+from typing import Sequence
+
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import ValidationError
@@ -11,7 +15,9 @@ import logging
 
 from models.parcel import ParcelModel
 from schemas.parcel import ParcelSchema
-from exceptions.exceptions import ParcelDatabaseError, ParcelValidationError
+from services.parcel_id_filter import ParcelIdFilter
+from services.parcel_type_registry import parcel_type_registry
+from exceptions.exceptions import ParcelDatabaseError, ParcelValidationError, ParcelTypeNotFoundError
 
 logger = logging.getLogger(__name__)
 logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
@@ -23,11 +29,13 @@ class ParcelRegisterService:
 
     Attributes:
         db (AsyncSession): Асинхронная сессия для взаимодействия с базой данных.
+        id_filter (ParcelIdFilter | None): Фильтр зарегистрированных ULID, в который добавляется посылка.
     """
 
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, id_filter: ParcelIdFilter | None = None):
         self.db = db
+        self.id_filter = id_filter
 
 
     async def register_parcel(self,
@@ -36,19 +44,30 @@ class ParcelRegisterService:
         """
         Сохраняет новую посылку в базе данных.
         Важно: ORM-модель не возвращает, она нам не понадобится.
+        ULID генерируется приложением, поэтому после коммита посылка из БД повторно не читается.
+        Тип посылки проверяется по справочнику процесса до INSERT.
 
         Args:
             parcel_data (ParcelSchema): Схема посылки, содержащая данные для сохранения.
 
 
         Raises:
+            ParcelTypeNotFoundError: Если тип посылки неизвестен.
             SQLAlchemyError: Если произошла ошибка при работе с базой данных.
         """
         try:
+            await parcel_type_registry.ensure_loaded(self.db)
+            parcel_type_registry.check([parcel_data.parcel_type_id])
+
             new_parcel = ParcelModel(**parcel_data.model_dump())
             self.db.add(new_parcel)
+            # ULID попадает в фильтр до коммита: посылка, видимая в БД, уже есть в фильтре (или фильтр отключен)
+            if self.id_filter is not None:
+                await self.id_filter.add([parcel_data.id])
             await self.db.commit()
-            await self.db.refresh(new_parcel)
+
+        except ParcelTypeNotFoundError:
+            raise
 
         except SQLAlchemyError as e:
             await self.db.rollback()
@@ -61,4 +80,51 @@ class ParcelRegisterService:
 
         except Exception as e:
             logger.exception(f"Неизвестная ошибка при получении посылок для пользователя: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+    async def register_parcels(self,
+        parcels: Sequence[ParcelSchema]
+    ) -> list[str | None]:
+        """
+        Сохраняет пакет новых посылок одним многострочным INSERT в одной транзакции.
+        Посылки неизвестного типа не записываются, остальные записываются все вместе или ни одной.
+
+        Args:
+            parcels (Sequence[ParcelSchema]): Схемы посылок, содержащие данные для сохранения.
+
+        Returns:
+            list[str | None]: Для каждой посылки в том же порядке - причина отказа или None, если посылка записана.
+
+        Raises:
+            ParcelDatabaseError: Если произошла ошибка при работе с базой данных (не записана ни одна посылка).
+        """
+        try:
+            await parcel_type_registry.ensure_loaded(self.db)
+            errors: list[str | None] = []
+            rows = []
+            for parcel_data in parcels:
+                try:
+                    parcel_type_registry.check([parcel_data.parcel_type_id])
+                except ParcelTypeNotFoundError as e:
+                    errors.append(str(e))
+                    continue
+                errors.append(None)
+                rows.append(parcel_data.model_dump())
+
+            if rows:
+                await self.db.execute(insert(ParcelModel).values(rows))
+                # ULID попадают в фильтр до коммита: посылка, видимая в БД, уже есть в фильтре (или фильтр отключен)
+                if self.id_filter is not None:
+                    await self.id_filter.add([row["id"] for row in rows])
+                await self.db.commit()
+            return errors
+
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.exception(f"Ошибка базы данных при создании пакета из {len(parcels)} посылок: {str(e)}")
+            raise ParcelDatabaseError(f"Ошибка базы данных при создании пакета посылок: {str(e)}")
+
+        except Exception as e:
+            logger.exception(f"Неизвестная ошибка при создании пакета из {len(parcels)} посылок: {str(e)}")
+            raise
@@ -1,18 +1,19 @@
 """
 Сервис: services.parcel_type
 
-Служит для получения информации о типах посылок из БД
+Служит для получения информации о типах посылок.
+Типы берутся из справочника в памяти процесса (services.parcel_type_registry),
+к БД сервис обращается только для первой загрузки справочника.
 
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import ValidationError
 from typing import List
 import logging
 
-from models.parcel import ParcelTypeModel
 from schemas.parcel_type import ParcelTypeResponseSchema
+from services.parcel_type_registry import parcel_type_registry
 from exceptions.exceptions import ParcelDatabaseError, ParcelValidationError
 
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +33,7 @@ class ParcelTypeService:
 
     async def get_parcel_types(self) -> List[ParcelTypeResponseSchema]:
         """
-        Получает список типов посылок из базы данных.
+        Получает список типов посылок из справочника процесса.
 
         Returns:
             List[ParcelTypeResponseSchema]: Список типов посылок
@@ -43,15 +44,8 @@ class ParcelTypeService:
             Exception: Неизвестная ошибка при получении посылок для пользователя
             """
         try:
-            result = await self.db.execute(select(ParcelTypeModel).order_by(ParcelTypeModel.id))
-            parcel_types = result.scalars().all()
-            response_list = [
-                ParcelTypeResponseSchema(
-                    id=parcel_type.id,
-                    name=parcel_type.name)
-                for parcel_type in parcel_types ]
-
-            return response_list
+            await parcel_type_registry.ensure_loaded(self.db)
+            return parcel_type_registry.parcel_types()
 
 
         except ValidationError as e:
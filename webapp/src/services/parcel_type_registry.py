@@ -0,0 +1,208 @@
+"""
+Модуль: services.parcel_type_registry
+
+Назначение:
+    Справочник типов посылок в памяти процесса.
+
+Ключевые особенности:
+    - Таблица parcel_types (несколько строк, меняется редко) загружается целиком одним запросом
+      и хранится в словаре {id: name}. Чтение посылок подставляет имя типа из словаря,
+      без отдельного запроса к parcel_types (selectinload) на каждый запрос.
+    - Регистрация и расчет стоимости доставки проверяют тип посылки по справочнику до обращения к БД:
+      неизвестный тип отклоняется без INSERT и ошибки внешнего ключа.
+    - Версия справочника хранится в Redis (PARCEL_TYPES_VERSION_REDIS_KEY). После правки таблицы версию меняют
+      (bump_version, /api/bump_parcel_types_version), и каждый процесс перезагружает справочник
+      при следующей проверке версии (refresh).
+    - Если у прочитанной посылки тип отсутствует в справочнике (тип добавлен без смены версии),
+      справочник перезагружается сразу: внешний ключ гарантирует, что тип есть в БД.
+    - Перезагрузка подменяет словарь целиком, поэтому читатели никогда не видят частично загруженный справочник.
+
+Зависимости:
+    - models.parcel_type: ORM-модель типа посылки.
+    - interfaces.cache: Кэш, в котором хранится версия справочника.
+"""
+
+import asyncio
+import logging
+from typing import Iterable, List
+
+import ulid
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.parcel_type import ParcelTypeModel
+from interfaces.cache import ICacheService
+from schemas.parcel_type import ParcelTypeResponseSchema
+from exceptions.exceptions import ParcelTypeNotFoundError
+from config.pricing_conf import PARCEL_TYPES_VERSION_REDIS_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class ParcelTypeRegistry:
+    """
+    Справочник типов посылок в памяти процесса.
+
+    Attributes:
+        loaded (bool): Загружен ли справочник из БД.
+        version (str | None): Версия справочника из Redis, с которой выполнена последняя загрузка.
+    """
+
+    def __init__(self):
+        self._names: dict[int, str] = {}
+        self._version: str | None = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> str | None:
+        return self._version
+
+    def get_name(self, parcel_type_id: int) -> str | None:
+        """
+        Возвращает имя типа посылки.
+
+        Args:
+            parcel_type_id (int): Идентификатор типа посылки.
+
+        Returns:
+            str | None: Имя типа или None, если тип неизвестен.
+        """
+        return self._names.get(parcel_type_id)
+
+    def parcel_types(self) -> List[ParcelTypeResponseSchema]:
+        """
+        Возвращает все типы посылок по возрастанию ID.
+        """
+        return [
+            ParcelTypeResponseSchema(id=parcel_type_id, name=name)
+            for parcel_type_id, name in sorted(self._names.items())
+        ]
+
+    def check(self, parcel_type_ids: Iterable[int]) -> None:
+        """
+        Проверяет, что все типы посылок есть в справочнике.
+
+        Args:
+            parcel_type_ids (Iterable[int]): Идентификаторы типов посылок.
+
+        Raises:
+            ParcelTypeNotFoundError: Если хотя бы один тип неизвестен.
+        """
+        unknown = sorted(set(parcel_type_ids) - self._names.keys())
+        if unknown:
+            raise ParcelTypeNotFoundError(f"Неизвестный тип посылки: {', '.join(map(str, unknown))}")
+
+    async def load(self, db: AsyncSession, version: str | None = None) -> None:
+        """
+        Загружает все типы посылок из БД одним запросом и подменяет ими текущие.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            version (str | None): Версия справочника из Redis, соответствующая загрузке.
+        """
+        result = await db.execute(select(ParcelTypeModel.id, ParcelTypeModel.name))
+        self._names = {row.id: row.name for row in result.all()}
+        self._version = version
+        self._loaded = True
+        logger.info(f"Загружено типов посылок: {len(self._names)}, версия {version}.")
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """
+        Загружает справочник, если он еще не загружен в этом процессе.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+        """
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.load(db, self._version)
+
+    async def resolve_names(self, db: AsyncSession, parcel_type_ids: Iterable[int]) -> dict[int, str]:
+        """
+        Возвращает имена типов посылок. Обращается к БД, только если справочник не загружен
+        или в нем нет какого-либо из типов (тогда справочник перезагружается).
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            parcel_type_ids (Iterable[int]): Идентификаторы типов посылок.
+
+        Returns:
+            dict[int, str]: Имена найденных типов по идентификатору.
+        """
+        await self.ensure_loaded(db)
+        parcel_type_ids = set(parcel_type_ids)
+        if not parcel_type_ids <= self._names.keys():
+            async with self._lock:
+                if not parcel_type_ids <= self._names.keys():
+                    logger.warning("Тип посылки отсутствует в справочнике, справочник перезагружается.")
+                    await self.load(db, self._version)
+        return {parcel_type_id: self._names[parcel_type_id]
+                for parcel_type_id in parcel_type_ids if parcel_type_id in self._names}
+
+    async def refresh(self, db: AsyncSession, cache: ICacheService) -> bool:
+        """
+        Перезагружает справочник, если версия в Redis отличается от загруженной.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            cache (ICacheService): Кэш, в котором хранится версия справочника.
+
+        Returns:
+            bool: True, если справочник был перезагружен.
+        """
+        version = await cache.get_value(PARCEL_TYPES_VERSION_REDIS_KEY)
+        if self._loaded and version == self._version:
+            return False
+        async with self._lock:
+            if self._loaded and version == self._version:
+                return False
+            await self.load(db, version)
+        return True
+
+    async def run_refresher(self, session_factory, cache: ICacheService, interval: int) -> None:
+        """
+        Фоновая проверка версии справочника. Запускается в lifespan приложения и работает до его завершения.
+
+        Ошибки БД и Redis не прерывают цикл: процесс продолжает работать с уже загруженным справочником.
+
+        Args:
+            session_factory: Фабрика асинхронных сессий БД.
+            cache (ICacheService): Кэш, в котором хранится версия справочника.
+            interval (int): Интервал проверки версии в секундах.
+        """
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db, cache)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Не удалось обновить справочник типов посылок: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def bump_version(cache: ICacheService) -> str:
+        """
+        Записывает в Redis новую версию справочника. Все процессы перезагрузят его при следующей проверке.
+
+        Args:
+            cache (ICacheService): Кэш, в котором хранится версия справочника.
+
+        Returns:
+            str: Новая версия справочника (ULID).
+        """
+        version = str(ulid.new())
+        await cache.set_value(PARCEL_TYPES_VERSION_REDIS_KEY, version)
+        logger.info(f"Версия справочника типов посылок изменена на {version}.")
+        return version
+
+
+# Один справочник типов посылок на процесс
+parcel_type_registry = ParcelTypeRegistry()
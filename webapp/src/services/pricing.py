@@ -0,0 +1,183 @@
+"""
+Модуль: services.pricing
+
+Назначение:
+    Расчет стоимости доставки посылки по тарифу ее типа:
+    max(вес в кг * per_kg_rate + стоимость в долларах * value_rate, min_charge) * курс USD/RUB.
+
+Ключевые особенности:
+    - Результат округляется до копеек (ROUND_HALF_UP), так же как при записи в DECIMAL(9,2).
+    - ParcelPricingService считает стоимость только по курсу, который уже есть в кэше,
+      и никогда не обращается к внешнему API курса валют. Используется при регистрации посылки:
+      если курс есть в кэше, стоимость доставки рассчитывается сразу, иначе ее посчитает периодическая задача.
+      Устаревший курс используется сразу, а его обновление запускается в фоне.
+      Также используется для предварительного расчета стоимости (quote) без регистрации посылки:
+      ни регистрация, ни предварительный расчет не обращаются к БД.
+
+    - Тариф берется из кэша тарифов в памяти процесса (services.tariff_cache), без запроса к БД.
+      Если тарифы в процессе еще не загружены, стоимость при регистрации не рассчитывается.
+
+    - Тип посылки проверяется по справочнику типов процесса (services.parcel_type_registry):
+      для неизвестного типа стоимость не рассчитывается, а запрос отклоняется.
+
+    - Вместе со стоимостью возвращаются ULID снимка курса и версия формулы,
+      чтобы позже можно было пересчитать только посылки с устаревшей ценой.
+
+Зависимости:
+    - services.currency_service: Для получения курса доллара из кэша.
+    - services.tariff_cache: Тарифы доставки по типам посылок.
+    - services.parcel_type_registry: Справочник типов посылок.
+    - services.pricing_kernel: Пакетный расчет стоимости в целых копейках.
+    - config.pricing_conf: Версия формулы расчета.
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Sequence
+
+from exceptions.exceptions import ShippingCostUnavailableError, ParcelTypeNotFoundError
+from interfaces.cache import ICacheService
+from schemas.parcel import ParcelBaseSchema
+from schemas.pricing import ShippingCostSchema, TariffSchema
+from services.currency_service import CurrencyService
+from services.tariff_cache import tariff_cache, DEFAULT_TARIFF
+from services.parcel_type_registry import parcel_type_registry
+from services.pricing_kernel import price_batch, columns_from_rows, kopecks_to_decimal
+from config.pricing_conf import PRICING_FORMULA_VERSION
+
+logger = logging.getLogger(__name__)
+
+SHIPPING_COST_QUANT = Decimal("0.01")
+
+
+def calculate_shipping_cost(
+        weight: Decimal,
+        value: Decimal,
+        usd_to_rub: Decimal,
+        tariff: TariffSchema = DEFAULT_TARIFF
+) -> Decimal:
+    """
+    Рассчитывает стоимость доставки в рублях.
+
+    Args:
+        weight (Decimal): Вес посылки в килограммах.
+        value (Decimal): Стоимость содержимого посылки в долларах.
+        usd_to_rub (Decimal): Курс доллара к рублю.
+        tariff (TariffSchema): Тариф типа посылки. По умолчанию - тариф для типов без записи в parcel_tariffs.
+
+    Returns:
+        Decimal: Стоимость доставки в рублях, округленная до копеек.
+    """
+    shipping_cost_usd = max(weight * tariff.per_kg_rate + value * tariff.value_rate, tariff.min_charge)
+    shipping_cost = shipping_cost_usd * usd_to_rub
+    return shipping_cost.quantize(SHIPPING_COST_QUANT, rounding=ROUND_HALF_UP)
+
+
+class ParcelPricingService:
+    """
+    Сервис расчета стоимости доставки по курсу из кэша.
+
+    Attributes:
+        cache (ICacheService): Кэш, в котором хранится курс доллара.
+    """
+
+    def __init__(self, cache: ICacheService):
+        self.cache = cache
+
+    async def quote(self, parcels: Sequence[ParcelBaseSchema]) -> list[ShippingCostSchema]:
+        """
+        Рассчитывает стоимость доставки для набора посылок по курсу из кэша и тарифам процесса.
+
+        Все посылки считаются по одному снимку курса одним пакетом (services.pricing_kernel).
+
+        Args:
+            parcels (Sequence[ParcelBaseSchema]): Данные посылок (тип, вес и стоимость содержимого).
+
+        Returns:
+            list[ShippingCostSchema]: Стоимость доставки каждой посылки в том же порядке.
+
+        Raises:
+            ShippingCostUnavailableError: Если тарифы или типы посылок еще не загружены или курса доллара нет в кэше.
+            ParcelTypeNotFoundError: Если тип какой-либо посылки неизвестен.
+        """
+        if not tariff_cache.loaded:
+            raise ShippingCostUnavailableError("Тарифы доставки еще не загружены")
+        if not parcel_type_registry.loaded:
+            raise ShippingCostUnavailableError("Типы посылок еще не загружены")
+        parcel_type_registry.check(parcel.parcel_type_id for parcel in parcels)
+        rate_snapshot = await CurrencyService.get_cached_rate_snapshot(self.cache, revalidate=True)
+        if not rate_snapshot:
+            raise ShippingCostUnavailableError("Курс доллара еще не получен")
+
+        grams, cents = columns_from_rows((parcel.weight, parcel.value) for parcel in parcels)
+        kopecks = price_batch(
+            grams, cents, [parcel.parcel_type_id for parcel in parcels], tariff_cache.compiled(), rate_snapshot.rate
+        )
+        return [
+            ShippingCostSchema(
+                shipping_cost=kopecks_to_decimal(shipping_cost),
+                rate_snapshot_id=rate_snapshot.snapshot_id,
+                pricing_version=PRICING_FORMULA_VERSION
+            )
+            for shipping_cost in kopecks
+        ]
+
+    async def get_shipping_cost(self, parcel: ParcelBaseSchema) -> ShippingCostSchema | None:
+        """
+        Рассчитывает стоимость доставки посылки, если курс доллара есть в кэше.
+
+        Тариф берется из кэша тарифов процесса. Ошибки кэша не передаются наверх:
+        регистрация посылки не должна зависеть от доступности Redis.
+        Неизвестный тип посылки передается наверх, чтобы регистрация была отклонена до записи в БД.
+
+        Args:
+            parcel (ParcelBaseSchema): Данные посылки (тип, вес и стоимость содержимого).
+
+        Returns:
+            ShippingCostSchema | None: Стоимость доставки в рублях со снимком курса и версией формулы
+                или None, если курса в кэше нет или тарифы еще не загружены.
+
+        Raises:
+            ParcelTypeNotFoundError: Если тип посылки неизвестен.
+        """
+        try:
+            return (await self.quote([parcel]))[0]
+        except ParcelTypeNotFoundError:
+            raise
+        except ShippingCostUnavailableError as e:
+            logger.info(f"{e}, стоимость доставки будет рассчитана периодической задачей.")
+            return None
+        except Exception as e:
+            logger.warning(f"Не удалось рассчитать стоимость доставки при регистрации посылки: {e}")
+            return None
+
+    async def get_shipping_costs(self, parcels: Sequence[ParcelBaseSchema]) -> list[ShippingCostSchema | None]:
+        """
+        Рассчитывает стоимость доставки пакета посылок при регистрации, если курс доллара есть в кэше.
+
+        Все посылки известных типов считаются одним пакетом по одному снимку курса.
+        Посылки неизвестного типа (и все посылки, пока справочник типов не загружен) получают None,
+        их отклоняет регистрация. Ошибки кэша не передаются наверх, как и в get_shipping_cost.
+
+        Args:
+            parcels (Sequence[ParcelBaseSchema]): Данные посылок (тип, вес и стоимость содержимого).
+
+        Returns:
+            list[ShippingCostSchema | None]: Стоимость доставки каждой посылки в том же порядке
+                или None, если она не рассчитана.
+        """
+        shipping_costs: list[ShippingCostSchema | None] = [None] * len(parcels)
+        known = [
+            index for index, parcel in enumerate(parcels)
+            if parcel_type_registry.get_name(parcel.parcel_type_id) is not None
+        ]
+        if not known:
+            return shipping_costs
+        try:
+            for index, shipping_cost in zip(known, await self.quote([parcels[index] for index in known])):
+                shipping_costs[index] = shipping_cost
+        except ShippingCostUnavailableError as e:
+            logger.info(f"{e}, стоимость доставки будет рассчитана периодической задачей.")
+        except Exception as e:
+            logger.warning(f"Не удалось рассчитать стоимость доставки при пакетной регистрации посылок: {e}")
+        return shipping_costs
@@ -0,0 +1,168 @@
+"""
+Модуль: services.pricing_kernel
+
+Назначение:
+    Пакетный расчет стоимости доставки для порции посылок в целочисленных единицах.
+
+Ключевые особенности:
+    - Вес передается в граммах, стоимость содержимого и минимальная стоимость - в центах,
+      коэффициенты тарифа - в десятитысячных долях (как в DECIMAL(9,4) и DECIMAL(6,4)),
+      результат - в копейках (array.array('q')). Расчет идет одним проходом по колонкам без Decimal.
+    - Курс переводится в целое число с показателем степени без потери точности, поэтому результат
+      совпадает с calculate_shipping_cost (ROUND_HALF_UP до копеек) бит в бит.
+    - Тарифы компилируются в целочисленные коэффициенты по parcel_type_id, курс умножается на коэффициенты
+      один раз на порцию, поэтому на строку приходится два умножения, сравнение и целочисленное деление.
+    - Колонки в целых единицах удобно получать прямо из БД (CAST(ROUND(weight * 1000) AS SIGNED)):
+      тогда на порцию не создается ни одного Decimal, кроме результата.
+
+Формула (все величины неотрицательны, поэтому округление половины вверх - это floor(x + 1/2)):
+    usd * 10^7 = max(граммы * per_kg_rate_e4 + центы * value_rate_e4 * 10, min_charge_центы * 10^5)
+    копейки = floor((usd * 10^7 * курс_целое + 5 * 10^(4 + k)) / 10^(5 + k)), где курс = курс_целое * 10^-k
+"""
+
+from array import array
+from decimal import Decimal
+from typing import Iterable, Mapping, Sequence
+
+from schemas.pricing import TariffSchema
+
+# Масштабы единиц колонок
+GRAMS_PER_KG = 3
+CENTS_PER_DOLLAR = 2
+TARIFF_SCALE = 4
+
+
+def to_minor_units(amount: Decimal, exponent: int) -> int:
+    """
+    Переводит Decimal в целое число единиц 10^-exponent.
+
+    Args:
+        amount (Decimal): Значение с не более чем exponent знаками после запятой.
+        exponent (int): Количество знаков после запятой.
+
+    Returns:
+        int: Значение в целых единицах.
+
+    Raises:
+        ValueError: Если у значения больше знаков после запятой, чем допускает exponent.
+    """
+    scaled = amount.scaleb(exponent)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"Значение {amount} не представимо с {exponent} знаками после запятой")
+    return int(scaled)
+
+
+def rate_to_fixed(usd_to_rub: Decimal) -> tuple[int, int]:
+    """
+    Представляет курс как целое число и количество знаков после запятой без потери точности.
+
+    Args:
+        usd_to_rub (Decimal): Курс доллара к рублю.
+
+    Returns:
+        tuple[int, int]: (курс_целое, k), где курс = курс_целое * 10^-k.
+    """
+    sign, digits, exponent = usd_to_rub.normalize().as_tuple()
+    if sign:
+        raise ValueError(f"Курс не может быть отрицательным: {usd_to_rub}")
+    rate = int("".join(map(str, digits)) or "0")
+    if exponent >= 0:
+        return rate * 10 ** exponent, 0
+    return rate, -exponent
+
+
+class CompiledTariffs:
+    """
+    Тарифы доставки в целочисленном виде для пакетного расчета.
+
+    Attributes:
+        coefficients (dict[int, tuple[int, int, int]]): Коэффициенты по parcel_type_id:
+            ставка за кг и доля стоимости в десятитысячных, минимальная стоимость в центах.
+        default (tuple[int, int, int]): Коэффициенты тарифа по умолчанию.
+    """
+
+    def __init__(self, tariffs: Mapping[int, TariffSchema], default: TariffSchema):
+        self.default = self._compile(default)
+        self.coefficients = {parcel_type_id: self._compile(tariff) for parcel_type_id, tariff in tariffs.items()}
+
+    @staticmethod
+    def _compile(tariff: TariffSchema) -> tuple[int, int, int]:
+        return (
+            to_minor_units(tariff.per_kg_rate, TARIFF_SCALE),
+            to_minor_units(tariff.value_rate, TARIFF_SCALE),
+            to_minor_units(tariff.min_charge, CENTS_PER_DOLLAR),
+        )
+
+    def scaled(self, parcel_type_ids: Iterable[int], rate: int) -> dict[int, tuple[int, int, int]]:
+        """
+        Коэффициенты встречающихся типов посылок, приведенные к масштабу 10^7 и умноженные на курс.
+
+        Умножение на курс выносится из цикла: max(a, b) * курс = max(a * курс, b * курс) при курсе > 0.
+
+        Args:
+            parcel_type_ids (Iterable[int]): Типы посылок порции.
+            rate (int): Курс в целых единицах 10^-k.
+
+        Returns:
+            dict[int, tuple[int, int, int]]: (ставка за грамм, ставка за цент, минимальная стоимость) по типу.
+        """
+        scaled = {}
+        for parcel_type_id in set(parcel_type_ids):
+            per_kg, value_rate, min_charge = self.coefficients.get(parcel_type_id, self.default)
+            scaled[parcel_type_id] = (per_kg * rate, value_rate * 10 * rate, min_charge * 100000 * rate)
+        return scaled
+
+
+def price_batch(
+        grams: Sequence[int],
+        cents: Sequence[int],
+        parcel_type_ids: Sequence[int],
+        tariffs: CompiledTariffs,
+        usd_to_rub: Decimal
+) -> array:
+    """
+    Рассчитывает стоимость доставки для порции посылок.
+
+    Args:
+        grams (Sequence[int]): Вес посылок в граммах.
+        cents (Sequence[int]): Стоимость содержимого в центах.
+        parcel_type_ids (Sequence[int]): Типы посылок (в том же порядке).
+        tariffs (CompiledTariffs): Скомпилированные тарифы.
+        usd_to_rub (Decimal): Курс доллара к рублю.
+
+    Returns:
+        array: Стоимость доставки в копейках (array('q')).
+    """
+    rate, k = rate_to_fixed(usd_to_rub)
+    divisor = 10 ** (5 + k)
+    half = divisor // 2
+    coefficients = tariffs.scaled(parcel_type_ids, rate).__getitem__
+    return array("q", [
+        (max(g * per_gram + c * per_cent, min_charge) + half) // divisor
+        for g, c, (per_gram, per_cent, min_charge) in zip(grams, cents, map(coefficients, parcel_type_ids))
+    ])
+
+
+def columns_from_rows(rows: Iterable[tuple[Decimal, Decimal]]) -> tuple[array, array]:
+    """
+    Переводит пары (вес в кг, стоимость в долларах) в колонки граммов и центов.
+
+    Args:
+        rows (Iterable[tuple[Decimal, Decimal]]): Вес и стоимость каждой посылки.
+
+    Returns:
+        tuple[array, array]: Колонки граммов и центов (array('q')).
+    """
+    grams = array("q")
+    cents = array("q")
+    for weight, value in rows:
+        grams.append(to_minor_units(weight, GRAMS_PER_KG))
+        cents.append(to_minor_units(value, CENTS_PER_DOLLAR))
+    return grams, cents
+
+
+def kopecks_to_decimal(kopecks: int) -> Decimal:
+    """
+    Переводит копейки в Decimal рублей с двумя знаками после запятой.
+    """
+    return Decimal(kopecks).scaleb(-CENTS_PER_DOLLAR)
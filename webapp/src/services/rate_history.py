@@ -0,0 +1,146 @@
+"""
+Модуль: services.rate_history
+
+Назначение:
+    История курсов валют в БД (таблица exchange_rates): запись каждого нового снимка курсов
+    и поиск курса, действовавшего в заданный момент.
+
+Ключевые особенности:
+    - Каждое обновление курса добавляет по строке на валюту одним многострочным INSERT.
+    - Курс на момент T - последняя строка валюты с valid_from <= T: один поиск по индексу
+      (currency, valid_from), O(log n) от размера истории.
+    - Моментом регистрации посылки служит временная метка ее ULID, поэтому отдельная колонка не нужна.
+    - Курсы для порции посылок определяются одним запросом: выбирается участок истории от курса,
+      действовавшего при регистрации самой ранней посылки, до самой поздней, а затем курс
+      каждой посылки находится двоичным поиском (bisect) в памяти.
+
+Зависимости:
+    - models.exchange_rate: ORM-модель истории курсов.
+"""
+
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from decimal import Decimal
+from typing import Sequence
+
+import ulid
+from sqlalchemy import insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.exchange_rate import ExchangeRateModel
+from schemas.pricing import RateSnapshotSchema
+from config.pricing_conf import USD_CURRENCY_CODE
+
+logger = logging.getLogger(__name__)
+
+
+def ulid_time(value: str) -> datetime:
+    """
+    Возвращает момент создания ULID (UTC, без часового пояса, как хранится в БД).
+
+    Args:
+        value (str): ULID.
+
+    Returns:
+        datetime: Временная метка ULID.
+    """
+    return ulid.parse(value).timestamp().datetime.replace(tzinfo=None)
+
+
+class RateHistoryService:
+    """
+    Сервис истории курсов валют.
+
+    Attributes:
+        db (AsyncSession): Асинхронная сессия для взаимодействия с базой данных.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, rates: dict[str, Decimal], snapshot_id: str) -> None:
+        """
+        Добавляет в историю курсы всех валют снимка. Курсы действуют с момента создания ULID снимка.
+
+        Args:
+            rates (dict[str, Decimal]): Курсы валют к рублю по кодам валют.
+            snapshot_id (str): ULID снимка курсов.
+        """
+        valid_from = ulid_time(snapshot_id)
+        await self.db.execute(
+            insert(ExchangeRateModel),
+            [
+                {"currency": currency, "snapshot_id": snapshot_id, "rate": rate, "valid_from": valid_from}
+                for currency, rate in rates.items()
+            ]
+        )
+        await self.db.commit()
+        logger.info(f"Снимок курсов {snapshot_id} ({len(rates)} валют) добавлен в историю.")
+
+    async def rate_at(self, at: datetime, currency: str = USD_CURRENCY_CODE) -> RateSnapshotSchema | None:
+        """
+        Возвращает курс валюты, действовавший в момент at.
+
+        Args:
+            at (datetime): Момент времени (UTC).
+            currency (str): Код валюты.
+
+        Returns:
+            RateSnapshotSchema | None: Курс и ULID снимка или None, если история начинается позже.
+        """
+        result = await self.db.execute(
+            select(ExchangeRateModel.rate, ExchangeRateModel.snapshot_id)
+            .where(ExchangeRateModel.currency == currency, ExchangeRateModel.valid_from <= at)
+            .order_by(ExchangeRateModel.valid_from.desc())
+            .limit(1)
+        )
+        row = result.first()
+        return RateSnapshotSchema(rate=row.rate, snapshot_id=row.snapshot_id) if row else None
+
+    async def resolve_rates(
+            self,
+            parcel_ids: Sequence[str],
+            currency: str = USD_CURRENCY_CODE
+    ) -> list[RateSnapshotSchema | None]:
+        """
+        Определяет курсы, действовавшие при регистрации каждой посылки порции, одним запросом к БД.
+
+        Args:
+            parcel_ids (Sequence[str]): ULID посылок.
+            currency (str): Код валюты.
+
+        Returns:
+            list[RateSnapshotSchema | None]: Курс для каждой посылки в том же порядке
+                (None, если посылка зарегистрирована раньше начала истории).
+        """
+        if not parcel_ids:
+            return []
+        registered_at = [ulid_time(parcel_id) for parcel_id in parcel_ids]
+        earliest, latest = min(registered_at), max(registered_at)
+
+        # Начало участка истории: курс, действовавший при регистрации самой ранней посылки
+        floor = (
+            select(func.max(ExchangeRateModel.valid_from))
+            .where(ExchangeRateModel.currency == currency, ExchangeRateModel.valid_from <= earliest)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(ExchangeRateModel.valid_from, ExchangeRateModel.rate, ExchangeRateModel.snapshot_id)
+            .where(
+                ExchangeRateModel.currency == currency,
+                ExchangeRateModel.valid_from >= func.coalesce(floor, earliest),
+                ExchangeRateModel.valid_from <= latest
+            )
+            .order_by(ExchangeRateModel.valid_from)
+        )
+        rows = result.all()
+        valid_from = [row.valid_from for row in rows]
+        snapshots = [RateSnapshotSchema(rate=row.rate, snapshot_id=row.snapshot_id) for row in rows]
+
+        resolved = []
+        for moment in registered_at:
+            index = bisect_right(valid_from, moment) - 1
+            resolved.append(snapshots[index] if index >= 0 else None)
+        return resolved
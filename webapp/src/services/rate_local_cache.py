@@ -0,0 +1,109 @@
+"""
+Модуль: services.rate_local_cache
+
+Назначение:
+    Кэш снимка курса USD/RUB в памяти процесса перед Redis.
+
+Ключевые особенности:
+    - Курс меняется не чаще раза в час, а читается при каждой регистрации посылки и каждом расчете стоимости.
+      Локальная копия избавляет от обращений к Redis и разбора Decimal на каждом запросе.
+    - Время жизни локальной копии не больше RATE_LOCAL_CACHE_TTL и не больше оставшегося времени жизни
+      ключа курса в Redis, поэтому процесс не отдает курс дольше, чем он хранится в Redis.
+    - При обновлении курса в канал USD_RUB_UPDATES_CHANNEL публикуется сообщение, и каждый процесс
+      сбрасывает свою копию (run_subscriber запускается в lifespan). Если подписка временно потеряна,
+      устаревание ограничено временем жизни локальной копии.
+    - Вместе со снимком хранится время его мягкого истечения (stale-while-revalidate): устаревший снимок
+      отдается, но вызывающий может запустить его фоновое обновление.
+
+Зависимости:
+    - services.redis_wrapper: Подписка на канал Redis.
+"""
+
+import asyncio
+import logging
+import time
+
+from schemas.pricing import RateSnapshotSchema
+from services.redis_wrapper import RedisWrapper
+from config.pricing_conf import USD_RUB_UPDATES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед повторной подпиской после потери соединения с Redis
+RESUBSCRIBE_DELAY = 5
+
+
+class RateLocalCache:
+    """
+    Снимок курса USD/RUB в памяти процесса с ограниченным временем жизни.
+    """
+
+    def __init__(self):
+        self._rate_snapshot: RateSnapshotSchema | None = None
+        self._expires_at = 0.0
+        self._soft_expires_at: float | None = None
+
+    def get(self) -> RateSnapshotSchema | None:
+        """
+        Возвращает снимок курса, если локальная копия еще не устарела.
+
+        Returns:
+            RateSnapshotSchema | None: Снимок курса или None.
+        """
+        if self._rate_snapshot is not None and time.monotonic() < self._expires_at:
+            return self._rate_snapshot
+        return None
+
+    def set(self, rate_snapshot: RateSnapshotSchema, ttl: int, soft_expires_at: float | None = None) -> None:
+        """
+        Сохраняет снимок курса на ttl секунд.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса.
+            ttl (int): Время жизни в секундах. При ttl <= 0 снимок не сохраняется.
+            soft_expires_at (float | None): Unix timestamp мягкого истечения снимка.
+        """
+        if ttl <= 0:
+            return
+        self._rate_snapshot = rate_snapshot
+        self._expires_at = time.monotonic() + ttl
+        self._soft_expires_at = soft_expires_at
+
+    def is_stale(self) -> bool:
+        """
+        Проверяет, прошло ли мягкое истечение сохраненного снимка курса.
+
+        Returns:
+            bool: True, если снимок устарел и его следует обновить в фоне.
+        """
+        return self._soft_expires_at is not None and time.time() >= self._soft_expires_at
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает локальную копию курса.
+        """
+        self._rate_snapshot = None
+        self._expires_at = 0.0
+        self._soft_expires_at = None
+
+    async def run_subscriber(self) -> None:
+        """
+        Слушает канал обновлений курса и сбрасывает локальную копию при каждом сообщении.
+        Запускается в lifespan приложения и работает до его завершения, переподписываясь после ошибок.
+        """
+        while True:
+            try:
+                # После (пере)подписки сообщения, пропущенные без подписки, потеряны: сбрасываем копию
+                self.invalidate()
+                async for snapshot_id in RedisWrapper().listen(USD_RUB_UPDATES_CHANNEL):
+                    self.invalidate()
+                    logger.debug(f"Локальная копия курса сброшена, новый снимок {snapshot_id}.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Подписка на обновления курса потеряна: {e}")
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+
+# Одна локальная копия курса на процесс
+rate_local_cache = RateLocalCache()
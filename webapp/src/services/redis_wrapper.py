@@ -1,12 +1,20 @@
 """
 Модуль: services.redis_wrapper
 Содержит обертку для работы с Redis и обработчики событий FastAPI для инициализации и завершения пула соединений Redis.
+
+Клиент и пул соединений Redis создаются один раз на процесс в lifespan. Пул блокирующий и собирает
+метрики (занятые и свободные соединения, время ожидания, таймауты) для подбора его размера.
+
+Операции над несколькими ключами (get_many, set_many) и конвейер команд (pipeline) выполняются
+за одно обращение к Redis, а не по обращению на ключ. Биты битовой карты читаются и устанавливаются
+одной командой BITFIELD на все смещения.
 """
 
-import redis.asyncio as aioredis
+import time
 from redis.asyncio.client import Redis
-from redis.asyncio.connection import ConnectionPool
-from typing import Optional
+from redis.asyncio.connection import BlockingConnectionPool
+from redis.exceptions import ConnectionError as RedisConnectionError
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
 import logging
 
 
@@ -14,51 +22,220 @@ import logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# --- Пул Соединений для Redis ---
-redis_pool: ConnectionPool | None = None
 
-async def initialize_redis_pool(host: str, port: int, max_connections: int):
+def bitfield_args(key: str, operation: str, offsets: Sequence[int]) -> list[Any]:
     """
-    Инициализация пула соединений Redis при старте приложения.
+    Формирует аргументы команды BITFIELD с одной операцией над однобитовым полем на каждое смещение.
+
+    Args:
+        key (str): Ключ битовой карты.
+        operation (str): "GET" или "SET".
+        offsets (Sequence[int]): Смещения битов.
+
+    Returns:
+        list[Any]: Аргументы команды.
+    """
+    args: list[Any] = ["BITFIELD", key]
+    for offset in offsets:
+        args += ["GET", "u1", offset] if operation == "GET" else ["SET", "u1", offset, 1]
+    return args
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """
+    Блокирующий пул соединений Redis с метриками.
+
+    При исчерпании пула запрос ждет свободное соединение до timeout секунд (а не получает ошибку сразу).
+    Пул считает количество и суммарное время получения соединений, максимальное ожидание
+    и количество таймаутов ожидания, чтобы размер пула можно было подобрать по данным.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.monotonic()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except RedisConnectionError as e:
+            if "No connection available" in str(e):
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self.acquisitions += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self) -> dict:
+        """
+        Текущее состояние и накопленные метрики пула.
+
+        Returns:
+            dict: Размер пула, занятые и свободные соединения, количество получений соединения,
+                таймауты и время ожидания (суммарное, среднее и максимальное, в секундах).
+        """
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_avg": self.wait_time_total / self.acquisitions if self.acquisitions else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+
+# Сколько секунд подписка ждет сообщение за одно обращение
+PUBSUB_POLL_TIMEOUT = 1.0
+
+# --- Пул соединений и клиент Redis, по одному на процесс ---
+redis_pool: InstrumentedConnectionPool | None = None
+redis_client: Redis | None = None
+
+async def initialize_redis_pool(
+        host: str,
+        port: int,
+        max_connections: int,
+        pool_timeout: float | None = None,
+        connect_timeout: float | None = None,
+        socket_timeout: float | None = None
+):
+    """
+    Инициализация пула соединений и клиента Redis при старте приложения.
 
     Args:
         host (str): Хост для подключения к Redis.
         port (int): Порт для подключения к Redis.
         max_connections (int): Максимальное количество соединений в пуле.
+        pool_timeout (float | None): Сколько секунд ждать свободное соединение (None - без ограничения).
+        connect_timeout (float | None): Таймаут установки соединения в секундах.
+        socket_timeout (float | None): Таймаут ответа Redis в секундах.
     """
-    global redis_pool
+    global redis_pool, redis_client
     try:
-        redis_pool = aioredis.ConnectionPool.from_url(
+        redis_pool = InstrumentedConnectionPool.from_url(
             f"redis://{host}:{port}",
             encoding="utf-8",
             decode_responses=True,
-            max_connections=max_connections
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_connect_timeout=connect_timeout,
+            socket_timeout=socket_timeout
         )
-        logger.info("Redis pool успешно инициализирован.")
+        redis_client = Redis(connection_pool=redis_pool)
+        logger.info(f"Redis pool успешно инициализирован (до {max_connections} соединений).")
     except Exception as e:
         logger.error(f"Ошибка при инициализации пула соединений Redis: {e}")
         raise
 
 async def close_redis_pool():
     """
-    Закрытие пула соединений Redis при завершении работы приложения.
+    Закрытие клиента и пула соединений Redis при завершении работы приложения.
     """
+    global redis_pool, redis_client
     if redis_pool:
         try:
             await redis_pool.disconnect(inuse_connections=True)
             logger.info("Redis pool успешно закрыт.")
         except Exception as e:
             logger.error(f"Ошибка при закрытии пула соединений Redis: {e}")
+    redis_pool = None
+    redis_client = None
+
+class RedisPipeline:
+    """
+    Конвейер команд Redis: команды накапливаются и отправляются за одно обращение в execute.
+    Каждая команда конвейера - ровно одна команда Redis, поэтому execute возвращает по результату на команду.
+
+    Attributes:
+        transaction (bool): Выполняются ли команды атомарно (MULTI/EXEC).
+    """
+
+    def __init__(self, redis: Redis, transaction: bool = True):
+        self.transaction = transaction
+        self._pipeline = redis.pipeline(transaction=transaction)
+
+    def get_value(self, key: str) -> "RedisPipeline":
+        """Добавляет GET."""
+        self._pipeline.get(key)
+        return self
+
+    def set_value(self, key: str, value: str, expire: int | None = None) -> "RedisPipeline":
+        """Добавляет SET с временем жизни (если указано)."""
+        self._pipeline.set(key, value, ex=expire)
+        return self
+
+    def delete_value(self, key: str) -> "RedisPipeline":
+        """Добавляет DEL."""
+        self._pipeline.delete(key)
+        return self
+
+    def expire_value(self, key: str, expire: int) -> "RedisPipeline":
+        """Добавляет EXPIRE (результат - существует ли ключ)."""
+        self._pipeline.expire(key, expire)
+        return self
+
+    def get_ttl(self, key: str) -> "RedisPipeline":
+        """Добавляет TTL (результат - секунды, -1 без времени жизни, -2 если ключа нет)."""
+        self._pipeline.ttl(key)
+        return self
+
+    def increment(self, key: str, amount: int = 1) -> "RedisPipeline":
+        """Добавляет INCRBY (результат - новое значение счетчика)."""
+        self._pipeline.incrby(key, amount)
+        return self
+
+    def set_hash_fields(self, key: str, mapping: Mapping[str, str]) -> "RedisPipeline":
+        """Добавляет HSET полей хеша (остальные поля хеша не меняются)."""
+        self._pipeline.hset(key, mapping=dict(mapping))
+        return self
+
+    def get_hash_fields(self, key: str, *fields: str) -> "RedisPipeline":
+        """Добавляет HMGET полей хеша (результат - список значений или None в порядке полей)."""
+        self._pipeline.hmget(key, list(fields))
+        return self
+
+    def get_bits(self, key: str, offsets: Sequence[int]) -> "RedisPipeline":
+        """Добавляет BITFIELD GET на каждое смещение (результат - список значений битов)."""
+        self._pipeline.execute_command(*bitfield_args(key, "GET", offsets))
+        return self
+
+    def set_bits(self, key: str, offsets: Sequence[int]) -> "RedisPipeline":
+        """Добавляет BITFIELD SET на каждое смещение (результат - прежние значения битов)."""
+        self._pipeline.execute_command(*bitfield_args(key, "SET", offsets))
+        return self
+
+    async def execute(self) -> list[Any]:
+        """
+        Отправляет накопленные команды за одно обращение к Redis.
+
+        Returns:
+            list[Any]: Результаты команд в порядке их добавления.
+        """
+        try:
+            async with self._pipeline as pipeline:
+                return await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении конвейера команд Redis: {e}")
+            raise
+
 
 class RedisWrapper:
     def __init__(self):
         """
-        Инициализирует класс RedisWrapper с пулом соединений Redis.
+        Инициализирует класс RedisWrapper с общим клиентом Redis процесса (создается в lifespan).
+        Обертка не создает ни клиента, ни соединений, поэтому ее можно создавать на каждый запрос.
         """
-        if redis_pool is None:
+        if redis_client is None:
             logger.error("Redis pool has not been initialized.")
             raise ValueError("Redis pool has not been initialized.")
-        self.redis = Redis(connection_pool=redis_pool)
+        self.redis = redis_client
 
     async def set_value(self, key: str, value: str, expire: int | None = None) -> None:
         """
@@ -73,7 +250,25 @@ class RedisWrapper:
         """
         try:
             await self.redis.set(key, value, ex=expire)
-            logger.info(f"Значение для ключа '{key}' успешно сохранено в Redis.")
+            logger.debug(f"Значение для ключа '{key}' успешно сохранено в Redis.")
+        except Exception as e:
+            logger.error(f"Ошибка при записи значения в Redis для ключа '{key}': {e}")
+            raise
+
+    async def set_if_absent(self, key: str, value: str, expire: int | None = None) -> bool:
+        """
+        Асинхронный метод для установки значения, только если ключа еще нет (SET NX).
+
+        Args:
+            key (str): Ключ для сохранения значения.
+            value (str): Значение для сохранения.
+            expire (int | None): Время жизни ключа в секундах (если указано).
+
+        Returns:
+            bool: True, если значение установлено.
+        """
+        try:
+            return bool(await self.redis.set(key, value, ex=expire, nx=True))
         except Exception as e:
             logger.error(f"Ошибка при записи значения в Redis для ключа '{key}': {e}")
             raise
@@ -91,12 +286,268 @@ class RedisWrapper:
         try:
             value = await self.redis.get(key)
             if value is not None:
-                logger.info(f"Значение для ключа '{key}' успешно получено из Redis.")
+                logger.debug(f"Значение для ключа '{key}' успешно получено из Redis.")
             else:
-                logger.warning(f"Значение для ключа '{key}' не найдено в Redis.")
+                logger.debug(f"Значение для ключа '{key}' не найдено в Redis.")
             return value
         except Exception as e:
             logger.error(f"Ошибка при получении значения из Redis для ключа '{key}': {e}")
             return None
 
+    async def delete_value(self, key: str) -> None:
+        """
+        Асинхронный метод для удаления значения из Redis.
+
+        Args:
+            key (str): Ключ для удаления.
+        """
+        try:
+            await self.redis.delete(key)
+            logger.debug(f"Значение для ключа '{key}' удалено из Redis.")
+        except Exception as e:
+            logger.error(f"Ошибка при удалении значения из Redis для ключа '{key}': {e}")
+            raise
+
+    async def expire_value(self, key: str, expire: int) -> bool:
+        """
+        Асинхронный метод для продления времени жизни ключа в Redis.
+
+        Args:
+            key (str): Ключ.
+            expire (int): Новое время жизни в секундах.
+
+        Returns:
+            bool: True, если ключ существует и время жизни установлено.
+        """
+        try:
+            return bool(await self.redis.expire(key, expire))
+        except Exception as e:
+            logger.error(f"Ошибка при продлении времени жизни ключа '{key}' в Redis: {e}")
+            raise
+
+    async def get_ttl(self, key: str) -> int | None:
+        """
+        Асинхронный метод для получения оставшегося времени жизни ключа в Redis.
+
+        Args:
+            key (str): Ключ.
+
+        Returns:
+            int | None: Оставшееся время жизни в секундах или None, если ключа нет или время жизни не задано.
+        """
+        try:
+            ttl = await self.redis.ttl(key)
+            return ttl if ttl >= 0 else None
+        except Exception as e:
+            logger.error(f"Ошибка при получении времени жизни ключа '{key}' в Redis: {e}")
+            return None
+
+    async def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        """
+        Асинхронный метод для получения значений нескольких ключей за одно обращение (MGET).
+
+        Args:
+            keys (Sequence[str]): Ключи.
+
+        Returns:
+            list[str | None]: Значения в порядке ключей (None для отсутствующих ключей).
+        """
+        if not keys:
+            return []
+        try:
+            return await self.redis.mget(list(keys))
+        except Exception as e:
+            logger.error(f"Ошибка при получении {len(keys)} значений из Redis: {e}")
+            return [None] * len(keys)
+
+    async def set_many(
+            self,
+            values: Mapping[str, str],
+            expire: int | None | Mapping[str, int | None] = None
+    ) -> None:
+        """
+        Асинхронный метод для записи нескольких значений за одно обращение (конвейер SET без транзакции).
+
+        Args:
+            values (Mapping[str, str]): Значения по ключам.
+            expire (int | None | Mapping[str, int | None]): Время жизни в секундах: общее для всех ключей
+                или по каждому ключу (ключи без записи хранятся без времени жизни).
+        """
+        if not values:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(key, value, ex=expire.get(key) if isinstance(expire, Mapping) else expire)
+                await pipe.execute()
+            logger.debug(f"{len(values)} значений успешно сохранено в Redis.")
+        except Exception as e:
+            logger.error(f"Ошибка при записи {len(values)} значений в Redis: {e}")
+            raise
+
+    async def increment(self, key: str, amount: int = 1, expire: int | None = None) -> int:
+        """
+        Асинхронный метод для атомарного увеличения счетчика (INCRBY).
+
+        Args:
+            key (str): Ключ счетчика.
+            amount (int): Величина увеличения.
+            expire (int | None): Время жизни в секундах, задается при создании счетчика.
 
+        Returns:
+            int: Новое значение счетчика.
+        """
+        try:
+            value = await self.redis.incrby(key, amount)
+            if expire is not None and value == amount:
+                await self.redis.expire(key, expire)
+            return value
+        except Exception as e:
+            logger.error(f"Ошибка при увеличении счетчика '{key}' в Redis: {e}")
+            raise
+
+    def pipeline(self, transaction: bool = True) -> RedisPipeline:
+        """
+        Создает конвейер команд: команды отправляются за одно обращение к Redis при вызове execute.
+
+        Args:
+            transaction (bool): Выполнить команды атомарно (MULTI/EXEC).
+
+        Returns:
+            RedisPipeline: Конвейер команд.
+        """
+        return RedisPipeline(self.redis, transaction=transaction)
+
+    async def set_hash(self, key: str, mapping: dict[str, str], expire: int | None = None) -> None:
+        """
+        Асинхронный метод для атомарной замены хеша в Redis.
+        Старые поля удаляются, новые записываются одной транзакцией (MULTI/EXEC),
+        поэтому читатели видят либо старый хеш целиком, либо новый.
+
+        Args:
+            key (str): Ключ хеша.
+            mapping (dict[str, str]): Поля и значения хеша.
+            expire (int | None): Время жизни ключа в секундах (если указано).
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                if expire is not None:
+                    pipe.expire(key, expire)
+                await pipe.execute()
+            logger.debug(f"Хеш '{key}' успешно сохранен в Redis ({len(mapping)} полей).")
+        except Exception as e:
+            logger.error(f"Ошибка при записи хеша в Redis для ключа '{key}': {e}")
+            raise
+
+    async def get_hash_fields(self, key: str, *fields: str) -> list[str | None]:
+        """
+        Асинхронный метод для получения нескольких полей хеша за одно обращение (HMGET).
+
+        Args:
+            key (str): Ключ хеша.
+            *fields (str): Поля хеша.
+
+        Returns:
+            list[str | None]: Значения полей в том же порядке (None для отсутствующих полей или хеша).
+        """
+        try:
+            return await self.redis.hmget(key, list(fields))
+        except Exception as e:
+            logger.error(f"Ошибка при получении полей хеша из Redis для ключа '{key}': {e}")
+            return [None] * len(fields)
+
+    async def get_hash(self, key: str) -> dict[str, str]:
+        """
+        Асинхронный метод для получения всех полей хеша (HGETALL).
+
+        Args:
+            key (str): Ключ хеша.
+
+        Returns:
+            dict[str, str]: Поля и значения хеша (пустой словарь, если хеша нет).
+        """
+        try:
+            return await self.redis.hgetall(key)
+        except Exception as e:
+            logger.error(f"Ошибка при получении хеша из Redis для ключа '{key}': {e}")
+            return {}
+
+    async def get_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        """
+        Асинхронный метод для чтения нескольких битов битовой карты одной командой BITFIELD.
+        Ошибка пробрасывается: нули вместо битов означали бы отсутствие (например, в фильтре Блума).
+
+        Args:
+            key (str): Ключ битовой карты.
+            offsets (Sequence[int]): Смещения битов.
+
+        Returns:
+            list[int]: Значения битов (0 или 1) в порядке смещений.
+        """
+        if not offsets:
+            return []
+        try:
+            return await self.redis.execute_command(*bitfield_args(key, "GET", offsets))
+        except Exception as e:
+            logger.error(f"Ошибка при чтении битов из Redis для ключа '{key}': {e}")
+            raise
+
+    async def set_bits(self, key: str, offsets: Sequence[int]) -> list[int]:
+        """
+        Асинхронный метод для установки нескольких битов битовой карты в 1 одной командой BITFIELD.
+
+        Args:
+            key (str): Ключ битовой карты.
+            offsets (Sequence[int]): Смещения битов.
+
+        Returns:
+            list[int]: Прежние значения битов в порядке смещений.
+        """
+        if not offsets:
+            return []
+        try:
+            return await self.redis.execute_command(*bitfield_args(key, "SET", offsets))
+        except Exception as e:
+            logger.error(f"Ошибка при установке {len(offsets)} битов в Redis для ключа '{key}': {e}")
+            raise
+
+    async def publish(self, channel: str, message: str) -> None:
+        """
+        Асинхронный метод для публикации сообщения в канал Redis.
+
+        Args:
+            channel (str): Канал.
+            message (str): Сообщение.
+        """
+        try:
+            await self.redis.publish(channel, message)
+            logger.debug(f"Сообщение опубликовано в канал '{channel}'.")
+        except Exception as e:
+            logger.error(f"Ошибка при публикации сообщения в канал '{channel}': {e}")
+            raise
+
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        """
+        Подписывается на канал Redis и возвращает поступающие сообщения.
+        Подписка закрывается при выходе из итерации.
+
+        Args:
+            channel (str): Канал.
+
+        Yields:
+            str: Сообщение из канала.
+        """
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            logger.info(f"Подписка на канал Redis '{channel}' установлена.")
+            while True:
+                # Ожидание с явным таймаутом: pubsub.listen() ждал бы с таймаутом сокета (REDIS_SOCKET_TIMEOUT)
+                # и обрывал подписку в каждую паузу между сообщениями
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=PUBSUB_POLL_TIMEOUT)
+                if message is not None and message.get("type") == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
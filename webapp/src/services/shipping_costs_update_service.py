@@ -1,18 +1,69 @@
 """
 Модуль services.pricing_update_currency
 Служит для обновления курса доллара
+
+Поддерживаемые режимы пересчета (см. SHIPPING_COST_UPDATE_MODE в config.pricing_conf):
+    - "chunked": посылки без стоимости обходятся порциями по возрастанию ULID (keyset-курсор по id),
+      каждая порция обновляется на стороне БД и коммитится отдельно. Память не зависит от размера очереди,
+      блокировки удерживаются только на строках текущей порции. Курсор последней закоммиченной порции
+      сохраняется в Redis, поэтому прерванный пересчет продолжается с места остановки.
+      Очередь можно разделить на непересекающиеся диапазоны ULID (split_backlog) и обрабатывать
+      их независимо на разных воркерах (update_shipping_costs_range);
+    - "sql": формула считается на стороне сервера БД одним запросом
+      UPDATE parcels SET shipping_cost = ... WHERE shipping_cost IS NULL.
+      Посылки не загружаются в память приложения, нет отдельного UPDATE на каждую строку;
+    - "orm": стоимость считается на стороне приложения: порциями выбираются только нужные колонки,
+      порция считается пакетно в целых копейках (services.pricing_kernel) и записывается
+      одним executemany UPDATE по первичному ключу с повторной проверкой shipping_cost IS NULL.
+      Запасной вариант для БД, которые не умеют выполнять такой UPDATE.
+
+Стоимость считается по тарифу типа посылки (parcel_tariffs). Тарифы берутся из кэша в памяти процесса
+(services.tariff_cache) и подставляются в запрос как CASE по parcel_type_id, поэтому пересчет не выполняет
+отдельных запросов за тарифом ни на посылку, ни на порцию.
+
+Политика курса (SHIPPING_COST_RATE_POLICY): по умолчанию все посылки считаются по текущему курсу.
+При политике "registration" каждая посылка считается по курсу, действовавшему при ее регистрации:
+курсы для порции определяются одним запросом к истории курсов (services.rate_history), порция считается
+пакетно по группам одного снимка. Эта политика всегда использует режим "orm", в том числе для диапазонов
+(update_shipping_costs_range) и пересчета устаревших цен (reprice_stale): новый курс не делает устаревшими
+цены по курсу регистрации, пересчитываются только посылки с устаревшей версией формулы.
+
+Вместе со стоимостью в посылку записываются ULID снимка курса и версия формулы (PRICING_FORMULA_VERSION).
+Пересчет устаревших цен (reprice_stale) затрагивает только уже рассчитанные посылки со снимком курса
+старше текущего или с версией формулы ниже текущей. Выборка идет по индексам на rate_snapshot_id и
+pricing_version порциями, поэтому обновление курса не приводит к полному сканированию таблицы.
+
+Если передан кэш, после коммита каждой порции карточки ее посылок заменяются меткой удаления в кэше
+чтения посылок (services.parcel_cache). Режим "sql" не знает id обновленных посылок: для него устаревание кэша ограничено
+временем жизни карточки без стоимости (PARCEL_CACHE_UNPRICED_TTL).
 """
 import logging
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
+from typing import Sequence
 
+from sqlalchemy import update, func, or_, case, cast, Integer, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 from sqlalchemy.exc import SQLAlchemyError
 
 from models.parcel import ParcelModel  # Предполагается, что модель ParcelModel импортируется здесь
+from interfaces.cache import ICacheService
+from schemas.pricing import RateSnapshotSchema
+from services.parcel_cache import ParcelCache
+from services.pricing_kernel import CompiledTariffs, price_batch, kopecks_to_decimal
+from services.rate_history import RateHistoryService
+from services.tariff_cache import tariff_cache, DEFAULT_TARIFF
+from config.pricing_conf import (
+    SHIPPING_COST_UPDATE_MODE, SHIPPING_COST_UPDATE_BATCH_SIZE, SHIPPING_COST_RATE_POLICY,
+    SHIPPING_COST_CURSOR_REDIS_KEY, SHIPPING_COST_CURSOR_EXPIRE, PRICING_FORMULA_VERSION
+)
 
 logger = logging.getLogger(__name__)
 
+SHIPPING_COST_UPDATE_MODES = ("chunked", "sql", "orm")
+SHIPPING_COST_RATE_POLICIES = ("current", "registration")
+
 
 class ShippingCostsUpdateService:
     """
@@ -20,39 +71,596 @@ class ShippingCostsUpdateService:
 
     Attributes:
         db (AsyncSession): Асинхронная сессия для взаимодействия с базой данных.
+        cache (ICacheService | None): Кэш для хранения курсора режима "chunked" и карточек посылок.
+            Если не передан, прерванный пересчет начинается сначала, а карточки посылок
+            устаревают по времени жизни.
+        mode (str): Режим пересчета: "chunked" (порциями), "sql" (на стороне БД) или "orm" (на стороне приложения).
+        batch_size (int): Размер порции для режима "chunked".
+        rate_policy (str): По какому курсу считать посылки без стоимости: "current" (текущему)
+            или "registration" (действовавшему при регистрации посылки, только режим "orm").
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+            self,
+            db: AsyncSession,
+            cache: ICacheService | None = None,
+            mode: str = SHIPPING_COST_UPDATE_MODE,
+            batch_size: int = SHIPPING_COST_UPDATE_BATCH_SIZE,
+            rate_policy: str = SHIPPING_COST_RATE_POLICY
+    ):
+        if mode not in SHIPPING_COST_UPDATE_MODES:
+            raise ValueError(f"Неизвестный режим пересчета стоимости доставки: {mode}")
+        if rate_policy not in SHIPPING_COST_RATE_POLICIES:
+            raise ValueError(f"Неизвестная политика курса для стоимости доставки: {rate_policy}")
+        if batch_size <= 0:
+            raise ValueError(f"Размер порции должен быть положительным: {batch_size}")
         self.db = db
+        self.cache = cache
+        # Курс на момент регистрации у каждой посылки свой, поэтому считать можно только на стороне приложения
+        self.mode = "orm" if rate_policy == "registration" else mode
+        self.batch_size = batch_size
+        self.rate_policy = rate_policy
 
-    async def update_shipping_costs(self, usd_to_rub: Decimal):
+    async def update_shipping_costs(self, rate_snapshot: RateSnapshotSchema) -> int:
         """
-        Обновляет стоимость доставки для всех посылок с неопределенной стоимостью.
+        Обновляет стоимость доставки для всех посылок с неопределенной стоимостью
+        в соответствии с выбранным режимом.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+
+        Returns:
+            int: Количество посылок, для которых рассчитана стоимость доставки.
+        """
+        await tariff_cache.ensure_loaded(self.db)
+        if self.mode == "orm":
+            return await self.update_shipping_costs_orm(rate_snapshot)
+        if self.mode == "sql":
+            return await self.update_shipping_costs_sql(rate_snapshot)
+        return await self.update_shipping_costs_chunked(rate_snapshot)
+
+    @staticmethod
+    def tariff_expression(attribute: str):
+        """
+        SQL-выражение коэффициента тарифа для типа посылки: CASE parcel_type_id WHEN ... THEN ... ELSE ... END.
+
+        Значения берутся из кэша тарифов процесса, для типов без тарифа используется тариф по умолчанию.
+
+        Args:
+            attribute (str): Имя коэффициента тарифа (per_kg_rate, value_rate или min_charge).
+        """
+        default = getattr(DEFAULT_TARIFF, attribute)
+        values = {
+            parcel_type_id: getattr(tariff, attribute)
+            for parcel_type_id, tariff in tariff_cache.tariffs().items()
+            if getattr(tariff, attribute) != default
+        }
+        if not values:
+            return default
+        return case(values, value=ParcelModel.parcel_type_id, else_=default)
+
+    @staticmethod
+    def shipping_cost_expression(usd_to_rub: Decimal):
+        """
+        SQL-выражение формулы стоимости доставки над колонками таблицы parcels
+        с тарифом по типу посылки: max(вес * per_kg_rate + стоимость * value_rate, min_charge) * курс.
+
+        Округление до копеек выполняется явно (ROUND до 2 знаков), как и при записи в DECIMAL(9,2).
 
         Args:
             usd_to_rub (Decimal): Курс доллара к рублю.
         """
+        tariff_expression = ShippingCostsUpdateService.tariff_expression
+        min_charge = tariff_expression("min_charge")
+        shipping_cost_usd = (
+            ParcelModel.weight * tariff_expression("per_kg_rate")
+            + ParcelModel.value * tariff_expression("value_rate")
+        )
+        # Минимальная стоимость через CASE, а не GREATEST: выражение должно выполняться и вне MySQL
+        if DEFAULT_TARIFF.min_charge or any(tariff.min_charge for tariff in tariff_cache.tariffs().values()):
+            shipping_cost_usd = case((shipping_cost_usd < min_charge, min_charge), else_=shipping_cost_usd)
+        return func.round(shipping_cost_usd * usd_to_rub, 2)
+
+    @staticmethod
+    def pricing_values(rate_snapshot: RateSnapshotSchema) -> dict:
+        """
+        Значения колонок для UPDATE: стоимость доставки, снимок курса и версия формулы.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+        """
+        return {
+            "shipping_cost": ShippingCostsUpdateService.shipping_cost_expression(rate_snapshot.rate),
+            "rate_snapshot_id": rate_snapshot.snapshot_id,
+            "pricing_version": PRICING_FORMULA_VERSION,
+        }
+
+    async def update_shipping_costs_sql(self, rate_snapshot: RateSnapshotSchema) -> int:
+        """
+        Обновляет стоимость доставки одним запросом на стороне сервера БД.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+
+        Returns:
+            int: Количество обновленных строк.
+        """
+        try:
+            result = await self.db.execute(
+                update(ParcelModel)
+                .where(ParcelModel.shipping_cost.is_(None))
+                .values(**self.pricing_values(rate_snapshot))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            updated = result.rowcount
+            logger.info(f"Стоимость доставки рассчитана на стороне БД для {updated} посылок.")
+            return updated
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при работе с БД: {e}")
+            await self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Общая ошибка при обновлении стоимости доставки: {e}")
+            await self.db.rollback()
+            raise
+
+    async def update_shipping_costs_chunked(self, rate_snapshot: RateSnapshotSchema) -> int:
+        """
+        Обновляет стоимость доставки порциями по keyset-курсору ULID с коммитом после каждой порции.
+
+        Курсор последней закоммиченной порции сохраняется в кэше, и прерванный проход продолжается с него.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+
+        Returns:
+            int: Количество обновленных строк за весь проход.
+        """
+        cursor = await self._load_cursor()
+        if cursor:
+            logger.info(f"Продолжаем прерванный пересчет стоимости доставки с посылки {cursor}.")
+
+        updated = await self._update_chunks(rate_snapshot, cursor=cursor, persist_cursor=True)
+
+        # Проход завершен полностью, курсор больше не нужен
+        await self._clear_cursor()
+        return updated
+
+    async def update_shipping_costs_range(self, rate_snapshot: RateSnapshotSchema, start_id: str, end_id: str | None = None) -> int:
+        """
+        Обновляет стоимость доставки порциями только в диапазоне ULID [start_id, end_id).
+
+        Используется при распределении пересчета между воркерами Celery: каждый диапазон обрабатывается
+        независимо. Курсор в кэше не сохраняется: повторный запуск диапазона безопасен,
+        так как уже рассчитанные посылки в выборку не попадают.
+        В режиме "orm" (и при политике курса "registration") диапазон считается на стороне приложения.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+            start_id (str): Начало диапазона ULID (включительно).
+            end_id (str | None): Конец диапазона ULID (не включительно). None - без верхней границы.
+
+        Returns:
+            int: Количество обновленных строк в диапазоне.
+        """
+        await tariff_cache.ensure_loaded(self.db)
+        if self.mode == "orm":
+            return await self.update_shipping_costs_orm(rate_snapshot, start_id=start_id, end_id=end_id)
+        return await self._update_chunks(rate_snapshot, start_id=start_id, end_id=end_id)
+
+    @staticmethod
+    def backlog_ids_query(
+            limit: int,
+            cursor: str | None = None,
+            start_id: str | None = None,
+            end_id: str | None = None
+    ) -> Select:
+        """
+        Строит запрос следующей порции id посылок без стоимости доставки по возрастанию ULID.
+        Запрос читается по индексу ix_parcels_shipping_cost_id (shipping_cost, id) без сортировки.
+
+        Args:
+            limit (int): Размер порции.
+            cursor (str | None): ULID, после которого начинается порция (не включительно).
+            start_id (str | None): Нижняя граница диапазона ULID (включительно), если курсора нет.
+            end_id (str | None): Верхняя граница диапазона ULID (не включительно).
+
+        Returns:
+            Select: Запрос id посылок.
+        """
+        query = select(ParcelModel.id).where(ParcelModel.shipping_cost.is_(None))
+        if cursor:
+            query = query.where(ParcelModel.id > cursor)
+        elif start_id:
+            query = query.where(ParcelModel.id >= start_id)
+        if end_id:
+            query = query.where(ParcelModel.id < end_id)
+        return query.order_by(ParcelModel.id).limit(limit)
+
+    async def _update_chunks(
+            self,
+            rate_snapshot: RateSnapshotSchema,
+            cursor: str | None = None,
+            start_id: str | None = None,
+            end_id: str | None = None,
+            persist_cursor: bool = False
+    ) -> int:
+        """
+        Обходит посылки без стоимости порциями по возрастанию ULID и обновляет каждую порцию отдельной транзакцией.
+
+        Для каждой порции выбираются только id следующих batch_size посылок без стоимости (id > курсора),
+        затем выполняется UPDATE по этим id с повторной проверкой shipping_cost IS NULL. Повторная проверка
+        делает порцию идемпотентной: если процесс упал между коммитом и сохранением курсора,
+        порция будет пройдена повторно без двойного расчета.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю.
+            cursor (str | None): ULID, после которого начинается обход (не включительно).
+            start_id (str | None): Нижняя граница диапазона ULID (включительно).
+            end_id (str | None): Верхняя граница диапазона ULID (не включительно).
+            persist_cursor (bool): Сохранять ли курсор в кэш после каждой порции.
+
+        Returns:
+            int: Количество обновленных строк.
+        """
+        updated = 0
+        chunks = 0
+        try:
+            while True:
+                result = await self.db.execute(self.backlog_ids_query(self.batch_size, cursor, start_id, end_id))
+                parcel_ids = result.scalars().all()
+                if not parcel_ids:
+                    break
+
+                result = await self.db.execute(
+                    update(ParcelModel)
+                    .where(ParcelModel.id.in_(parcel_ids), ParcelModel.shipping_cost.is_(None))
+                    .values(**self.pricing_values(rate_snapshot))
+                    .execution_options(synchronize_session=False)
+                )
+                await self.db.commit()
+                await self._invalidate_parcels(parcel_ids)
+
+                updated += result.rowcount
+                chunks += 1
+                cursor = parcel_ids[-1]
+                if persist_cursor:
+                    await self._save_cursor(cursor)
+                logger.debug(f"Порция {chunks}: обновлено {result.rowcount} посылок, курсор {cursor}.")
+
+                if len(parcel_ids) < self.batch_size:
+                    break
+
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при работе с БД (курсор {cursor}): {e}")
+            await self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Общая ошибка при обновлении стоимости доставки (курсор {cursor}): {e}")
+            await self.db.rollback()
+            raise
+
+        logger.info(f"Стоимость доставки рассчитана порциями для {updated} посылок, порций: {chunks}.")
+        return updated
+
+    async def reprice_stale(self, rate_snapshot: RateSnapshotSchema) -> int:
+        """
+        Пересчитывает стоимость доставки только для посылок, рассчитанных по устаревшему снимку курса
+        или по устаревшей версии формулы.
+
+        Обход выполняется двумя проходами, каждый по своему индексу:
+            1. rate_snapshot_id IS NULL или rate_snapshot_id < текущего снимка (ULID упорядочены по времени);
+            2. pricing_version IS NULL или pricing_version < текущей версии.
+        Каждый проход выбирает порцию id, обновляет ее и коммитит. Обновленные посылки перестают
+        удовлетворять условию, поэтому курсор не нужен: следующая порция берется с начала диапазона индекса.
+
+        При политике курса "registration" выполняется только второй проход: цена по курсу регистрации
+        от нового курса не устаревает. Порция пересчитывается на стороне приложения по курсам из истории
+        (как в update_shipping_costs_orm), текущий снимок используется только для посылок старше истории курсов.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Текущий снимок курса доллара к рублю.
+
+        Returns:
+            int: Количество пересчитанных посылок.
+
+        Raises:
+            ValueError: Если у снимка курса нет идентификатора (устаревшие цены определить нельзя).
+        """
+        if not rate_snapshot.snapshot_id:
+            raise ValueError("Снимок курса без идентификатора, пересчет устаревших цен невозможен.")
+        await tariff_cache.ensure_loaded(self.db)
+
+        stale_conditions = (
+            or_(ParcelModel.rate_snapshot_id.is_(None), ParcelModel.rate_snapshot_id < rate_snapshot.snapshot_id),
+            or_(ParcelModel.pricing_version.is_(None), ParcelModel.pricing_version < PRICING_FORMULA_VERSION),
+        )
+        if self.rate_policy == "registration":
+            # Цена по курсу регистрации не устаревает с новым курсом, только с новой версией формулы
+            stale_conditions = stale_conditions[1:]
+            tariffs = tariff_cache.compiled()
+
+        updated = 0
+        try:
+            for stale_condition in stale_conditions:
+                condition = ParcelModel.shipping_cost.isnot(None) & stale_condition
+                while True:
+                    if self.rate_policy == "registration":
+                        rows = (await self.db.execute(self.pricing_columns_query(condition, self.batch_size))).all()
+                        parcel_ids = [row.id for row in rows]
+                    else:
+                        result = await self.db.execute(select(ParcelModel.id).where(condition).limit(self.batch_size))
+                        parcel_ids = result.scalars().all()
+                    if not parcel_ids:
+                        break
+
+                    if self.rate_policy == "registration":
+                        result = await self.db.execute(
+                            self.priced_parcels_update(condition), await self.price_rows(rows, rate_snapshot, tariffs)
+                        )
+                    else:
+                        result = await self.db.execute(
+                            update(ParcelModel)
+                            .where(ParcelModel.id.in_(parcel_ids), condition)
+                            .values(**self.pricing_values(rate_snapshot))
+                            .execution_options(synchronize_session=False)
+                        )
+                    await self.db.commit()
+                    await self._invalidate_parcels(parcel_ids)
+                    updated += result.rowcount
+
+                    if len(parcel_ids) < self.batch_size:
+                        break
+
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при работе с БД при пересчете устаревших цен: {e}")
+            await self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Общая ошибка при пересчете устаревших цен: {e}")
+            await self.db.rollback()
+            raise
+
+        logger.info(f"Пересчитана стоимость доставки по снимку {rate_snapshot.snapshot_id} для {updated} посылок.")
+        return updated
+
+    async def split_backlog(self, parts: int) -> list[tuple[str, str | None]]:
+        """
+        Делит посылки без стоимости доставки на непересекающиеся диапазоны ULID примерно равного размера.
+
+        Границы диапазонов берутся из самих id очереди одним запросом с нумерацией строк (ROW_NUMBER),
+        поэтому диапазоны не зависят от распределения ULID во времени. Диапазон не делается меньше
+        одной порции batch_size, чтобы не дробить маленькую очередь.
+
+        Args:
+            parts (int): Желаемое количество диапазонов.
+
+        Returns:
+            list[tuple[str, str | None]]: Диапазоны (start_id включительно, end_id не включительно).
+                У последнего диапазона end_id равен None: посылки, поступившие после деления, тоже попадут в него.
+        """
         try:
-            # Получаем все посылки без расчетной стоимости
             result = await self.db.execute(
-                select(ParcelModel).filter(ParcelModel.shipping_cost.is_(None))
+                select(func.count()).select_from(ParcelModel).where(ParcelModel.shipping_cost.is_(None))
             )
-            parcels = result.scalars().all()
-
-            # Обновляем стоимость доставки для каждой посылки
-            for parcel in parcels:
-                try:
-                    weight = Decimal(parcel.weight)
-                    value = Decimal(parcel.value)
-                    new_shipping_cost = (weight * Decimal('0.5') + value * Decimal('0.01')) * usd_to_rub
-                    parcel.shipping_cost = new_shipping_cost
-                    logger.debug(f"Обновлена стоимость доставки для посылки {parcel.id}: {new_shipping_cost}")
-                except (ValueError, InvalidOperation) as e:
-                    logger.warning(f"Ошибка при расчете стоимости для посылки {parcel.id}: {e}")
-
-            # Сохраняем изменения
+            backlog = result.scalar_one()
+            if not backlog:
+                return []
+
+            parts = max(1, min(parts, -(-backlog // self.batch_size)))
+            step = -(-backlog // parts)
+
+            numbered = (
+                select(
+                    ParcelModel.id.label("id"),
+                    func.row_number().over(order_by=ParcelModel.id).label("row_number")
+                )
+                .where(ParcelModel.shipping_cost.is_(None))
+                .subquery()
+            )
+            result = await self.db.execute(
+                select(numbered.c.id)
+                .where((numbered.c.row_number - 1) % step == 0)
+                .order_by(numbered.c.id)
+            )
+            boundaries = result.scalars().all()
+            # Отпускаем снимок чтения, чтобы не держать транзакцию открытой
             await self.db.commit()
-            logger.info("Стоимость доставки успешно обновлена для всех посылок без расчетной стоимости.")
+
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при работе с БД при делении очереди пересчета: {e}")
+            await self.db.rollback()
+            raise
+
+        ranges = [
+            (start_id, boundaries[i + 1] if i + 1 < len(boundaries) else None)
+            for i, start_id in enumerate(boundaries)
+        ]
+        logger.info(f"Очередь пересчета из {backlog} посылок разделена на {len(ranges)} диапазонов.")
+        return ranges
+
+    async def _load_cursor(self) -> str | None:
+        """
+        Получает из кэша курсор последней закоммиченной порции.
+
+        Returns:
+            str | None: ULID последней обработанной посылки или None, если пересчет начинается сначала.
+        """
+        if self.cache is None:
+            return None
+        return await self.cache.get_value(SHIPPING_COST_CURSOR_REDIS_KEY)
+
+    async def _save_cursor(self, cursor: str) -> None:
+        """
+        Сохраняет курсор последней закоммиченной порции в кэш.
+        Ошибка сохранения не прерывает пересчет: в худшем случае после сбоя порции будут пройдены повторно.
+
+        Args:
+            cursor (str): ULID последней обработанной посылки.
+        """
+        if self.cache is None:
+            return
+        try:
+            await self.cache.set_value(SHIPPING_COST_CURSOR_REDIS_KEY, cursor, SHIPPING_COST_CURSOR_EXPIRE)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить курсор пересчета стоимости доставки {cursor}: {e}")
+
+    async def _clear_cursor(self) -> None:
+        """
+        Удаляет курсор из кэша после полного прохода.
+        """
+        if self.cache is None:
+            return
+        try:
+            await self.cache.delete_value(SHIPPING_COST_CURSOR_REDIS_KEY)
+        except Exception as e:
+            logger.warning(f"Не удалось удалить курсор пересчета стоимости доставки: {e}")
+
+    async def _invalidate_parcels(self, parcel_ids: Sequence[str]) -> None:
+        """
+        Заменяет в кэше карточки посылок закоммиченной порции меткой удаления. Ошибки кэша не прерывают пересчет.
+
+        Args:
+            parcel_ids (Sequence[str]): ULID посылок порции.
+        """
+        if self.cache is None:
+            return
+        await ParcelCache(self.cache).invalidate(parcel_ids)
+
+    @staticmethod
+    def priced_parcels_update(condition=None):
+        """
+        UPDATE одной посылки по первичному ключу с повторной проверкой условия выборки,
+        выполняется для всей порции одним executemany. По умолчанию условие - shipping_cost IS NULL:
+        посылку, которой стоимость уже записал параллельный пересчет или регистрация, запрос не перезаписывает.
+        Параметры: b_id, b_shipping_cost, b_rate_snapshot_id, b_pricing_version.
+
+        Args:
+            condition: Условие, которому посылка должна по-прежнему удовлетворять.
+        """
+        parcels = ParcelModel.__table__
+        return (
+            update(parcels)
+            .where(parcels.c.id == bindparam("b_id"), parcels.c.shipping_cost.is_(None) if condition is None else condition)
+            .values(
+                shipping_cost=bindparam("b_shipping_cost"),
+                rate_snapshot_id=bindparam("b_rate_snapshot_id"),
+                pricing_version=bindparam("b_pricing_version")
+            )
+        )
+
+    @staticmethod
+    def pricing_columns_query(condition, limit: int) -> Select:
+        """
+        Запрос порции посылок для расчета на стороне приложения: id, вес в граммах, стоимость в центах и тип.
+        Вес и стоимость сразу в граммах и центах: драйвер возвращает int, а не Decimal.
+
+        Args:
+            condition: Условие выборки посылок.
+            limit (int): Размер порции.
+        """
+        return (
+            select(
+                ParcelModel.id,
+                cast(func.round(ParcelModel.weight * 1000), Integer).label("grams"),
+                cast(func.round(ParcelModel.value * 100), Integer).label("cents"),
+                ParcelModel.parcel_type_id
+            )
+            .where(condition)
+            .limit(limit)
+        )
+
+    async def price_rows(self, rows: Sequence, rate_snapshot: RateSnapshotSchema, tariffs: CompiledTariffs) -> list[dict]:
+        """
+        Считает стоимость доставки порции на стороне приложения по политике курса сервиса
+        и возвращает параметры для priced_parcels_update.
+
+        Args:
+            rows (Sequence): Строки pricing_columns_query.
+            rate_snapshot (RateSnapshotSchema): Текущий снимок курса
+                (для политики "registration" - для посылок старше истории курсов).
+            tariffs (CompiledTariffs): Скомпилированные тарифы.
+        """
+        parcel_ids, grams, cents, parcel_type_ids = zip(*rows)
+        if self.rate_policy == "registration":
+            rate_snapshots = [
+                registration_snapshot or rate_snapshot
+                for registration_snapshot in await RateHistoryService(self.db).resolve_rates(parcel_ids)
+            ]
+        else:
+            rate_snapshots = [rate_snapshot] * len(parcel_ids)
+        kopecks = self.price_by_snapshot(grams, cents, parcel_type_ids, tariffs, rate_snapshots)
+        return [
+            {
+                "b_id": parcel_id,
+                "b_shipping_cost": kopecks_to_decimal(shipping_cost),
+                "b_rate_snapshot_id": parcel_rate_snapshot.snapshot_id,
+                "b_pricing_version": PRICING_FORMULA_VERSION,
+            }
+            for parcel_id, shipping_cost, parcel_rate_snapshot in zip(parcel_ids, kopecks, rate_snapshots)
+        ]
+
+    async def update_shipping_costs_orm(
+            self,
+            rate_snapshot: RateSnapshotSchema,
+            start_id: str | None = None,
+            end_id: str | None = None
+    ) -> int:
+        """
+        Обновляет стоимость доставки для всех посылок с неопределенной стоимостью расчетом на стороне приложения.
+
+        Посылки обходятся порциями по keyset-курсору ULID. Из БД выбираются только нужные колонки
+        (id, вес в граммах, стоимость в центах, тип), стоимость всей порции считается пакетно в целых копейках
+        (services.pricing_kernel), затем порция записывается одним executemany UPDATE по первичному ключу
+        с повторной проверкой shipping_cost IS NULL (priced_parcels_update) и коммитится.
+        Поэтому повторные и пересекающиеся запуски не перезаписывают уже рассчитанную стоимость.
+
+        При политике курса "registration" курсы порции определяются одним запросом к истории курсов,
+        а порция считается пакетно по группам посылок с одним снимком курса.
+
+        Args:
+            rate_snapshot (RateSnapshotSchema): Снимок курса доллара к рублю
+                (для политики "registration" - для посылок старше истории курсов).
+            start_id (str | None): Нижняя граница диапазона ULID (включительно).
+            end_id (str | None): Верхняя граница диапазона ULID (не включительно).
+
+        Returns:
+            int: Количество посылок, для которых рассчитана стоимость доставки этим проходом.
+        """
+        tariffs = tariff_cache.compiled()
+        updated = 0
+        cursor = None
+        try:
+            while True:
+                condition = ParcelModel.shipping_cost.is_(None)
+                if cursor:
+                    condition = condition & (ParcelModel.id > cursor)
+                elif start_id:
+                    condition = condition & (ParcelModel.id >= start_id)
+                if end_id:
+                    condition = condition & (ParcelModel.id < end_id)
+                result = await self.db.execute(
+                    self.pricing_columns_query(condition, self.batch_size).order_by(ParcelModel.id)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+
+                result = await self.db.execute(
+                    self.priced_parcels_update(), await self.price_rows(rows, rate_snapshot, tariffs)
+                )
+                await self.db.commit()
+                parcel_ids = [row.id for row in rows]
+                await self._invalidate_parcels(parcel_ids)
+
+                updated += result.rowcount
+                cursor = parcel_ids[-1]
+                if len(rows) < self.batch_size:
+                    break
+
+            logger.info(f"Стоимость доставки успешно обновлена для {updated} посылок без расчетной стоимости.")
+            return updated
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при работе с БД: {e}")
             await self.db.rollback()
@@ -61,3 +669,42 @@ class ShippingCostsUpdateService:
             logger.error(f"Общая ошибка при обновлении стоимости доставки: {e}")
             await self.db.rollback()
             raise
+
+    @staticmethod
+    def price_by_snapshot(
+            grams: Sequence[int],
+            cents: Sequence[int],
+            parcel_type_ids: Sequence[int],
+            tariffs: CompiledTariffs,
+            rate_snapshots: Sequence[RateSnapshotSchema]
+    ) -> Sequence[int]:
+        """
+        Считает стоимость доставки порции, в которой у посылок могут быть разные снимки курса.
+        Посылки группируются по снимку, каждая группа считается одним пакетом (services.pricing_kernel).
+
+        Args:
+            grams (Sequence[int]): Вес посылок в граммах.
+            cents (Sequence[int]): Стоимость содержимого в центах.
+            parcel_type_ids (Sequence[int]): Типы посылок.
+            tariffs (CompiledTariffs): Скомпилированные тарифы.
+            rate_snapshots (Sequence[RateSnapshotSchema]): Снимок курса каждой посылки.
+
+        Returns:
+            Sequence[int]: Стоимость доставки в копейках в порядке посылок.
+        """
+        groups: dict[tuple[str | None, Decimal], list[int]] = {}
+        for index, snapshot in enumerate(rate_snapshots):
+            groups.setdefault((snapshot.snapshot_id, snapshot.rate), []).append(index)
+        if len(groups) == 1:
+            (_, usd_to_rub), = groups
+            return price_batch(grams, cents, parcel_type_ids, tariffs, usd_to_rub)
+
+        kopecks = [0] * len(rate_snapshots)
+        for (_, usd_to_rub), indexes in groups.items():
+            group_kopecks = price_batch(
+                [grams[i] for i in indexes], [cents[i] for i in indexes], [parcel_type_ids[i] for i in indexes],
+                tariffs, usd_to_rub
+            )
+            for i, shipping_cost in zip(indexes, group_kopecks):
+                kopecks[i] = shipping_cost
+        return kopecks
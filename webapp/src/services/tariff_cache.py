@@ -0,0 +1,183 @@
+"""
+Модуль: services.tariff_cache
+
+Назначение:
+    Кэш тарифов доставки по типам посылок в памяти процесса.
+
+Ключевые особенности:
+    - Таблица parcel_tariffs загружается целиком одним запросом и хранится в словаре
+      {parcel_type_id: TariffSchema}. Расчет стоимости доставки не обращается к БД за тарифом.
+    - Для типов посылок без записи в parcel_tariffs используется тариф по умолчанию
+      (SHIPPING_COST_PER_KG, SHIPPING_COST_VALUE_RATE, без минимальной стоимости).
+    - Версия тарифов хранится в Redis (TARIFFS_VERSION_REDIS_KEY). После правки таблицы версию меняют
+      (bump_version), и каждый процесс перезагружает тарифы при следующей проверке версии (refresh).
+    - Перезагрузка подменяет словарь целиком, поэтому читатели никогда не видят частично загруженные тарифы.
+
+Зависимости:
+    - models.parcel_tariff: ORM-модель тарифа.
+    - interfaces.cache: Кэш, в котором хранится версия тарифов.
+"""
+
+import asyncio
+import logging
+
+import ulid
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.parcel_tariff import ParcelTariffModel
+from interfaces.cache import ICacheService
+from schemas.pricing import TariffSchema
+from services.pricing_kernel import CompiledTariffs
+from config.pricing_conf import SHIPPING_COST_PER_KG, SHIPPING_COST_VALUE_RATE, TARIFFS_VERSION_REDIS_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARIFF = TariffSchema(per_kg_rate=SHIPPING_COST_PER_KG, value_rate=SHIPPING_COST_VALUE_RATE)
+
+
+class TariffCache:
+    """
+    Кэш тарифов доставки в памяти процесса.
+
+    Attributes:
+        loaded (bool): Загружены ли тарифы из БД.
+        version (str | None): Версия тарифов из Redis, с которой выполнена последняя загрузка.
+    """
+
+    def __init__(self):
+        self._tariffs: dict[int, TariffSchema] = {}
+        self._compiled = CompiledTariffs(self._tariffs, DEFAULT_TARIFF)
+        self._version: str | None = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> str | None:
+        return self._version
+
+    def get(self, parcel_type_id: int | None) -> TariffSchema:
+        """
+        Возвращает тариф для типа посылки или тариф по умолчанию.
+
+        Args:
+            parcel_type_id (int | None): Идентификатор типа посылки.
+
+        Returns:
+            TariffSchema: Тариф доставки.
+        """
+        return self._tariffs.get(parcel_type_id, DEFAULT_TARIFF)
+
+    def tariffs(self) -> dict[int, TariffSchema]:
+        """
+        Возвращает все загруженные тарифы по идентификатору типа посылки.
+        """
+        return self._tariffs
+
+    def compiled(self) -> CompiledTariffs:
+        """
+        Возвращает загруженные тарифы в целочисленном виде для пакетного расчета (services.pricing_kernel).
+        """
+        return self._compiled
+
+    async def load(self, db: AsyncSession, version: str | None = None) -> None:
+        """
+        Загружает все тарифы из БД одним запросом и подменяет ими текущие.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            version (str | None): Версия тарифов из Redis, соответствующая загрузке.
+        """
+        result = await db.execute(select(ParcelTariffModel))
+        tariffs = {
+            tariff.parcel_type_id: TariffSchema(
+                parcel_type_id=tariff.parcel_type_id,
+                per_kg_rate=tariff.per_kg_rate,
+                value_rate=tariff.value_rate,
+                min_charge=tariff.min_charge
+            )
+            for tariff in result.scalars().all()
+        }
+        self._compiled = CompiledTariffs(tariffs, DEFAULT_TARIFF)
+        self._tariffs = tariffs
+        self._version = version
+        self._loaded = True
+        logger.info(f"Загружено тарифов доставки: {len(tariffs)}, версия {version}.")
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """
+        Загружает тарифы, если они еще не загружены в этом процессе.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+        """
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.load(db, self._version)
+
+    async def refresh(self, db: AsyncSession, cache: ICacheService) -> bool:
+        """
+        Перезагружает тарифы, если версия в Redis отличается от загруженной.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            cache (ICacheService): Кэш, в котором хранится версия тарифов.
+
+        Returns:
+            bool: True, если тарифы были перезагружены.
+        """
+        version = await cache.get_value(TARIFFS_VERSION_REDIS_KEY)
+        if self._loaded and version == self._version:
+            return False
+        async with self._lock:
+            if self._loaded and version == self._version:
+                return False
+            await self.load(db, version)
+        return True
+
+    async def run_refresher(self, session_factory, cache: ICacheService, interval: int) -> None:
+        """
+        Фоновая проверка версии тарифов. Запускается в lifespan приложения и работает до его завершения.
+
+        Ошибки БД и Redis не прерывают цикл: процесс продолжает считать по уже загруженным тарифам.
+
+        Args:
+            session_factory: Фабрика асинхронных сессий БД.
+            cache (ICacheService): Кэш, в котором хранится версия тарифов.
+            interval (int): Интервал проверки версии в секундах.
+        """
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db, cache)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Не удалось обновить тарифы доставки: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def bump_version(cache: ICacheService) -> str:
+        """
+        Записывает в Redis новую версию тарифов. Все процессы перезагрузят тарифы при следующей проверке.
+
+        Args:
+            cache (ICacheService): Кэш, в котором хранится версия тарифов.
+
+        Returns:
+            str: Новая версия тарифов (ULID).
+        """
+        version = str(ulid.new())
+        await cache.set_value(TARIFFS_VERSION_REDIS_KEY, version)
+        logger.info(f"Версия тарифов доставки изменена на {version}.")
+        return version
+
+
+# Один кэш тарифов на процесс
+tariff_cache = TariffCache()